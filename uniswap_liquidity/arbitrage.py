@@ -0,0 +1,166 @@
+"""
+Optimal arbitrage between pools of the same token pair.
+
+Buying token0 with token1 in the cheaper pool and selling it back for token1
+in the dearer one is profitable for as long as the marginal rate of the
+round trip is above one:
+
+    (1 - fee_buy) * (1 - fee_sell) * price_sell / price_buy > 1
+
+Within a range where both pools' liquidity is constant, the sqrt prices are
+linear in 1 / sqrt(price) of the token0 amount moved, so the size at which
+that rate reaches one is solved in closed form. `optimal_arbitrage` walks
+both pools' initialized ticks together, one segment at a time, and stops in
+the segment holding the optimum; the amounts are then quoted exactly with
+`simulate_swap`.
+"""
+from collections import namedtuple
+from itertools import permutations
+from math import sqrt
+from typing import Iterable, Optional
+from uniswap_liquidity.swap_simulator import simulate_swap
+from uniswap_liquidity.v3_math import MIN_TICK, MAX_TICK, Q96, get_sqrt_ratio_at_tick
+
+# token1 in to `buy_pool`, token0 moved from `buy_pool` to `sell_pool`, and
+# token1 out of `sell_pool`; profit = amount_out - amount_in, in token1
+ArbitrageResult = namedtuple(
+    "ArbitrageResult", "buy_pool sell_pool amount_in amount_token0 amount_out profit sqrt_price_x96_buy sqrt_price_x96_sell"
+)
+
+
+class _RangeWalker:
+    """
+    A pool's sqrt price and liquidity while its price moves one way, crossing
+    initialized ticks like `simulate_swap`.
+    """
+
+    def __init__(self, pool, zero_for_one: bool, offline: bool):
+        self.pool = pool
+        self.zero_for_one = zero_for_one
+        self.fetch = not offline
+        self.tick = pool.tick
+        self.sqrt_price = pool.sqrt_price_x96 / Q96
+        self.liquidity = float(pool.liquidity)
+        self._find_next()
+
+    def _find_next(self):
+        tick_next, self.initialized = self.pool.next_initialized_tick_within_one_word(
+            self.tick, self.zero_for_one, fetch=self.fetch
+        )
+        self.tick_next = min(max(tick_next, MIN_TICK), MAX_TICK)
+        self.sqrt_price_next = get_sqrt_ratio_at_tick(self.tick_next) / Q96
+
+    @property
+    def exhausted(self) -> bool:
+        return self.sqrt_price == self.sqrt_price_next and self.tick_next in (MIN_TICK, MAX_TICK)
+
+    def cross(self):
+        """
+        Moves the price to the next tick and crosses it.
+        """
+        self.sqrt_price = self.sqrt_price_next
+        if self.tick_next in (MIN_TICK, MAX_TICK):
+            return
+        if self.initialized:
+            liquidity_net = self.pool.tick_data[self.tick_next][0]
+            self.liquidity += -liquidity_net if self.zero_for_one else liquidity_net
+        self.tick = self.tick_next - 1 if self.zero_for_one else self.tick_next
+        self._find_next()
+
+
+def _optimal_token0_amount(buy_pool, sell_pool, offline: bool) -> float:
+    """
+    Token0 to move from `buy_pool` to `sell_pool` for the most token1
+    profit, in floating point; zero when the round trip does not pay.
+    """
+    gamma = sqrt((1 - buy_pool.fee / 10**6) * (1 - sell_pool.fee / 10**6))
+    sell_fee = 1 - sell_pool.fee / 10**6
+    buy = _RangeWalker(buy_pool, zero_for_one=False, offline=offline)
+    sell = _RangeWalker(sell_pool, zero_for_one=True, offline=offline)
+
+    amount = 0.0
+    while not (buy.exhausted or sell.exhausted):
+        # the round trip pays while gamma * sqrt(P_sell) > sqrt(P_buy)
+        gap = gamma / buy.sqrt_price - 1 / sell.sqrt_price
+        if gap <= 0:
+            break
+        # an empty range moves the price for free, up to where the trade stops paying
+        if buy.liquidity <= 0:
+            if gamma / buy.sqrt_price_next - 1 / sell.sqrt_price <= 0:
+                break
+            buy.cross()
+            continue
+        if sell.liquidity <= 0:
+            if gamma / buy.sqrt_price - 1 / sell.sqrt_price_next <= 0:
+                break
+            sell.cross()
+            continue
+
+        # token0 out of `buy` lowers 1 / sqrt(P_buy) by amount / L, token0 into
+        # `sell` raises 1 / sqrt(P_sell) by amount * (1 - fee) / L
+        buy_slope = gamma / buy.liquidity
+        sell_slope = sell_fee / sell.liquidity
+        to_optimum = gap / (buy_slope + sell_slope)
+        to_buy_tick = buy.liquidity * (1 / buy.sqrt_price - 1 / buy.sqrt_price_next)
+        to_sell_tick = sell.liquidity * (1 / sell.sqrt_price_next - 1 / sell.sqrt_price) / sell_fee
+        if to_optimum <= min(to_buy_tick, to_sell_tick):
+            return amount + to_optimum
+
+        step = min(to_buy_tick, to_sell_tick)
+        amount += step
+        if to_buy_tick == step:
+            buy.cross()
+        else:
+            buy.sqrt_price = 1 / (1 / buy.sqrt_price - step / buy.liquidity)
+        if to_sell_tick == step:
+            sell.cross()
+        else:
+            sell.sqrt_price = 1 / (1 / sell.sqrt_price + step * sell_fee / sell.liquidity)
+    return amount
+
+
+def optimal_arbitrage(buy_pool, sell_pool, offline: bool = False) -> Optional[ArbitrageResult]:
+    """
+    Finds the trade buying token0 with token1 in `buy_pool` and selling it
+    in `sell_pool` that makes the most token1, fees included, in a single
+    walk of both pools' tick ranges.
+
+    Returns None if no such trade is profitable. Words missing from the
+    tick maps are fetched unless `offline` is set, in which case a
+    LookupError is raised instead.
+    """
+    if (buy_pool.token0, buy_pool.token1) != (sell_pool.token0, sell_pool.token1):
+        raise ValueError(f"{buy_pool.address} and {sell_pool.address} do not trade the same pair")
+    amount_token0 = int(_optimal_token0_amount(buy_pool, sell_pool, offline))
+    if amount_token0 <= 0:
+        return None
+    buy = simulate_swap(buy_pool, False, -amount_token0, offline=offline)
+    sell = simulate_swap(sell_pool, True, buy.amount_out, offline=offline)
+    profit = sell.amount_out - buy.amount_in
+    if profit <= 0:
+        return None
+    return ArbitrageResult(
+        buy_pool.address,
+        sell_pool.address,
+        buy.amount_in,
+        buy.amount_out,
+        sell.amount_out,
+        profit,
+        buy.sqrt_price_x96,
+        sell.sqrt_price_x96,
+    )
+
+
+def best_arbitrage(pools: Iterable, offline: bool = False) -> Optional[ArbitrageResult]:
+    """
+    The most profitable `optimal_arbitrage` between any two of `pools`, all
+    on the same pair. Only the direction from the cheaper to the dearer pool
+    of each pair is walked.
+    """
+    results = [
+        optimal_arbitrage(buy_pool, sell_pool, offline)
+        for buy_pool, sell_pool in permutations(pools, 2)
+        if buy_pool.sqrt_price_x96 < sell_pool.sqrt_price_x96
+    ]
+    results = [result for result in results if result is not None]
+    return max(results, key=lambda result: result.profit, default=None)
@@ -0,0 +1,196 @@
+import asyncio
+from abc import ABC
+from uniswap_liquidity.abi.uni_v3_lp_abi import V3_LP_ABI
+from uniswap_liquidity.block_cache import BlockCache
+from uniswap_liquidity.contracts import contract_at
+from uniswap_liquidity.metrics import RpcMetrics
+from uniswap_liquidity.tick_lens import TickLens, shared_tick_lens
+from uniswap_liquidity.tick_index import TickIndex
+from uniswap_liquidity.uni_v3_pool import V3PoolState
+from web3 import AsyncWeb3
+from typing import Optional, Sequence
+
+_MISSING = object()
+
+
+class AsyncBaseV3LiquidityPool(V3PoolState, ABC):
+    """
+    asyncio counterpart of `BaseV3LiquidityPool`, built on AsyncWeb3.
+
+    Use `await AsyncV3LiquidityPool.create(address, w3)` to construct a pool.
+    Independent reads are issued concurrently; pass the same `semaphore` to
+    many pools to bound the number of requests in flight across all of them.
+    Calls are recorded in `metrics`, and reads pinned to a block number go
+    through `cache`, as for the synchronous pool.
+
+    Tick words are never fetched implicitly, since the tick walks are
+    synchronous: `await pool.load_tick_range(...)` before walking.
+    """
+
+    def __init__(
+        self,
+        address,
+        w3: AsyncWeb3,
+        tick_lens: TickLens = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        metrics: RpcMetrics = None,
+        cache: BlockCache = None,
+    ):
+        self.address = address
+        self.semaphore = semaphore
+        self.cache = cache
+        if metrics is not None:
+            self.metrics = metrics
+
+        try:
+            self._pool_contract = contract_at(w3, address, V3_LP_ABI)
+        except:
+            raise RuntimeError(f"Could not create contract for {address}")
+
+        if tick_lens:
+            self.tick_lens = tick_lens
+        else:
+            try:
+                self.tick_lens = shared_tick_lens(w3, metrics=metrics, cache=cache)
+            except:
+                raise RuntimeError(f"Could not create TickLens contract")
+
+    @classmethod
+    async def create(
+        cls,
+        address,
+        w3: AsyncWeb3,
+        tick_lens: TickLens = None,
+        semaphore=None,
+        metrics=None,
+        block_identifier="latest",
+        cache: BlockCache = None,
+    ):
+        pool = cls(address, w3, tick_lens=tick_lens, semaphore=semaphore, metrics=metrics, cache=cache)
+        with pool.metrics.operation("construction"):
+            await pool.initialize(block_identifier)
+        return pool
+
+    async def initialize(self, block_identifier="latest"):
+        """
+        Reads the pool info concurrently, then the bitmap word around the
+        current tick, all pinned to the block `block_identifier` refers to.
+        """
+        functions = self._pool_contract.functions
+        try:
+            self.block_number = await self._resolve_block_number(block_identifier)
+            (
+                self.token0,
+                self.token1,
+                self.fee,
+                self.slot0,
+                self.liquidity,
+                self.tick_spacing,
+            ) = await asyncio.gather(
+                self._call(functions.token0()),
+                self._call(functions.token1()),
+                self._call(functions.fee()),
+                self._call(functions.slot0()),
+                self._call(functions.liquidity()),
+                self._call(functions.tickSpacing()),
+            )
+            self.sqrt_price_x96 = self.slot0[0]
+            self.tick = self.slot0[1]
+            self.tick_data = TickIndex()
+            self.tick_words = set()
+            self.log_position = None
+            self.tick_word, _ = self.get_tick_bitmap_position(self.tick)
+            await self.get_tick_data_at_word(self.tick_word)
+        except Exception as e:
+            raise RuntimeError(f"Could not get pool info for {self.address}") from e
+
+    async def update(self, block_identifier="latest"):
+        """
+        Async `BaseV3LiquidityPool.update`.
+        """
+        try:
+            block_number = await self._resolve_block_number(block_identifier)
+            slot0, liquidity = await asyncio.gather(
+                self._call(self._pool_contract.functions.slot0(), block_number),
+                self._call(self._pool_contract.functions.liquidity(), block_number),
+            )
+        except Exception as e:
+            raise RuntimeError(f"Could not update pool info for {self.address}") from e
+        else:
+            return self._apply_update(slot0, liquidity, block_number)
+
+    async def get_tick_data_at_word(self, word_position: int):
+        """
+        Async `BaseV3LiquidityPool.get_tick_data_at_word`.
+        """
+        tick_data = await self._call(
+            self.tick_lens._tick_lens_contract.functions.getPopulatedTicksInWord(self.address, word_position)
+        )
+        self._store_tick_word(word_position, tick_data)
+        return tick_data
+
+    async def load_tick_range(self, tick_lower: int, tick_upper: int):
+        """
+        Fetches every missing word covering [tick_lower, tick_upper]
+        concurrently.
+        """
+        await asyncio.gather(
+            *(
+                self.get_tick_data_at_word(word_position)
+                for word_position in self._missing_tick_words(tick_lower, tick_upper)
+            )
+        )
+
+    async def get_tick(self, tick: int):
+        """
+        Reads the full `ticks()` struct for `tick`.
+        """
+        return await self._call(self._pool_contract.functions.ticks(tick))
+
+    def _load_missing_tick_word(self, word_position: int):
+        raise LookupError(
+            f"Tick word {word_position} of {self.address} is not loaded; await load_tick_range() first"
+        )
+
+    async def _call(self, function, block_identifier=None):
+        if block_identifier is None:
+            block_identifier = "latest" if self.block_number is None else self.block_number
+        cacheable = self.cache is not None and isinstance(block_identifier, int)
+        if cacheable:
+            key = BlockCache.key(function, block_identifier)
+            value = self.cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        value = await self._request(function.fn_name, function.call(block_identifier=block_identifier))
+        if cacheable:
+            self.cache.put(key, value)
+        return value
+
+    async def _resolve_block_number(self, block_identifier) -> int:
+        # async `block_cache.resolve_block_number`
+        if isinstance(block_identifier, int):
+            return block_identifier
+        eth = self._pool_contract.w3.eth
+        if block_identifier == "latest":
+            return await self._request("eth_blockNumber", eth.block_number)
+        block = await self._request("eth_getBlockByNumber", eth.get_block(block_identifier))
+        return block["number"]
+
+    async def _request(self, method: str, awaitable):
+        if self.semaphore is None:
+            with self.metrics.timer(method):
+                return await awaitable
+        async with self.semaphore:
+            with self.metrics.timer(method):
+                return await awaitable
+
+
+class AsyncV3LiquidityPool(AsyncBaseV3LiquidityPool):
+    pass
+
+
+async def update_pools(pools: Sequence[AsyncBaseV3LiquidityPool]):
+    """
+    Concurrently `update()`s every pool, returning the results in order.
+    """
+    return await asyncio.gather(*(pool.update() for pool in pools))
@@ -0,0 +1,182 @@
+"""
+Streaming backfill of pool events over long block ranges with eth_getLogs.
+
+    for event in iter_pool_events(w3, [pool_address], 12_369_621, "latest"):
+        ...
+
+    # or rebuild a pool's state while reading its history
+    for event in backfill_pool(pool, pool.block_number + 1):
+        ...
+
+The range is read in chunks of `chunk_size` blocks, up to `max_workers` at a
+time, and the logs are yielded in (blockNumber, logIndex) order, decoded only
+as they are consumed. When the node refuses a chunk for returning too many
+results, the chunk is split in half until it goes through, and the chunk size
+shrinks to what worked before growing back. At most `max_workers` chunks are
+held at once, so memory stays bounded however long the range.
+"""
+from collections import deque
+from concurrent.futures import Executor
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from eth_utils import event_abi_to_log_topic
+from web3.exceptions import Web3RPCError
+from uniswap_liquidity.abi.uni_v3_lp_abi import V3_LP_ABI
+from uniswap_liquidity.block_cache import resolve_block_number
+from uniswap_liquidity.contracts import events_of
+from uniswap_liquidity.executors import _executor, _submit_in_context
+from uniswap_liquidity.metrics import RPC_METRICS, RpcMetrics
+
+BACKFILL_EVENTS = ("Swap", "Mint", "Burn", "Collect")
+
+# topic0 -> name of every event of the pool ABI
+EVENT_NAMES = {
+    event_abi_to_log_topic(abi): abi["name"] for abi in V3_LP_ABI if abi.get("type") == "event"
+}
+
+# fragments of the errors nodes and providers answer a too broad eth_getLogs with
+RESULT_LIMIT_ERRORS = (
+    "more than",
+    "too many",
+    "limit exceeded",
+    "response size",
+    "range is too large",
+    "range too large",
+    "block range",
+)
+
+
+def is_result_limit_error(error: Exception) -> bool:
+    """
+    Whether `error` means the eth_getLogs range has to be narrowed.
+    """
+    message = str(error).lower()
+    return any(fragment in message for fragment in RESULT_LIMIT_ERRORS)
+
+
+class _ChunkSize:
+    """
+    Number of blocks per chunk: shrunk to the span that went through when a
+    chunk had to be split, doubled back up to `max_size` after a chunk that
+    did not.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = self.size = max_size
+
+    def update(self, split: bool, span: int):
+        if split:
+            self.size = max(min(self.size, span), 1)
+        else:
+            self.size = min(self.size * 2, self.max_size)
+
+
+def _get_logs(w3, filter_params: dict, from_block: int, to_block: int, metrics: RpcMetrics) -> Tuple[List, bool, int]:
+    """
+    Logs of [from_block, to_block], halving the range as often as the node
+    requires. Returns them with whether the range was split and the widest
+    span that went through.
+    """
+    logs = []
+    split, span = False, 0
+    # ranges left to read, the next one last
+    pending = [(from_block, to_block)]
+    while pending:
+        start, end = pending.pop()
+        try:
+            with metrics.timer("eth_getLogs"):
+                result = w3.eth.get_logs({**filter_params, "fromBlock": start, "toBlock": end})
+        except Web3RPCError as error:
+            if start == end or not is_result_limit_error(error):
+                raise
+            middle = (start + end) // 2
+            pending += [(middle + 1, end), (start, middle)]
+            split = True
+            continue
+        logs.extend(result)
+        span = max(span, end - start + 1)
+    return logs, split, span
+
+
+def iter_logs(
+    w3,
+    addresses: Union[str, Sequence[str]],
+    from_block: int,
+    to_block="latest",
+    topics: Optional[list] = None,
+    chunk_size: int = 2000,
+    max_workers: int = 4,
+    executor: Optional[Executor] = None,
+    metrics: RpcMetrics = RPC_METRICS,
+) -> Iterator[dict]:
+    """
+    Yields the raw logs emitted by `addresses` over [from_block, to_block],
+    matching `topics` (as in an eth_getLogs filter), in block order.
+
+    Chunks of `chunk_size` blocks are read concurrently on `executor`, or a
+    pool of `max_workers` threads, with at most `max_workers` chunks ahead
+    of the consumer.
+    """
+    to_block = resolve_block_number(w3, to_block, metrics)
+    filter_params = {"address": [addresses] if isinstance(addresses, str) else list(addresses)}
+    if topics is not None:
+        filter_params["topics"] = topics
+
+    size = _ChunkSize(chunk_size)
+    next_block = from_block
+    window = deque()
+
+    def submit(executor):
+        nonlocal next_block
+        end = min(next_block + size.size - 1, to_block)
+        window.append(_submit_in_context(executor, _get_logs, w3, filter_params, next_block, end, metrics))
+        next_block = end + 1
+
+    with _executor(executor, max_workers) as executor:
+        try:
+            while next_block <= to_block and len(window) < max_workers:
+                submit(executor)
+            while window:
+                logs, split, span = window.popleft().result()
+                size.update(split, span)
+                if next_block <= to_block:
+                    submit(executor)
+                logs.sort(key=lambda log: (log["blockNumber"], log["logIndex"]))
+                yield from logs
+        finally:
+            for future in window:
+                future.cancel()
+
+
+def iter_pool_events(
+    w3,
+    addresses: Union[str, Sequence[str]],
+    from_block: int,
+    to_block="latest",
+    events: Iterable[str] = BACKFILL_EVENTS,
+    **kwargs,
+) -> Iterator[dict]:
+    """
+    Yields the `events` of the pools at `addresses` over [from_block,
+    to_block] in block order, decoded as web3's `process_log` does. Keyword
+    arguments are passed on to `iter_logs`.
+    """
+    events = set(events)
+    unknown = events - set(EVENT_NAMES.values())
+    if unknown:
+        raise ValueError(f"Unknown pool events {sorted(unknown)}")
+    topics = [["0x" + topic.hex() for topic, name in EVENT_NAMES.items() if name in events]]
+    contract_events = events_of(w3, V3_LP_ABI)
+    for log in iter_logs(w3, addresses, from_block, to_block, topics, **kwargs):
+        yield contract_events[EVENT_NAMES[bytes(log["topics"][0])]]().process_log(log)
+
+
+def backfill_pool(pool, from_block: int, to_block="latest", events: Iterable[str] = BACKFILL_EVENTS, **kwargs):
+    """
+    Yields the `events` of `pool` over [from_block, to_block], applying the
+    Swap, Mint and Burn events to its local state as they are yielded.
+    """
+    w3 = pool._pool_contract.w3
+    kwargs.setdefault("metrics", pool.metrics)
+    for event in iter_pool_events(w3, pool.address, from_block, to_block, events, **kwargs):
+        pool.apply_event(event)
+        yield event
@@ -0,0 +1,42 @@
+"""
+Times the construction of many distinct pools sharing one Web3 provider.
+
+    python -m uniswap_liquidity.benchmarks.construction [--pools 1000] [--multicall]
+
+Pool reads are served by the in-process fake node, so the figures are the
+client-side cost of building contracts and decoding calls, not RPC latency.
+"""
+import argparse
+from time import perf_counter
+from web3 import Web3
+from uniswap_liquidity.multicall import Multicall
+from uniswap_liquidity.testing.fake_node import POSITIONS, FakeNode, FakePool
+from uniswap_liquidity.uni_v3_pool import V3LiquidityPool
+
+
+def time_constructions(pools=1000, multicall=False) -> float:
+    """
+    Returns the seconds taken to construct `pools` distinct pools.
+    """
+    node = FakeNode()
+    fake_pool = FakePool.from_positions(POSITIONS, tick=30)
+    addresses = [node.add_pool(f"0x{i + 1:040x}", fake_pool) for i in range(pools)]
+    w3 = Web3(node)
+    shared_multicall = Multicall(w3) if multicall else None
+    start = perf_counter()
+    for address in addresses:
+        V3LiquidityPool(address, w3, multicall=shared_multicall)
+    return perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the construction of many pools")
+    parser.add_argument("--pools", type=int, default=1000)
+    parser.add_argument("--multicall", action="store_true")
+    args = parser.parse_args(argv)
+    seconds = time_constructions(args.pools, args.multicall)
+    print(f"{args.pools} pools in {seconds:.2f} s, {seconds / args.pools * 1000:.2f} ms per pool")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Import-time benchmark of the modules that must not pull in web3.
+
+    python -m uniswap_liquidity.benchmarks.import_time [--repeat 5]
+
+Each module is imported in a fresh interpreter under `-X importtime`. A
+module is flagged if it loads web3 (or the eth-* stack) or takes longer than
+its budget, and the run then exits with status 1.
+"""
+import argparse
+import re
+import subprocess
+import sys
+from collections import namedtuple
+from typing import List
+
+# module -> import budget in milliseconds, cumulative over its own imports
+IMPORT_BUDGETS_MS = {
+    "uniswap_liquidity.v3_math": 25,
+    "uniswap_liquidity.liquidity_math": 30,
+    "uniswap_liquidity.liquidity_analyzer": 100,
+}
+# packages whose presence means the heavy web3 stack was loaded
+HEAVY_PACKAGES = ("web3", "eth_abi", "eth_utils", "eth_account")
+
+ImportTiming = namedtuple("ImportTiming", "module milliseconds heavy_imports")
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def time_import(module: str, repeat: int = 5) -> ImportTiming:
+    """
+    Best of `repeat` cold imports of `module`, and the heavy packages it
+    loaded.
+    """
+    best, heavy = None, ()
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        imported = {}
+        for match in _IMPORTTIME_LINE.finditer(result.stderr):
+            imported[match.group(3)] = int(match.group(1))
+        microseconds = imported[module]
+        best = microseconds if best is None else min(best, microseconds)
+        heavy = tuple(sorted(name for name in imported if name in HEAVY_PACKAGES))
+    return ImportTiming(module, best / 1000, heavy)
+
+
+def run(repeat: int = 5) -> List[ImportTiming]:
+    return [time_import(module, repeat) for module in IMPORT_BUDGETS_MS]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time benchmark of the web3-free modules")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    failed = False
+    print(f"{'module':<40}{'ms':>8}{'budget':>8}  heavy imports")
+    for timing in run(args.repeat):
+        budget = IMPORT_BUDGETS_MS[timing.module]
+        over = timing.milliseconds > budget or timing.heavy_imports
+        failed = failed or bool(over)
+        print(
+            f"{timing.module:<40}{timing.milliseconds:>8.1f}{budget:>8}  "
+            f"{', '.join(timing.heavy_imports) or '-'}{'  REGRESSION' if over else ''}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
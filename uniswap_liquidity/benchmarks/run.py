@@ -0,0 +1,217 @@
+"""
+Offline benchmarks for pool construction, updates, quotes and tick walks.
+
+    python -m uniswap_liquidity.benchmarks.run [--positions 2000] [--distribution normal]
+    python -m uniswap_liquidity.benchmarks.run --save-baseline
+
+Each benchmark reports its throughput in ops/sec and, from one extra traced
+run, the memory it allocated. Results are compared against the baseline
+recorded for the same pool configuration (`baseline.json` next to this file
+by default); a benchmark more than `--tolerance` slower, or peaking above
+its baseline allocation by as much, is flagged as a regression and the run
+exits with status 1.
+"""
+import argparse
+import json
+import os
+import tracemalloc
+from collections import namedtuple
+from time import perf_counter
+from typing import Callable, Dict, List
+import numpy as np
+from web3 import Web3
+from uniswap_liquidity.benchmarks.synthetic import DISTRIBUTIONS, PoolConfig, make_node, make_positions
+from uniswap_liquidity.liquidity_analyzer import (
+    get_token_amounts,
+    get_token_amounts_x96,
+    get_tokens_to_target_price,
+    get_tokens_to_target_price_x96,
+    tick_to_sqrt_price,
+)
+from uniswap_liquidity.position_valuation import value_positions
+from uniswap_liquidity.tick_lens import TickLens
+from uniswap_liquidity.uni_v3_pool import V3LiquidityPool
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+BenchmarkResult = namedtuple("BenchmarkResult", "name ops_per_sec allocated_kib peak_kib")
+
+
+def measure(name: str, fn: Callable[[], int], min_time=0.2) -> BenchmarkResult:
+    """
+    Calls `fn`, which returns the number of operations it performed, until
+    `min_time` seconds have passed, then once more under tracemalloc.
+    """
+    fn()
+    ops, elapsed = 0, 0.0
+    while elapsed < min_time:
+        start = perf_counter()
+        ops += fn()
+        elapsed += perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        fn()
+        allocated, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchmarkResult(name, ops / elapsed, allocated / 1024, peak / 1024)
+
+
+def run_benchmarks(config: PoolConfig, min_time=0.2) -> List[BenchmarkResult]:
+    node, (address,) = make_node(config)
+    w3 = Web3(node)
+    tick_lens = TickLens(w3)
+    fake_pool = node.contracts[address.lower()][1]
+    pool = V3LiquidityPool(address, w3, tick_lens=tick_lens)
+    span_ticks = config.span * config.tick_spacing
+    pool.load_tick_range(-span_ticks, span_ticks)
+    positions = [(lower, upper) for (lower, upper, _) in make_positions(config)]
+
+    def construct():
+        V3LiquidityPool(address, w3, tick_lens=tick_lens)
+        return 1
+
+    def update():
+        pool.update()
+        return 1
+
+    def update_changed():
+        fake_pool.tick ^= 1
+        pool.update()
+        return 1
+
+    sqrt_price_up = tick_to_sqrt_price(span_ticks // 2)
+    sqrt_price_down = tick_to_sqrt_price(-span_ticks // 2)
+
+    def tokens_to_target_price():
+        get_tokens_to_target_price(pool, sqrt_price_up)
+        get_tokens_to_target_price(pool, sqrt_price_down)
+        return 2
+
+    def token_amounts():
+        for lower, upper in positions:
+            get_token_amounts(10**18, pool.sqrt_price_x96, lower, upper)
+        return len(positions)
+
+    def token_amounts_x96():
+        for lower, upper in positions:
+            get_token_amounts_x96(10**18, pool.sqrt_price_x96, lower, upper)
+        return len(positions)
+
+    position_liquidity = np.full(len(positions), 1e18)
+    position_lower, position_upper = np.array(positions).T
+
+    def position_values():
+        value_positions(pool.sqrt_price_x96, position_liquidity, position_lower, position_upper, 18, 18)
+        return len(positions)
+
+    walked_ticks = len(pool.tick_data.range(-span_ticks // 2, span_ticks // 2 + 1)[0])
+
+    def tick_walk():
+        # ops are initialized ticks crossed, i.e. tick-walk throughput
+        get_tokens_to_target_price_x96(pool, int(sqrt_price_up * 2**96))
+        get_tokens_to_target_price_x96(pool, int(sqrt_price_down * 2**96))
+        return walked_ticks
+
+    benchmarks = [
+        ("construction", construct),
+        ("update", update),
+        ("update_changed", update_changed),
+        ("get_tokens_to_target_price", tokens_to_target_price),
+        ("get_token_amounts", token_amounts),
+        ("get_token_amounts_x96", token_amounts_x96),
+        ("value_positions", position_values),
+        ("tick_walk", tick_walk),
+    ]
+    return [measure(name, fn, min_time) for name, fn in benchmarks]
+
+
+def load_baseline(path: str, config: PoolConfig) -> Dict[str, dict]:
+    """
+    Returns the baseline results recorded for `config`, or {} if none were.
+    """
+    try:
+        with open(path) as f:
+            baselines = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return baselines.get(config_key(config), {})
+
+
+def save_baseline(path: str, config: PoolConfig, results: List[BenchmarkResult]):
+    try:
+        with open(path) as f:
+            baselines = json.load(f)
+    except FileNotFoundError:
+        baselines = {}
+    baselines[config_key(config)] = {
+        result.name: {"ops_per_sec": result.ops_per_sec, "peak_kib": result.peak_kib} for result in results
+    }
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def find_regressions(results: List[BenchmarkResult], baseline: Dict[str, dict], tolerance=0.3) -> List[str]:
+    """
+    Returns a description of every result slower than its baseline, or
+    allocating more at peak, by more than `tolerance` (a fraction).
+    """
+    regressions = []
+    for result in results:
+        if result.name not in baseline:
+            continue
+        expected = baseline[result.name]
+        if result.ops_per_sec < expected["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{result.name}: {result.ops_per_sec:,.1f} ops/sec, baseline {expected['ops_per_sec']:,.1f}"
+            )
+        if result.peak_kib > expected["peak_kib"] * (1 + tolerance) + 1:
+            regressions.append(f"{result.name}: peak {result.peak_kib:,.1f} KiB, baseline {expected['peak_kib']:,.1f}")
+    return regressions
+
+
+def config_key(config: PoolConfig) -> str:
+    return ",".join(f"{field}={value}" for field, value in zip(config._fields, config))
+
+
+def main(argv=None):
+    defaults = PoolConfig()
+    parser = argparse.ArgumentParser(description="Offline benchmarks on synthetic pools")
+    parser.add_argument("--positions", type=int, default=defaults.positions)
+    parser.add_argument("--tick-spacing", type=int, default=defaults.tick_spacing)
+    parser.add_argument("--span", type=int, default=defaults.span, help="half-width of the pool, in tick spacings")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default=defaults.distribution)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to run each benchmark for")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    args = parser.parse_args(argv)
+
+    config = PoolConfig(args.positions, args.tick_spacing, args.span, args.distribution, defaults.liquidity, args.seed)
+    results = run_benchmarks(config, args.min_time)
+    baseline = load_baseline(args.baseline, config)
+
+    print(f"{'benchmark':<28}{'ops/sec':>14}{'baseline':>14}{'alloc KiB':>12}{'peak KiB':>12}")
+    for result in results:
+        expected = baseline.get(result.name, {}).get("ops_per_sec")
+        print(
+            f"{result.name:<28}{result.ops_per_sec:>14,.1f}"
+            f"{format(expected, ',.1f') if expected else '-':>14}"
+            f"{result.allocated_kib:>12,.1f}{result.peak_kib:>12,.1f}"
+        )
+
+    if args.save_baseline:
+        save_baseline(args.baseline, config, results)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
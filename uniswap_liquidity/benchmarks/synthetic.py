@@ -0,0 +1,61 @@
+"""
+Synthetic pools for the offline benchmarks.
+
+Positions are drawn from a seeded generator, so a given configuration always
+builds the same pool, and served by the in-process `FakeNode`: no ganache
+and no network connection are needed.
+"""
+import random
+from collections import namedtuple
+from typing import List, Tuple
+from uniswap_liquidity.testing.fake_node import FakeNode, FakePool
+
+DISTRIBUTIONS = ("uniform", "normal", "concentrated")
+
+PoolConfig = namedtuple("PoolConfig", "positions tick_spacing span distribution liquidity seed")
+PoolConfig.__new__.__defaults__ = (2000, 60, 2000, "uniform", 10**18, 0)
+
+
+def make_positions(config: PoolConfig) -> List[Tuple[int, int, int]]:
+    """
+    Returns `config.positions` (tickLower, tickUpper, liquidity) positions
+    with bounds within `config.span` tick spacings of tick 0.
+
+    "uniform" spreads the positions evenly, "normal" clusters them around
+    the current price, and "concentrated" puts 90% of them, with 10x the
+    liquidity, in the central 5% of the span.
+    """
+    if config.distribution not in DISTRIBUTIONS:
+        raise ValueError(f"unknown distribution {config.distribution}, expected one of {DISTRIBUTIONS}")
+    rng = random.Random(config.seed)
+    span = config.span
+    positions = []
+    for _ in range(config.positions):
+        liquidity = rng.randint(config.liquidity // 2, config.liquidity * 2)
+        if config.distribution == "uniform":
+            lower = rng.randrange(-span, span)
+        elif config.distribution == "normal":
+            lower = round(rng.gauss(0, span / 4))
+        elif rng.random() < 0.9:
+            lower = rng.randrange(-span // 20, span // 20 + 1)
+            liquidity *= 10
+        else:
+            lower = rng.randrange(-span, span)
+        lower = min(max(lower, -span), span - 1)
+        upper = min(lower + rng.randint(1, max(span // 10, 1)), span)
+        positions.append((lower * config.tick_spacing, upper * config.tick_spacing, liquidity))
+    return positions
+
+
+def make_node(config: PoolConfig, pools=1, tick=0) -> Tuple[FakeNode, List[str]]:
+    """
+    Returns a `FakeNode` serving `pools` copies of the synthetic pool, and
+    their addresses.
+    """
+    node = FakeNode()
+    positions = make_positions(config)
+    addresses = [
+        node.add_pool(f"0x{i + 1:040x}", FakePool.from_positions(positions, tick, tick_spacing=config.tick_spacing))
+        for i in range(pools)
+    ]
+    return node, addresses
@@ -0,0 +1,91 @@
+"""
+Block-pinned contract reads and a response cache shared between readers.
+
+A view call's result is fully determined by the contract, the function, its
+arguments and the block it runs at, so reads pinned to a block number can be
+cached under that key and reused by every pool, TickLens or analyzer reading
+the same block. Reads at a block tag ("latest") are never cached.
+"""
+import threading
+from collections import OrderedDict
+from uniswap_liquidity.metrics import RPC_METRICS, RpcMetrics
+from typing import Any, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class BlockCache:
+    """
+    Thread-safe LRU cache of contract call results keyed by
+    (address, function name, args, block number), holding at most
+    `max_entries` results.
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(function, block_number: int) -> Tuple:
+        return function.address, function.fn_name, tuple(function.args), block_number
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def call_at_block(
+    function, block_identifier="latest", cache: Optional[BlockCache] = None, metrics: RpcMetrics = RPC_METRICS
+):
+    """
+    `function.call()` at `block_identifier`, served from `cache` when the
+    block is a number and the same read was made before.
+    """
+    cacheable = cache is not None and isinstance(block_identifier, int)
+    if cacheable:
+        key = BlockCache.key(function, block_identifier)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+    with metrics.timer(function.fn_name):
+        value = function.call(block_identifier=block_identifier)
+    if cacheable:
+        cache.put(key, value)
+    return value
+
+
+def resolve_block_number(w3, block_identifier="latest", metrics: RpcMetrics = RPC_METRICS) -> int:
+    """
+    Returns the number of the block `block_identifier` (a number or a tag
+    like "latest") refers to.
+    """
+    if isinstance(block_identifier, int):
+        return block_identifier
+    if block_identifier == "latest":
+        with metrics.timer("eth_blockNumber"):
+            return w3.eth.block_number
+    with metrics.timer("eth_getBlockByNumber"):
+        return w3.eth.get_block(block_identifier)["number"]
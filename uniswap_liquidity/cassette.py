@@ -0,0 +1,178 @@
+"""
+Record/replay of JSON-RPC traffic, for deterministic offline runs.
+
+Wrap a live provider in a `RecordingProvider` to capture every request the
+pools, TickLens and Multicall make, save the cassette, and serve it again
+later from a `ReplayProvider` without a node:
+
+    recorder = RecordingProvider(HTTPProvider(url))
+    pool = V3LiquidityPool(address, Web3(recorder))
+    get_tokens_to_target_price(pool, target)
+    recorder.cassette.save("quote.json")
+
+    replay = ReplayProvider(Cassette.load("quote.json"))
+    pool = V3LiquidityPool(address, Web3(replay))
+    get_tokens_to_target_price(pool, target)
+    replay.count_calls("ticks")
+
+Interactions are keyed by method, params and block: reads against "latest"
+are pinned to the block the recording started at, so a cassette is a
+consistent view of one block and can hold several blocks side by side.
+"""
+import json
+from typing import Dict, List, Optional, Tuple
+from eth_utils import function_abi_to_4byte_selector
+from web3.providers.base import BaseProvider
+from uniswap_liquidity.abi.multicall3_abi import MULTICALL3_ABI
+from uniswap_liquidity.abi.tick_lens_abi import TICK_LENS_ABI
+from uniswap_liquidity.abi.uni_v3_lp_abi import V3_LP_ABI
+
+CASSETTE_VERSION = 1
+
+# position of the block parameter of the methods that take one
+_BLOCK_PARAM_INDEX = {
+    "eth_call": 1,
+    "eth_getBalance": 1,
+    "eth_getCode": 1,
+    "eth_getStorageAt": 2,
+    "eth_getTransactionCount": 1,
+}
+_BLOCK_TAGS = ("latest", "pending", "safe", "finalized")
+
+# function names by selector, to profile the recorded eth_calls
+_FUNCTION_NAMES = {
+    "0x" + function_abi_to_4byte_selector(entry).hex(): entry["name"]
+    for abi in (V3_LP_ABI, TICK_LENS_ABI, MULTICALL3_ABI)
+    for entry in abi
+    if entry.get("type") == "function"
+}
+
+
+class Cassette:
+    """
+    Recorded JSON-RPC responses, keyed by request and block.
+    """
+
+    def __init__(self, block_number: Optional[int] = None, interactions: Optional[Dict[str, dict]] = None):
+        self.block_number = block_number
+        self.interactions = dict(interactions or {})
+
+    def __len__(self):
+        return len(self.interactions)
+
+    @staticmethod
+    def key(method: str, params) -> str:
+        return json.dumps([method, params], sort_keys=True, default=str)
+
+    def pin(self, method: str, params, block_number: Optional[int] = None):
+        """
+        Returns `params` with a block tag replaced by `block_number`
+        (by default the cassette's block).
+        """
+        block_number = self.block_number if block_number is None else block_number
+        index = _BLOCK_PARAM_INDEX.get(method)
+        if block_number is None or index is None:
+            return params
+        params = list(params)
+        if len(params) <= index:
+            params.extend([None] * (index + 1 - len(params)))
+        if params[index] in _BLOCK_TAGS or params[index] is None:
+            params[index] = hex(block_number)
+        return params
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(
+                {"version": CASSETTE_VERSION, "block_number": self.block_number, "interactions": self.interactions},
+                f,
+                sort_keys=True,
+            )
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version {data.get('version')} in {path}")
+        return cls(data["block_number"], data["interactions"])
+
+
+class _CassetteProvider(BaseProvider):
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self.cassette = cassette
+        self.requests: List[Tuple[str, list]] = []
+
+    def count_calls(self, name=None) -> int:
+        """
+        Number of eth_calls served to the function `name` (any function
+        by default), e.g. `count_calls("ticks")`. Calls batched in a
+        multicall count as one `aggregate3`.
+        """
+        return sum(
+            1
+            for method, params in self.requests
+            if method == "eth_call" and (name is None or _FUNCTION_NAMES.get(params[0]["data"][:10]) == name)
+        )
+
+
+class RecordingProvider(_CassetteProvider):
+    """
+    Forwards requests to `provider` and records the responses in
+    `self.cassette`.
+
+    Unless `block_number` is given, the current block is read on the first
+    request and every later read is pinned to it.
+    """
+
+    def __init__(self, provider: BaseProvider, cassette: Optional[Cassette] = None, block_number: Optional[int] = None):
+        super().__init__(cassette if cassette is not None else Cassette(block_number))
+        self.provider = provider
+        if block_number is not None:
+            self.cassette.block_number = block_number
+
+    def is_connected(self, show_traceback=False):
+        return self.provider.is_connected(show_traceback)
+
+    def make_request(self, method, params):
+        if self.cassette.block_number is None:
+            response = self.provider.make_request("eth_blockNumber", [])
+            self.cassette.block_number = int(response["result"], 16)
+        if method == "eth_blockNumber":
+            return {"jsonrpc": "2.0", "id": 0, "result": hex(self.cassette.block_number)}
+
+        params = self.cassette.pin(method, params)
+        self.requests.append((method, params))
+        response = self.provider.make_request(method, params)
+        self.cassette.interactions[Cassette.key(method, params)] = {
+            key: value for key, value in response.items() if key in ("result", "error")
+        }
+        return response
+
+
+class ReplayProvider(_CassetteProvider):
+    """
+    Serves the responses recorded in `cassette`, without a node. Reads
+    against a block tag are answered as of `block_number`, by default the
+    block the cassette was recorded at.
+
+    Requests that were never recorded raise LookupError.
+    """
+
+    def __init__(self, cassette: Cassette, block_number: Optional[int] = None):
+        super().__init__(cassette)
+        self.block_number = cassette.block_number if block_number is None else block_number
+
+    def is_connected(self, show_traceback=False):
+        return True
+
+    def make_request(self, method, params):
+        if method == "eth_blockNumber":
+            return {"jsonrpc": "2.0", "id": 0, "result": hex(self.block_number)}
+        params = self.cassette.pin(method, params, self.block_number)
+        self.requests.append((method, params))
+        try:
+            recorded = self.cassette.interactions[Cassette.key(method, params)]
+        except KeyError:
+            raise LookupError(f"No recorded response for {method} {params}")
+        return {"jsonrpc": "2.0", "id": 0, **recorded}
@@ -0,0 +1,109 @@
+"""
+Shared contract factories and lightweight per-address contract handles.
+
+`w3.eth.contract(address=..., abi=...)` parses the ABI and builds a function
+and an event object for every entry on each call, which dominates the cost
+of constructing a pool. Here each ABI is turned into a contract factory once
+per process, detached from any node, and a contract at a given address is a
+`ContractHandle` that binds the factory's functions and events to its Web3
+instance and address when they are used.
+
+The factories keep no reference to the Web3 instances they serve, so a Web3
+instance and its contracts are freed as soon as the caller drops them.
+"""
+from typing import Dict, Tuple
+from eth_utils import is_checksum_address
+from web3 import AsyncWeb3, Web3
+
+# (id(abi), async) -> (abi, contract factory)
+_factories: Dict[Tuple[int, bool], Tuple[list, type]] = {}
+# factories are built against these provider-less instances; every call and
+# decoded event goes through the Web3 instance it is bound to instead
+_detached_w3 = {False: Web3(), True: AsyncWeb3()}
+
+
+def get_contract_factory(abi, asynchronous: bool = False):
+    """
+    Returns the contract factory for `abi`, or its `AsyncContract` version,
+    building it on first use. ABIs are identified by object, as they are
+    module-level constants.
+    """
+    key = id(abi), asynchronous
+    entry = _factories.get(key)
+    if entry is None or entry[0] is not abi:
+        entry = _factories[key] = (abi, _detached_w3[asynchronous].eth.contract(abi=abi))
+    return entry[1]
+
+
+class _Bound:
+    """
+    `contract.functions` or `contract.events` of a shared factory, creating
+    functions and events bound to `w3` and `address`.
+    """
+
+    __slots__ = ("_members", "_w3", "_address")
+
+    def __init__(self, members, w3, address):
+        self._members = members
+        self._w3 = w3
+        self._address = address
+
+    def __getattr__(self, name):
+        member = getattr(self._members, name)
+        w3, address = self._w3, self._address
+
+        def bind(*args, **kwargs):
+            bound = member(*args, **kwargs)
+            bound.w3 = w3
+            bound.address = address
+            return bound
+
+        return bind
+
+    __getitem__ = __getattr__
+
+
+class ContractHandle:
+    """
+    A contract at `address`, exposing `functions`, `events` and `w3` like a
+    web3 contract without building one per address. `caller` and any other
+    attribute fall back to a full web3 contract, built on first use.
+    """
+
+    __slots__ = ("address", "w3", "functions", "events", "_factory", "_contract")
+
+    def __init__(self, w3, factory, address):
+        if not is_checksum_address(address):
+            raise ValueError(f"{address} is not a checksummed address")
+        self.address = address
+        self.w3 = w3
+        self.functions = _Bound(factory.functions, w3, address)
+        self.events = _Bound(factory.events, w3, address)
+        self._factory = factory
+        self._contract = None
+
+    @property
+    def abi(self):
+        return self._factory.abi
+
+    def __getattr__(self, name):
+        if self._contract is None:
+            self._contract = self.w3.eth.contract(address=self.address, abi=self._factory.abi)
+        return getattr(self._contract, name)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.address})"
+
+
+def contract_at(w3, address, abi) -> ContractHandle:
+    """
+    Returns a handle to the contract at `address` with the given `abi`.
+    """
+    return ContractHandle(w3, get_contract_factory(abi, isinstance(w3, AsyncWeb3)), address)
+
+
+def events_of(w3, abi) -> _Bound:
+    """
+    The events of `abi`, bound to `w3`, to decode logs of any address.
+    """
+    return _Bound(get_contract_factory(abi, isinstance(w3, AsyncWeb3)).events, w3, None)
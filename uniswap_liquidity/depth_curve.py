@@ -0,0 +1,100 @@
+"""
+Vectorized depth quoting: the amount of token0/token1 that has to leave the
+pool to move its price to each of many target prices.
+"""
+from math import ceil, floor, log
+import numpy as np
+from uniswap_liquidity.uni_v3_pool import BaseV3LiquidityPool
+from uniswap_liquidity.v3_math import MIN_TICK, MAX_TICK, Q96, get_sqrt_ratio_at_tick
+
+_LOG_SQRT_10001 = log(1.0001) / 2
+
+
+class DepthCurve:
+    """
+    Piecewise closed form of `get_tokens_to_target_price` over
+    [tick_lower, tick_upper], built once from the pool's initialized ticks.
+
+    Each side of the current price is split into segments of constant
+    liquidity at the initialized ticks. For every segment we keep its
+    starting sqrt price, its liquidity, and the cumulative amount of tokens
+    leaving the pool before it, so a target price is answered with a
+    `searchsorted` plus one interpolation inside its segment.
+    """
+
+    def __init__(self, pool: BaseV3LiquidityPool, tick_lower: int, tick_upper: int):
+        self.tick_lower = tick_lower = max(tick_lower, MIN_TICK)
+        self.tick_upper = tick_upper = min(tick_upper, MAX_TICK)
+        pool.load_tick_range(tick_lower, tick_upper)
+        # pool state the curve was built from, see `V3PoolState.get_depth_curve`
+        self.state = (pool.block_number, pool.sqrt_price_x96, pool.liquidity)
+
+        self.sqrt_price = pool.sqrt_price_x96 / Q96
+        self.sqrt_price_min = get_sqrt_ratio_at_tick(tick_lower) / Q96
+        self.sqrt_price_max = get_sqrt_ratio_at_tick(tick_upper) / Q96
+
+        # price going up: cross ticks above the current tick, adding liquidityNet
+        ticks, liquidity_net, _ = pool.tick_data.range(pool.tick + 1, tick_upper + 1)
+        self._up_sqrt_prices, self._up_liquidity, self._up_amounts = self._build_side(
+            pool.liquidity, ticks, liquidity_net, zero_for_one=False
+        )
+        # price going down: cross ticks at or below the current tick, subtracting liquidityNet
+        ticks, liquidity_net, _ = pool.tick_data.range(tick_lower, pool.tick + 1)
+        self._down_sqrt_prices, self._down_liquidity, self._down_amounts = self._build_side(
+            pool.liquidity, ticks[::-1], [-net for net in reversed(liquidity_net)], zero_for_one=True
+        )
+
+    def _build_side(self, liquidity, ticks, liquidity_delta, zero_for_one):
+        sqrt_prices = np.array([self.sqrt_price] + [get_sqrt_ratio_at_tick(tick) / Q96 for tick in ticks])
+        segment_liquidity = float(liquidity) + np.concatenate(
+            ([0.0], np.cumsum(np.array(liquidity_delta, dtype=float)))
+        )
+        if zero_for_one:
+            # token1 out: L * (sqrt(P_a) - sqrt(P_b))
+            segment_amounts = segment_liquidity[:-1] * (sqrt_prices[:-1] - sqrt_prices[1:])
+        else:
+            # token0 out: L * (1 / sqrt(P_a) - 1 / sqrt(P_b))
+            segment_amounts = segment_liquidity[:-1] * (1 / sqrt_prices[:-1] - 1 / sqrt_prices[1:])
+        cumulative_amounts = np.concatenate(([0.0], np.cumsum(segment_amounts)))
+        return sqrt_prices, segment_liquidity, cumulative_amounts
+
+    def tokens_to_target_price(self, sqrt_target_price) -> float:
+        """
+        Scalar lookup, see `tokens_to_target_prices`.
+        """
+        return float(self.tokens_to_target_prices([sqrt_target_price])[0])
+
+    def tokens_to_target_prices(self, sqrt_target_prices) -> np.ndarray:
+        """
+        Vectorized `get_tokens_to_target_price`: token0 out for targets above
+        the current sqrt price, token1 out for targets below it.
+        """
+        targets = np.asarray(sqrt_target_prices, dtype=float)
+        if np.any(targets < self.sqrt_price_min) or np.any(targets > self.sqrt_price_max):
+            raise ValueError("target sqrt price outside of the depth curve range")
+        amounts = np.zeros_like(targets)
+
+        up = targets > self.sqrt_price
+        k = np.searchsorted(self._up_sqrt_prices, targets[up], side="right") - 1
+        start = self._up_sqrt_prices[k]
+        amounts[up] = self._up_amounts[k] + self._up_liquidity[k] * (1 / start - 1 / targets[up])
+
+        down = targets < self.sqrt_price
+        k = np.searchsorted(-self._down_sqrt_prices, -targets[down], side="right") - 1
+        start = self._down_sqrt_prices[k]
+        amounts[down] = self._down_amounts[k] + self._down_liquidity[k] * (start - targets[down])
+        return amounts
+
+
+def get_tokens_to_target_prices(pool: BaseV3LiquidityPool, sqrt_target_prices) -> np.ndarray:
+    """
+    Batch version of `liquidity_analyzer.get_tokens_to_target_price` for an
+    array of target sqrt prices, loading whatever tick words the grid spans.
+    Goes through the pool's cached depth curve.
+    """
+    targets = np.asarray(sqrt_target_prices, dtype=float)
+    if targets.size == 0:
+        return np.zeros_like(targets)
+    tick_lower = floor(log(targets.min()) / _LOG_SQRT_10001) - pool.tick_spacing
+    tick_upper = ceil(log(targets.max()) / _LOG_SQRT_10001) + pool.tick_spacing
+    return pool.get_depth_curve(tick_lower, tick_upper).tokens_to_target_prices(targets)
@@ -0,0 +1,32 @@
+"""
+Thread pool helpers shared by the readers that fan calls out concurrently:
+`prefetch_ticks`, `get_uncollected_fees` and the eth_getLogs backfill.
+"""
+import contextvars
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+def _submit_in_context(executor: Executor, fn, *args) -> Future:
+    """
+    `executor.submit(fn, *args)`, run in a copy of the current context so
+    that the calls count towards the enclosing metrics operation.
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+@contextmanager
+def _executor(executor: Optional[Executor], max_workers: int) -> Iterator[Executor]:
+    """
+    Yields `executor`, or a pool of `max_workers` threads that is shut down
+    when the block exits.
+    """
+    if executor is not None:
+        yield executor
+        return
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        yield executor
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
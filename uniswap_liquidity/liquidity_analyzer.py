@@ -1,49 +1,89 @@
-from web3 import Web3
-from math import log
-from uniswap_liquidity.uni_v3_pool import BaseV3LiquidityPool
+from uniswap_liquidity.metrics import pool_operation
+from uniswap_liquidity.v3_math import (
+    MIN_TICK,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MAX_SQRT_RATIO,
+    Q96,
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+    get_amount0_delta,
+    get_amount1_delta,
+)
+# the pure math lives in `liquidity_math` and is re-exported from here
+from uniswap_liquidity.liquidity_math import (
+    get_token_amounts,
+    get_token_amounts_x96,
+    sqrt_x96_price_to_price,
+    sqrt_x96_price_to_sqrt_price,
+    get_nearest_ticks,
+    tick_index_price,
+    tick_to_sqrt_price,
+    sqrt_price_to_tick,
+    calculate_token0_amount,
+    calculate_token1_amount,
+    get_tick_position_in_bitmap,
+)
 from collections import namedtuple
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # web3 and the pool ABIs are only needed by callers that build pools
+    from uniswap_liquidity.uni_v3_pool import BaseV3LiquidityPool
 
 Tick = namedtuple("Tick", "liquidityGross liquidityNet feeGrowthOutside0X128 feeGrowthOutside1X128 tickCumulativeOutside secondsPerLiquidityOutsideX128 secondsOutside initialized")
 
-def get_token_amounts(liquidity, sqrt_price_x96, tick_lower_bound, tick_upper_bound, token0_decimal, token1_decimal):
-    sqrt_ratio_a = tick_index_price(tick_lower_bound) ** 0.5
-    sqrt_ratio_b = tick_index_price(tick_upper_bound) ** 0.5
-    current_tick = log((sqrt_price_x96/2**96)**2)//log(1.0001)
-    sqrt_price = sqrt_x96_price_to_sqrt_price(sqrt_price_x96)
-    amount0wei = 0
-    amount1wei = 0
-    if current_tick <= tick_lower_bound:
-        amount0wei = liquidity * ((sqrt_ratio_b - sqrt_ratio_a) / (sqrt_ratio_a * sqrt_ratio_b))
-    if current_tick > tick_upper_bound:
-        amount1wei = liquidity * (sqrt_ratio_b - sqrt_ratio_a)
-    if tick_lower_bound <= current_tick < tick_upper_bound:
-        amount0wei = liquidity * ((sqrt_ratio_b - sqrt_price) / (sqrt_price * sqrt_ratio_b))
-        amount1wei = liquidity * (sqrt_price - sqrt_ratio_a)
-    
-    amount0 = amount0wei / (10 ** token0_decimal)
-    amount1 = amount1wei / (10 ** token1_decimal)
-    print(f"Amount Token0 wei: {amount0wei}")
-    print(f"Amount Token1 wei: {amount1wei}")
-    print(f"Amount Token0 : {amount0}")
-    print(f"Amount Token1 : {amount1}")
-    return amount0wei, amount1wei
-
-
-# TODO dynamic decimals
-def get_liquidity_within_sqrt_price_range(pool: BaseV3LiquidityPool, sqrt_price_low, sqrt_price_high):
-    tick_lower_bound = log(sqrt_price_low, 1.0001**0.5)
-    tick_upper_bound = log(sqrt_price_high, 1.0001**0.5)
-
-
-def get_tokens_to_target_price(pool: BaseV3LiquidityPool, sqrt_target_price):
+
+@pool_operation
+def get_liquidity_within_sqrt_price_range(pool: "BaseV3LiquidityPool", sqrt_price_low, sqrt_price_high):
+    # amounts of token0 and token1 (in wei) held by the liquidity between two
+    # sqrt prices: token1 below the current price, token0 above it. Queries 
+    # go through the pool's Fenwick-tree liquidity index, so they cost 
+    # O(log n) however many ticks the range spans
+    if sqrt_price_low >= sqrt_price_high:
+        raise ValueError(f"empty sqrt price range [{sqrt_price_low}, {sqrt_price_high}]")
+    sqrt_price_low_x96 = min(max(int(sqrt_price_low * Q96), MIN_SQRT_RATIO), MAX_SQRT_RATIO - 1)
+    sqrt_price_high_x96 = min(max(int(sqrt_price_high * Q96), MIN_SQRT_RATIO), MAX_SQRT_RATIO - 1)
+    tick_lower_bound = get_tick_at_sqrt_ratio(sqrt_price_low_x96)
+    tick_upper_bound = get_tick_at_sqrt_ratio(sqrt_price_high_x96)
+    pool.load_tick_range(min(tick_lower_bound, pool.tick), max(tick_upper_bound, pool.tick))
+    liquidity_index = pool.get_liquidity_index()
+
+    amount0 = amount1 = 0
+    if sqrt_price_low_x96 < pool.sqrt_price_x96:
+        if sqrt_price_high_x96 < pool.sqrt_price_x96:
+            sqrt_price_b_x96, tick_b = sqrt_price_high_x96, tick_upper_bound
+        else:
+            sqrt_price_b_x96, tick_b = pool.sqrt_price_x96, pool.tick
+        liquidity = liquidity_index.liquidity_at(tick_lower_bound, pool.tick, pool.liquidity)
+        _, amount1 = liquidity_index.token_amounts(
+            sqrt_price_low_x96, sqrt_price_b_x96, tick_lower_bound, tick_b, liquidity
+        )
+    if sqrt_price_high_x96 > pool.sqrt_price_x96:
+        if sqrt_price_low_x96 > pool.sqrt_price_x96:
+            sqrt_price_a_x96, tick_a = sqrt_price_low_x96, tick_lower_bound
+        else:
+            sqrt_price_a_x96, tick_a = pool.sqrt_price_x96, pool.tick
+        liquidity = liquidity_index.liquidity_at(tick_a, pool.tick, pool.liquidity)
+        amount0, _ = liquidity_index.token_amounts(
+            sqrt_price_a_x96, sqrt_price_high_x96, tick_a, tick_upper_bound, liquidity
+        )
+    return amount0, amount1
+
+
+@pool_operation
+def get_tokens_to_target_price(pool: "BaseV3LiquidityPool", sqrt_target_price, use_tick_map=True):
     # how much of X or Y tokens we need to *buy* to get to the target price?
+    if use_tick_map:
+        return _walk_tick_map_to_target_price(pool, sqrt_target_price)
+
     deltaTokens = 0
     sqrt_price_current = sqrt_x96_price_to_sqrt_price(pool.sqrt_price_x96)
     liquidity = pool.liquidity
     tick = pool.tick
     tick_lower, tick_upper = get_nearest_ticks(tick, pool.tick_spacing)
-    sqrt_price_lower = tick_index_price(tick_lower//2)
-    sqrt_price_upper = tick_index_price(tick_upper//2)
+    sqrt_price_lower = tick_to_sqrt_price(tick_lower)
+    sqrt_price_upper = tick_to_sqrt_price(tick_upper)
 
     if sqrt_target_price > sqrt_price_current:
         # too few Y in the pool; we need to buy some X to increase amount of Y in pool
@@ -53,22 +93,19 @@ def get_tokens_to_target_price(pool: BaseV3LiquidityPool, sqrt_target_price):
                 x = calculate_token0_amount(liquidity, sqrt_price_current,sqrt_price_lower, sqrt_price_upper)
                 deltaTokens += x
                 # query the blockchain for liquidity in the next tick range
-                nextTickRange = Tick(*pool._pool_contract.caller.ticks(tick_upper))
+                nextTickRange = Tick(*pool.get_tick(tick_upper))
                 liquidity += nextTickRange.liquidityNet
                 # adjust the price and the range limits
                 sqrt_price_current = sqrt_price_upper
                 tick_lower = tick_upper
                 tick_upper += pool.tick_spacing
                 sqrt_price_lower = sqrt_price_upper
-                sqrt_price_upper = tick_index_price(tick_upper // 2)
+                sqrt_price_upper = tick_to_sqrt_price(tick_upper)
             else:
                 # in the current price range
                 x = calculate_token0_amount(liquidity, sqrt_price_current, sqrt_price_lower, sqrt_target_price)
                 deltaTokens += x
                 sqrt_price_current = sqrt_target_price
-        print("need to buy {:.10f} X tokens".format(deltaTokens / 10 ** 18))
-        
-
     elif sqrt_target_price < sqrt_price_current:
         # too much Y in the pool; we need to buy some Y to decrease amount of Y in pool
         currentTickRange = None
@@ -79,49 +116,113 @@ def get_tokens_to_target_price(pool: BaseV3LiquidityPool, sqrt_target_price):
                 deltaTokens += y
                 if currentTickRange is None:
                     # query the blockchain for liquidityNet in the *current* tick range
-                    currentTickRange = Tick(*pool._pool_contract.caller.ticks(tick_lower))
+                    currentTickRange = Tick(*pool.get_tick(tick_lower))
                 liquidity -= currentTickRange.liquidityNet
                 # adjust the price and the range limits
                 sqrt_price_current = sqrt_price_lower
                 tick_upper = tick_lower
                 tick_lower -= pool.tick_spacing
                 sqrt_price_upper = sqrt_price_lower
-                sqrt_price_lower = tick_index_price(tick_lower // 2)
+                sqrt_price_lower = tick_to_sqrt_price(tick_lower)
                 # query the blockchain for liquidityNet in new current tick range
-                currentTickRange = Tick(*pool._pool_contract.caller.ticks(tick_lower))
+                currentTickRange = Tick(*pool.get_tick(tick_lower))
             else:
                 # in the current price range
                 y = calculate_token1_amount(liquidity, sqrt_price_current, sqrt_target_price, sqrt_price_upper)
                 deltaTokens += y
                 sqrt_price_current = sqrt_target_price
-        print("need to buy {:.10f} Y tokens".format(deltaTokens / 10 ** 18))
-        
-    
     return deltaTokens
 
-def sqrt_x96_price_to_price(sqrtPriceX96):
-    return (sqrtPriceX96 ** 2) / ((2 ** 96) ** 2)
+@pool_operation
+async def get_tokens_to_target_price_async(pool, sqrt_target_price):
+    # `get_tokens_to_target_price` for an `AsyncBaseV3LiquidityPool`: the walk
+    # itself never touches the node, so load every word between the current
+    # and the target price concurrently first
+    target_tick = sqrt_price_to_tick(sqrt_target_price)
+    await pool.load_tick_range(
+        min(pool.tick, target_tick) - pool.tick_spacing,
+        max(pool.tick, target_tick) + pool.tick_spacing,
+    )
+    # unwrapped, so the quote is recorded once, as this operation
+    return get_tokens_to_target_price.__wrapped__(pool, sqrt_target_price)
 
-def sqrt_x96_price_to_sqrt_price(sqrtPriceX96):
-    return sqrtPriceX96/(1 << 96)
+@pool_operation
+def get_tokens_to_target_price_x96(pool: "BaseV3LiquidityPool", sqrt_price_target_x96: int) -> int:
+    # exact integer version of `get_tokens_to_target_price`: returns the amount
+    # of token0 (price going up) or token1 (price going down) leaving the pool,
+    # rounded down per tick range exactly like SwapMath does
+    if not MIN_SQRT_RATIO < sqrt_price_target_x96 < MAX_SQRT_RATIO:
+        raise ValueError(f"target sqrt price {sqrt_price_target_x96} out of range")
 
-def get_nearest_ticks(tick: int, tick_spacing: int):
-    tick_below = (tick//tick_spacing) * tick_spacing
-    tick_above = tick_below + tick_spacing
-    return tick_below, tick_above
+    delta_tokens = 0
+    sqrt_price_x96 = pool.sqrt_price_x96
+    liquidity = pool.liquidity
+    tick = pool.tick
 
-def tick_index_price(tick_index: int):
-    return 1.0001**tick_index
+    while sqrt_price_target_x96 > sqrt_price_x96:
+        tick_next, initialized = pool.next_initialized_tick_within_one_word(tick, lte=False)
+        tick_next = min(tick_next, MAX_TICK)
+        sqrt_price_next_x96 = get_sqrt_ratio_at_tick(tick_next)
+        sqrt_price_step_x96 = min(sqrt_price_next_x96, sqrt_price_target_x96)
+        delta_tokens += get_amount0_delta(sqrt_price_x96, sqrt_price_step_x96, liquidity, False)
+        if sqrt_price_step_x96 == sqrt_price_next_x96:
+            if initialized:
+                liquidity += pool.tick_data[tick_next][0]
+            tick = tick_next
+        sqrt_price_x96 = sqrt_price_step_x96
 
-def calculate_token0_amount(liquidity, sqrt_price_curr, sqrt_price_low, sqrt_price_high):
-    sqrt_price_curr = max(min(sqrt_price_curr, sqrt_price_high), sqrt_price_low)
-    return liquidity * (sqrt_price_high - sqrt_price_curr) / (sqrt_price_curr * sqrt_price_high)
+    while sqrt_price_target_x96 < sqrt_price_x96:
+        tick_next, initialized = pool.next_initialized_tick_within_one_word(tick, lte=True)
+        tick_next = max(tick_next, MIN_TICK)
+        sqrt_price_next_x96 = get_sqrt_ratio_at_tick(tick_next)
+        sqrt_price_step_x96 = max(sqrt_price_next_x96, sqrt_price_target_x96)
+        delta_tokens += get_amount1_delta(sqrt_price_step_x96, sqrt_price_x96, liquidity, False)
+        if sqrt_price_step_x96 == sqrt_price_next_x96:
+            if initialized:
+                liquidity -= pool.tick_data[tick_next][0]
+            tick = tick_next - 1
+        sqrt_price_x96 = sqrt_price_step_x96
 
-def calculate_token1_amount(liquidity, sqrt_price_curr, sqrt_price_low, sqrt_price_high):
-    sqrt_price_curr = max(min(sqrt_price_curr, sqrt_price_high), sqrt_price_low)
-    return liquidity * (sqrt_price_curr - sqrt_price_low)
+    return delta_tokens
 
-def get_tick_position_in_bitmap(tick:int):
-    word_index = tick >> 8
-    tick_index_in_word = tick % 256
-    return word_index, tick_index_in_word
\ No newline at end of file
+def _walk_tick_map_to_target_price(pool: "BaseV3LiquidityPool", sqrt_target_price):
+    # same walk as above, but jumping between *initialized* ticks using the
+    # pool's cached tick map; missing words are fetched through TickLens
+    deltaTokens = 0
+    sqrt_price_current = sqrt_x96_price_to_sqrt_price(pool.sqrt_price_x96)
+    liquidity = pool.liquidity
+    tick = pool.tick
+
+    if sqrt_target_price > sqrt_price_current:
+        sqrt_target_price = min(sqrt_target_price, tick_to_sqrt_price(MAX_TICK))
+        while sqrt_target_price > sqrt_price_current:
+            tick_next, initialized = pool.next_initialized_tick_within_one_word(tick, lte=False)
+            tick_next = min(tick_next, MAX_TICK)
+            sqrt_price_next = tick_to_sqrt_price(tick_next)
+            if sqrt_target_price > sqrt_price_next:
+                # target is past the next tick; use all X up to it and cross it
+                deltaTokens += calculate_token0_amount(liquidity, sqrt_price_current, sqrt_price_current, sqrt_price_next)
+                if initialized:
+                    liquidity += pool.tick_data[tick_next][0]
+                tick = tick_next
+                sqrt_price_current = sqrt_price_next
+            else:
+                deltaTokens += calculate_token0_amount(liquidity, sqrt_price_current, sqrt_price_current, sqrt_target_price)
+                sqrt_price_current = sqrt_target_price
+    elif sqrt_target_price < sqrt_price_current:
+        sqrt_target_price = max(sqrt_target_price, tick_to_sqrt_price(MIN_TICK))
+        while sqrt_target_price < sqrt_price_current:
+            tick_next, initialized = pool.next_initialized_tick_within_one_word(tick, lte=True)
+            tick_next = max(tick_next, MIN_TICK)
+            sqrt_price_next = tick_to_sqrt_price(tick_next)
+            if sqrt_target_price < sqrt_price_next:
+                # target is below the next tick; use all Y down to it and cross it
+                deltaTokens += calculate_token1_amount(liquidity, sqrt_price_current, sqrt_price_next, sqrt_price_current)
+                if initialized:
+                    liquidity -= pool.tick_data[tick_next][0]
+                tick = tick_next - 1
+                sqrt_price_current = sqrt_price_next
+            else:
+                deltaTokens += calculate_token1_amount(liquidity, sqrt_price_current, sqrt_target_price, sqrt_price_current)
+                sqrt_price_current = sqrt_target_price
+    return deltaTokens
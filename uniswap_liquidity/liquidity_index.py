@@ -0,0 +1,160 @@
+from bisect import bisect_right
+from typing import List, Sequence
+from uniswap_liquidity.tick_index import TickIndex
+from uniswap_liquidity.v3_math import Q96, get_sqrt_ratio_at_tick
+
+Q192 = Q96 * Q96
+
+
+class FenwickTree:
+    """
+    Binary indexed tree over a fixed number of slots: point updates and
+    prefix sums in O(log n). Slots hold Python ints, so sums are exact.
+    """
+
+    __slots__ = ("_tree",)
+
+    def __init__(self, values: Sequence[int]):
+        # O(n) construction: push each node's partial sum to its parent
+        tree = [0] + list(values)
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def __len__(self):
+        return len(self._tree) - 1
+
+    def values(self) -> List[int]:
+        """
+        The slot values, in O(n) by undoing the construction.
+        """
+        tree = list(self._tree)
+        for i in range(len(tree) - 1, 0, -1):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] -= tree[i]
+        return tree[1:]
+
+    def add(self, i: int, delta: int):
+        i += 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, i: int) -> int:
+        """
+        Sum of slots [0, i).
+        """
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+
+class LiquidityIndex:
+    """
+    Prefix sums of liquidityNet over the initialized ticks of a span of
+    bitmap words, kept in three Fenwick trees: liquidityNet itself, and
+    liquidityNet weighted by sqrt(P) and 1 / sqrt(P) at each tick (both in
+    Q96). The trees have one slot per initialized tick, in tick order, so
+    their size doesn't depend on how wide the span is.
+
+    The weighted sums give the token amounts in a price range in closed
+    form. Over a range [a, b] with active liquidity L at a, crossing the
+    initialized ticks j in (a, b]:
+
+        amount1 = L * (sqrt(b) - sqrt(a)) + sum(net_j) * sqrt(b) - sum(net_j * sqrt(j))
+        amount0 = L * (1/sqrt(a) - 1/sqrt(b)) + sum(net_j / sqrt(j)) - sum(net_j) / sqrt(b)
+
+    so both range queries and liquidity updates of initialized ticks are
+    O(log n). A tick that becomes initialized is inserted in O(n).
+    """
+
+    def __init__(self, tick_data: TickIndex, tick_spacing: int, word_lower: int, word_upper: int):
+        self.tick_spacing = tick_spacing
+        self.compressed_lower = word_lower << 8
+        self.compressed_upper = ((word_upper + 1) << 8) - 1
+        ticks, nets, _ = tick_data.range(self.tick_lower, self.tick_upper + tick_spacing)
+        self._ticks: List[int] = list(ticks)
+        self._build(list(nets))
+
+    def _build(self, liquidity_net: List[int]):
+        weighted_sqrt: List[int] = []
+        weighted_inverse_sqrt: List[int] = []
+        for tick, net in zip(self._ticks, liquidity_net):
+            sqrt_price_x96 = get_sqrt_ratio_at_tick(tick)
+            weighted_sqrt.append(net * sqrt_price_x96)
+            weighted_inverse_sqrt.append(net * (Q192 // sqrt_price_x96))
+        self._liquidity_net = FenwickTree(liquidity_net)
+        self._weighted_sqrt = FenwickTree(weighted_sqrt)
+        self._weighted_inverse_sqrt = FenwickTree(weighted_inverse_sqrt)
+
+    @property
+    def tick_lower(self) -> int:
+        return self.compressed_lower * self.tick_spacing
+
+    @property
+    def tick_upper(self) -> int:
+        return self.compressed_upper * self.tick_spacing
+
+    def covers(self, tick: int) -> bool:
+        return self.compressed_lower <= tick // self.tick_spacing <= self.compressed_upper
+
+    def _slots_through(self, tick: int) -> int:
+        # number of initialized ticks <= `tick`
+        if not self.covers(tick):
+            raise IndexError(f"tick {tick} outside of [{self.tick_lower}, {self.tick_upper}]")
+        return bisect_right(self._ticks, tick)
+
+    def add(self, tick: int, liquidity_net_delta: int):
+        """
+        Adds `liquidity_net_delta` to liquidityNet at `tick`, inserting the
+        tick if it wasn't initialized.
+        """
+        i = self._slots_through(tick) - 1
+        if i < 0 or self._ticks[i] != tick:
+            liquidity_net = self._liquidity_net.values()
+            i += 1
+            self._ticks.insert(i, tick)
+            liquidity_net.insert(i, liquidity_net_delta)
+            self._build(liquidity_net)
+            return
+        sqrt_price_x96 = get_sqrt_ratio_at_tick(tick)
+        self._liquidity_net.add(i, liquidity_net_delta)
+        self._weighted_sqrt.add(i, liquidity_net_delta * sqrt_price_x96)
+        self._weighted_inverse_sqrt.add(i, liquidity_net_delta * (Q192 // sqrt_price_x96))
+
+    def net_through(self, tick: int) -> int:
+        """
+        Sum of liquidityNet over the initialized ticks <= `tick` in the span.
+        """
+        return self._liquidity_net.prefix_sum(self._slots_through(tick))
+
+    def liquidity_at(self, tick: int, current_tick: int, current_liquidity: int) -> int:
+        """
+        Active liquidity at `tick`, given the pool's active liquidity at its
+        current tick.
+        """
+        return current_liquidity + self.net_through(tick) - self.net_through(current_tick)
+
+    def token_amounts(
+        self, sqrt_price_a_x96: int, sqrt_price_b_x96: int, tick_a: int, tick_b: int, liquidity_a: int
+    ):
+        """
+        (amount0, amount1) held between two sqrt prices, where `tick_a` and
+        `tick_b` are their ticks and `liquidity_a` is the active liquidity
+        at `sqrt_price_a_x96`. amount0 values the range as if the price sat
+        below it, amount1 as if it sat above it.
+        """
+        i, j = self._slots_through(tick_a), self._slots_through(tick_b)
+        net = self._liquidity_net.prefix_sum(j) - self._liquidity_net.prefix_sum(i)
+        weighted_sqrt = self._weighted_sqrt.prefix_sum(j) - self._weighted_sqrt.prefix_sum(i)
+        weighted_inverse_sqrt = self._weighted_inverse_sqrt.prefix_sum(j) - self._weighted_inverse_sqrt.prefix_sum(i)
+
+        amount1_x96 = liquidity_a * (sqrt_price_b_x96 - sqrt_price_a_x96) + net * sqrt_price_b_x96 - weighted_sqrt
+        inverse_a, inverse_b = Q192 // sqrt_price_a_x96, Q192 // sqrt_price_b_x96
+        amount0_x96 = liquidity_a * (inverse_a - inverse_b) + weighted_inverse_sqrt - net * inverse_b
+        return amount0_x96 // Q96, amount1_x96 // Q96
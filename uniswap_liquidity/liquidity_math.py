@@ -0,0 +1,102 @@
+"""
+Pure price and amount math: tick <-> price conversions and token amounts of
+liquidity ranges, as floats or exact integers.
+
+Nothing here depends on web3 or the ABIs, so processes that only do math
+can import this module, or `v3_math`, in a few milliseconds.
+"""
+import warnings
+from functools import lru_cache
+from numbers import Integral
+from uniswap_liquidity.v3_math import (
+    MIN_TICK,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    Q96,
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+    get_amounts_for_liquidity,
+)
+
+def get_token_amounts(
+    liquidity, sqrt_price_x96, tick_lower_bound, tick_upper_bound, token0_decimal=None, token1_decimal=None
+):
+    if token0_decimal is not None or token1_decimal is not None:
+        # amounts have been in wei since the decimals stopped being used
+        warnings.warn(
+            "get_token_amounts ignores token0_decimal and token1_decimal, which will be removed",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+    sqrt_ratio_a = tick_index_price(tick_lower_bound) ** 0.5
+    sqrt_ratio_b = tick_index_price(tick_upper_bound) ** 0.5
+    current_tick = get_tick_at_sqrt_ratio(sqrt_price_x96)
+    sqrt_price = sqrt_x96_price_to_sqrt_price(sqrt_price_x96)
+    amount0wei = 0
+    amount1wei = 0
+    if current_tick <= tick_lower_bound:
+        amount0wei = liquidity * ((sqrt_ratio_b - sqrt_ratio_a) / (sqrt_ratio_a * sqrt_ratio_b))
+    if current_tick > tick_upper_bound:
+        amount1wei = liquidity * (sqrt_ratio_b - sqrt_ratio_a)
+    if tick_lower_bound <= current_tick < tick_upper_bound:
+        amount0wei = liquidity * ((sqrt_ratio_b - sqrt_price) / (sqrt_price * sqrt_ratio_b))
+        amount1wei = liquidity * (sqrt_price - sqrt_ratio_a)
+    # amounts are returned in wei; `position_valuation.value_positions`
+    # values many positions at once, in whole tokens
+    return amount0wei, amount1wei
+
+def get_token_amounts_x96(liquidity, sqrt_price_x96, tick_lower_bound, tick_upper_bound):
+    # exact integer version of `get_token_amounts`, rounding down like the pool does
+    return get_amounts_for_liquidity(
+        sqrt_price_x96,
+        get_sqrt_ratio_at_tick(tick_lower_bound),
+        get_sqrt_ratio_at_tick(tick_upper_bound),
+        liquidity,
+    )
+
+def sqrt_x96_price_to_price(sqrtPriceX96):
+    return (sqrtPriceX96 ** 2) / ((2 ** 96) ** 2)
+
+def sqrt_x96_price_to_sqrt_price(sqrtPriceX96):
+    return sqrtPriceX96/(1 << 96)
+
+def get_nearest_ticks(tick: int, tick_spacing: int):
+    tick_below = (tick//tick_spacing) * tick_spacing
+    tick_above = tick_below + tick_spacing
+    return tick_below, tick_above
+
+def tick_index_price(tick_index: int):
+    # integer ticks in the TickMath range go through the exact, memoized
+    # conversion; anything else (e.g. a fractional tick) is priced as before
+    if isinstance(tick_index, Integral) and MIN_TICK <= tick_index <= MAX_TICK:
+        return tick_to_sqrt_price(int(tick_index)) ** 2
+    return 1.0001**tick_index
+
+@lru_cache(maxsize=1 << 14)
+def tick_to_sqrt_price(tick_index: int):
+    # memoized on top of the (also memoized) exact TickMath conversion
+    return get_sqrt_ratio_at_tick(tick_index) / Q96
+
+def sqrt_price_to_tick(sqrt_price):
+    # inverse of `tick_to_sqrt_price`: the greatest tick whose sqrt price is
+    # at or below `sqrt_price`, clamped to the valid tick range
+    sqrt_price = min(max(sqrt_price, tick_to_sqrt_price(MIN_TICK)), tick_to_sqrt_price(MAX_TICK - 1))
+    tick = get_tick_at_sqrt_ratio(max(int(sqrt_price * Q96), MIN_SQRT_RATIO))
+    # the float forward conversion rounds, so a tick's own sqrt price can
+    # land just below its exact ratio
+    if tick < MAX_TICK - 1 and tick_to_sqrt_price(tick + 1) <= sqrt_price:
+        tick += 1
+    return tick
+
+def calculate_token0_amount(liquidity, sqrt_price_curr, sqrt_price_low, sqrt_price_high):
+    sqrt_price_curr = max(min(sqrt_price_curr, sqrt_price_high), sqrt_price_low)
+    return liquidity * (sqrt_price_high - sqrt_price_curr) / (sqrt_price_curr * sqrt_price_high)
+
+def calculate_token1_amount(liquidity, sqrt_price_curr, sqrt_price_low, sqrt_price_high):
+    sqrt_price_curr = max(min(sqrt_price_curr, sqrt_price_high), sqrt_price_low)
+    return liquidity * (sqrt_price_curr - sqrt_price_low)
+
+def get_tick_position_in_bitmap(tick:int):
+    word_index = tick >> 8
+    tick_index_in_word = tick % 256
+    return word_index, tick_index_in_word
\ No newline at end of file
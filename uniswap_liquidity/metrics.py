@@ -0,0 +1,217 @@
+"""
+Instrumentation of the contract calls made by pools, TickLens and Multicall.
+
+Every call is counted by method and timed into a latency histogram. Calls
+made inside an `operation()` block, such as a pool construction or a quote,
+are also attributed to that operation, so the quotes that fan out into
+hundreds of calls can be found:
+
+    with RPC_METRICS.operation("quote") as cost:
+        get_tokens_to_target_price(pool, target)
+    cost.calls, cost.seconds
+
+Objects record into the shared `RPC_METRICS` unless given their own
+`RpcMetrics`. Export is either pull, through `to_prometheus()`, or push,
+through the `on_call` / `on_operation` callbacks.
+"""
+import inspect
+import threading
+from bisect import bisect_left
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Deque, Dict, List, Optional
+
+# upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# upper bounds of the calls-per-operation histogram buckets
+CALL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# operations in progress in the current thread or task, innermost last
+_active_operations: ContextVar[tuple] = ContextVar("active_operations", default=())
+
+
+class Histogram:
+    """
+    Cumulative histogram in the Prometheus sense: `counts[i]` is the number of
+    observations <= `buckets[i]`, the last slot counting everything.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> List[int]:
+        total, counts = 0, []
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+
+class OperationCost:
+    """
+    Calls made, by method, and wall time spent during one operation.
+    """
+
+    __slots__ = ("name", "calls", "seconds")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls: Counter = Counter()
+        self.seconds = 0.0
+
+    @property
+    def call_count(self) -> int:
+        return sum(self.calls.values())
+
+    def __repr__(self):
+        return f"OperationCost({self.name!r}, calls={self.call_count}, seconds={self.seconds:.6f})"
+
+
+class RpcMetrics:
+    """
+    Call counts and latency histograms by method, and the cost of the last
+    `keep_operations` operations.
+
+    `on_call(method, seconds)` is called after every call and
+    `on_operation(cost)` after every operation.
+    """
+
+    def __init__(
+        self,
+        on_call: Optional[Callable[[str, float], None]] = None,
+        on_operation: Optional[Callable[[OperationCost], None]] = None,
+        keep_operations: int = 1000,
+    ):
+        self.on_call = on_call
+        self.on_operation = on_operation
+        self.calls: Counter = Counter()
+        self.latency: Dict[str, Histogram] = {}
+        self.operation_calls: Dict[str, Histogram] = {}
+        self.operation_seconds: Dict[str, Histogram] = {}
+        self.operations: Deque[OperationCost] = deque(maxlen=keep_operations)
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self.latency.clear()
+            self.operation_calls.clear()
+            self.operation_seconds.clear()
+            self.operations.clear()
+
+    def record(self, method: str, seconds: float):
+        with self._lock:
+            self.calls[method] += 1
+            histogram = self.latency.get(method)
+            if histogram is None:
+                histogram = self.latency[method] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+        for cost in _active_operations.get():
+            cost.calls[method] += 1
+        if self.on_call is not None:
+            self.on_call(method, seconds)
+
+    @contextmanager
+    def timer(self, method: str):
+        """
+        Records the call made inside the block, whether it succeeds or not.
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(method, perf_counter() - start)
+
+    @contextmanager
+    def operation(self, name: str):
+        """
+        Attributes the calls made inside the block to an operation named
+        `name`, and yields its `OperationCost`. Operations nest: a call
+        counts towards every enclosing operation.
+        """
+        cost = OperationCost(name)
+        token = _active_operations.set(_active_operations.get() + (cost,))
+        start = perf_counter()
+        try:
+            yield cost
+        finally:
+            cost.seconds = perf_counter() - start
+            _active_operations.reset(token)
+            with self._lock:
+                self.operations.append(cost)
+                for histograms, buckets, value in (
+                    (self.operation_calls, CALL_COUNT_BUCKETS, cost.call_count),
+                    (self.operation_seconds, LATENCY_BUCKETS, cost.seconds),
+                ):
+                    histogram = histograms.get(name)
+                    if histogram is None:
+                        histogram = histograms[name] = Histogram(buckets)
+                    histogram.observe(value)
+            if self.on_operation is not None:
+                self.on_operation(cost)
+
+    def most_expensive(self, n: int = 10) -> List[OperationCost]:
+        """
+        The `n` recent operations that made the most calls.
+        """
+        return sorted(self.operations, key=lambda cost: cost.call_count, reverse=True)[:n]
+
+    def to_prometheus(self, prefix: str = "uniswap_liquidity") -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        lines = [f"# TYPE {prefix}_rpc_calls_total counter"]
+        with self._lock:
+            for method, count in sorted(self.calls.items()):
+                lines.append(f'{prefix}_rpc_calls_total{{method="{method}"}} {count}')
+            for name, label, histograms in (
+                ("rpc_latency_seconds", "method", self.latency),
+                ("operation_rpc_calls", "operation", self.operation_calls),
+                ("operation_seconds", "operation", self.operation_seconds),
+            ):
+                lines.append(f"# TYPE {prefix}_{name} histogram")
+                for value, histogram in sorted(histograms.items()):
+                    bounds = [repr(float(bound)) for bound in histogram.buckets] + ["+Inf"]
+                    for bound, count in zip(bounds, histogram.cumulative_counts()):
+                        lines.append(f'{prefix}_{name}_bucket{{{label}="{value}",le="{bound}"}} {count}')
+                    lines.append(f'{prefix}_{name}_sum{{{label}="{value}"}} {histogram.sum}')
+                    lines.append(f'{prefix}_{name}_count{{{label}="{value}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+RPC_METRICS = RpcMetrics()
+
+
+def pool_operation(fn):
+    """
+    Decorator recording each call of `fn(pool, ...)` as an operation of the
+    pool's metrics, named after the function. Works on coroutines too.
+    """
+    if inspect.iscoroutinefunction(fn):
+
+        @wraps(fn)
+        async def wrapper(pool, *args, **kwargs):
+            with pool.metrics.operation(fn.__name__):
+                return await fn(pool, *args, **kwargs)
+
+    else:
+
+        @wraps(fn)
+        def wrapper(pool, *args, **kwargs):
+            with pool.metrics.operation(fn.__name__):
+                return fn(pool, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,154 @@
+from eth_utils import get_abi_output_types, to_checksum_address
+from uniswap_liquidity.abi.multicall3_abi import MULTICALL3_ABI
+from uniswap_liquidity.block_cache import BlockCache
+from uniswap_liquidity.contracts import contract_at
+from uniswap_liquidity.metrics import RPC_METRICS, RpcMetrics
+from web3 import Web3
+from web3.contract.contract import ContractFunction
+from typing import Any, List, Sequence, Tuple
+
+# Multicall3 is deployed at the same address on mainnet and most other chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+_MISSING = object()
+
+
+class Multicall:
+    """
+    Batches view calls into `Multicall3.aggregate3`, so that any number of
+    contract reads costs a single eth_call (or one per `max_calls` chunk).
+
+    Calls are passed as bound contract functions, e.g.
+    `pool._pool_contract.functions.slot0()`, and results are decoded the
+    same way `contract.caller` would return them. With a `cache`, calls at a
+    block number that were made before are not sent again.
+    """
+
+    def __init__(
+        self,
+        w3: Web3,
+        address=MULTICALL3_ADDRESS,
+        max_calls: int = 1000,
+        metrics: RpcMetrics = None,
+        cache: BlockCache = None,
+    ):
+        self.w3 = w3
+        self.max_calls = max_calls
+        self.metrics = metrics if metrics is not None else RPC_METRICS
+        self.cache = cache
+        try:
+            self._multicall_contract = contract_at(w3, address, MULTICALL3_ABI)
+        except:
+            raise RuntimeError(f"Could not create Multicall3 contract for {address}")
+
+    def aggregate(
+        self,
+        calls: Sequence[ContractFunction],
+        block_identifier="latest",
+        allow_failure: bool = False,
+    ) -> List[Any]:
+        """
+        Executes `calls` and returns their decoded results in order. Failed
+        calls raise a RuntimeError, or come back as None when
+        `allow_failure` is set.
+        """
+        if self.cache is None or not isinstance(block_identifier, int):
+            return self._aggregate(calls, block_identifier, allow_failure)
+
+        keys = [BlockCache.key(call, block_identifier) for call in calls]
+        results = [self.cache.get(key, _MISSING) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is _MISSING]
+        fetched = self._aggregate([calls[i] for i in missing], block_identifier, allow_failure)
+        for i, result in zip(missing, fetched):
+            results[i] = result
+            if result is not None:
+                self.cache.put(keys[i], result)
+        return results
+
+    def aggregate_at_block(
+        self,
+        calls: Sequence[ContractFunction],
+        block_identifier="latest",
+        allow_failure: bool = False,
+    ) -> Tuple[int, List[Any]]:
+        """
+        `aggregate()`, also returning the number of the block the calls ran
+        at. A block tag is resolved in the first eth_call, through
+        `getBlockNumber()`, and any further chunks are sent at that block
+        number, so the results and the block always match.
+        """
+        if isinstance(block_identifier, int):
+            return block_identifier, self.aggregate(calls, block_identifier, allow_failure)
+        head = self.max_calls - 1
+        block_number, *results = self._aggregate(
+            [self._multicall_contract.functions.getBlockNumber(), *calls[:head]], block_identifier, allow_failure
+        )
+        if self.cache is not None:
+            for call, result in zip(calls, results):
+                if result is not None:
+                    self.cache.put(BlockCache.key(call, block_number), result)
+        if len(calls) > head:
+            results += self.aggregate(calls[head:], block_number, allow_failure)
+        return block_number, results
+
+    def _aggregate(self, calls, block_identifier, allow_failure):
+        results = []
+        for start in range(0, len(calls), self.max_calls):
+            chunk = calls[start : start + self.max_calls]
+            with self.metrics.timer("aggregate3"):
+                return_data = self._multicall_contract.functions.aggregate3(
+                    [(call.address, allow_failure, call._encode_transaction_data()) for call in chunk]
+                ).call(block_identifier=block_identifier)
+            for call, (success, data) in zip(chunk, return_data):
+                if not success:
+                    if not allow_failure:
+                        raise RuntimeError(f"Multicall to {call.address} ({call.fn_name}) failed")
+                    results.append(None)
+                else:
+                    results.append(self.decode(call, data))
+        return results
+
+    def decode(self, call: ContractFunction, data: bytes) -> Any:
+        output_types = get_abi_output_types(call.abi)
+        values = [
+            to_checksum_address(value) if output_type == "address" else value
+            for output_type, value in zip(output_types, self.w3.codec.decode(output_types, data))
+        ]
+        if len(values) == 1:
+            return values[0]
+        return values
+
+
+def fetch_pool_states(pools: Sequence, multicall: Multicall, block_identifier="latest") -> List[Tuple[Any, int]]:
+    """
+    Reads (slot0, liquidity) of every pool through `multicall`, without
+    applying them to the pools.
+    """
+    return fetch_pool_states_at_block(pools, multicall, block_identifier)[1]
+
+
+def fetch_pool_states_at_block(
+    pools: Sequence, multicall: Multicall, block_identifier="latest"
+) -> Tuple[int, List[Tuple[Any, int]]]:
+    """
+    `fetch_pool_states`, also returning the block number the states were
+    read at.
+    """
+    calls = []
+    for pool in pools:
+        calls.append(pool._pool_contract.functions.slot0())
+        calls.append(pool._pool_contract.functions.liquidity())
+    block_number, results = multicall.aggregate_at_block(calls, block_identifier=block_identifier)
+    return block_number, list(zip(results[::2], results[1::2]))
+
+
+def update_pools(pools: Sequence, multicall: Multicall, block_identifier="latest") -> List:
+    """
+    `update()` for many pools at once: reads slot0 and liquidity of every
+    pool through `multicall` at one block and returns each pool's
+    `update()` result.
+    """
+    block_number, states = fetch_pool_states_at_block(pools, multicall, block_identifier=block_identifier)
+    return [
+        pool._apply_update(slot0, liquidity, block_number) for pool, (slot0, liquidity) in zip(pools, states)
+    ]
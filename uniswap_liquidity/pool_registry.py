@@ -0,0 +1,126 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from uniswap_liquidity.block_cache import BlockCache, resolve_block_number
+from uniswap_liquidity.multicall import Multicall, fetch_pool_states_at_block
+from uniswap_liquidity.tick_lens import TickLens
+from uniswap_liquidity.uni_v3_pool import BaseV3LiquidityPool, V3LiquidityPool
+from web3 import Web3
+from typing import Dict, Iterable, List, Optional, Type
+
+RefreshResult = namedtuple("RefreshResult", "updated unchanged timed_out failed")
+
+
+class PoolRegistry:
+    """
+    Owns many pools that share one Web3 provider, one TickLens contract and
+    one Multicall3 contract, and refreshes them all in one call.
+
+    `refresh()` splits the pools into batches of `batch_size`, reads each
+    batch with a single multicall, and runs the batches in parallel on a
+    thread pool. Batches that miss the latency budget are reported as
+    timed out and their pools keep their previous state. A slow batch only
+    holds back the pools in it.
+
+    Every pool reads through one `BlockCache`, so pools and analyzers 
+    working at the same block share their results.
+    """
+
+    def __init__(
+        self,
+        w3: Web3,
+        tick_lens: TickLens = None,
+        multicall: Multicall = None,
+        pool_class: Type[BaseV3LiquidityPool] = V3LiquidityPool,
+        batch_size: int = 100,
+        max_workers: int = 8,
+        latency_budget: Optional[float] = None,
+        cache: BlockCache = None,
+    ):
+        self.w3 = w3
+        self.cache = cache if cache is not None else BlockCache()
+        self.tick_lens = tick_lens or TickLens(w3, cache=self.cache)
+        self.multicall = multicall or Multicall(w3, cache=self.cache)
+        self.pool_class = pool_class
+        self.batch_size = batch_size
+        self.latency_budget = latency_budget
+        self.pools: Dict[str, BaseV3LiquidityPool] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def __len__(self):
+        return len(self.pools)
+
+    def __iter__(self):
+        return iter(self.pools.values())
+
+    def __contains__(self, address) -> bool:
+        return address in self.pools
+
+    def __getitem__(self, address) -> BaseV3LiquidityPool:
+        return self.pools[address]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def add(self, address) -> BaseV3LiquidityPool:
+        if address not in self.pools:
+            self.pools[address] = self._create(address)
+        return self.pools[address]
+
+    def add_many(self, addresses: Iterable[str]) -> List[BaseV3LiquidityPool]:
+        """
+        Constructs the pools that are not tracked yet in parallel.
+        """
+        addresses = list(addresses)
+        missing = [address for address in dict.fromkeys(addresses) if address not in self.pools]
+        pools = self._executor.map(self._create, missing)
+        self.pools.update(zip(missing, pools))
+        return [self.pools[address] for address in addresses]
+
+    def _create(self, address) -> BaseV3LiquidityPool:
+        return self.pool_class(address, self.w3, tick_lens=self.tick_lens, multicall=self.multicall, cache=self.cache)
+
+    def remove(self, address):
+        del self.pools[address]
+
+    def refresh(self, block_identifier="latest", latency_budget: Optional[float] = None) -> RefreshResult:
+        """
+        Updates every pool and reports which ones changed.
+
+        A block tag is resolved to a number once, so every batch reads the
+        same block and goes through the registry's cache.
+
+        `latency_budget` (seconds, defaulting to the registry's) caps how
+        long the refresh waits for batches. Late batches are left out of this
+        refresh and their state is not applied when they eventually return.
+        """
+        if latency_budget is None:
+            latency_budget = self.latency_budget
+        pools = list(self.pools.values())
+        if pools:
+            block_identifier = resolve_block_number(self.w3, block_identifier, self.multicall.metrics)
+        batches = {
+            self._executor.submit(fetch_pool_states_at_block, batch, self.multicall, block_identifier): batch
+            for batch in (pools[i : i + self.batch_size] for i in range(0, len(pools), self.batch_size))
+        }
+        done, not_done = wait(batches, timeout=latency_budget)
+
+        updated, unchanged, timed_out, failed = [], [], [], []
+        for future in not_done:
+            future.cancel()
+            timed_out.extend(pool.address for pool in batches[future])
+        for future in done:
+            batch = batches[future]
+            if future.exception() is not None:
+                failed.extend(pool.address for pool in batch)
+                continue
+            block_number, states = future.result()
+            for pool, (slot0, liquidity) in zip(batch, states):
+                updates, _ = pool._apply_update(slot0, liquidity, block_number)
+                (updated if updates else unchanged).append(pool.address)
+        return RefreshResult(updated, unchanged, timed_out, failed)
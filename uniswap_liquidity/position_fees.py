@@ -0,0 +1,121 @@
+"""
+Uncollected fees of pool positions, with the pool's exact Q128 fee growth
+accounting (`Tick.getFeeGrowthInside` and `Position.update`).
+
+    fees = get_uncollected_fees(pool, [(owner, tick_lower, tick_upper), ...])
+
+All positions of a call are read at the same block in one batch: the fee
+growth globals and slot0, each distinct tick once however many positions
+share it, and each position once. With a pool `multicall` that is a single
+eth_call per `max_calls` reads.
+"""
+from collections import namedtuple
+from concurrent.futures import Executor
+from typing import Iterable, List, Optional, Tuple
+from eth_utils import keccak, to_bytes
+from uniswap_liquidity.executors import _executor
+from uniswap_liquidity.metrics import pool_operation
+from uniswap_liquidity.v3_math import MAX_UINT256, Q128, mul_div
+
+MAX_UINT128 = (1 << 128) - 1
+
+# fees0/fees1 are the position's tokensOwed plus the fees accrued since it
+# was last touched, i.e. what `collect` would pay out after a poke
+PositionFees = namedtuple("PositionFees", "owner tick_lower tick_upper liquidity fees0 fees1")
+
+
+def position_key(owner: str, tick_lower: int, tick_upper: int) -> bytes:
+    """
+    keccak256(abi.encodePacked(owner, tickLower, tickUpper)), the key of
+    `positions()`.
+    """
+    return keccak(
+        to_bytes(hexstr=owner) + tick_lower.to_bytes(3, "big", signed=True) + tick_upper.to_bytes(3, "big", signed=True)
+    )
+
+
+def get_fee_growth_inside(
+    tick_current: int,
+    tick_lower: int,
+    tick_upper: int,
+    fee_growth_outside_lower: int,
+    fee_growth_outside_upper: int,
+    fee_growth_global: int,
+) -> int:
+    """
+    Fee growth per unit of liquidity inside [tick_lower, tick_upper), for one
+    token, as `Tick.getFeeGrowthInside` computes it (modulo 2**256).
+    """
+    if tick_current >= tick_lower:
+        fee_growth_below = fee_growth_outside_lower
+    else:
+        fee_growth_below = fee_growth_global - fee_growth_outside_lower
+    if tick_current < tick_upper:
+        fee_growth_above = fee_growth_outside_upper
+    else:
+        fee_growth_above = fee_growth_global - fee_growth_outside_upper
+    return (fee_growth_global - fee_growth_below - fee_growth_above) & MAX_UINT256
+
+
+def get_fees_owed(liquidity: int, fee_growth_inside: int, fee_growth_inside_last: int) -> int:
+    """
+    Fees accrued by `liquidity` since `fee_growth_inside_last`, as
+    `Position.update` credits them to tokensOwed.
+    """
+    return mul_div((fee_growth_inside - fee_growth_inside_last) & MAX_UINT256, liquidity, Q128) & MAX_UINT128
+
+
+@pool_operation
+def get_uncollected_fees(
+    pool,
+    positions: Iterable[Tuple[str, int, int]],
+    max_workers: int = 8,
+    executor: Optional[Executor] = None,
+) -> List[PositionFees]:
+    """
+    Returns the `PositionFees` of each (owner, tick_lower, tick_upper)
+    position of `pool`, in order, at the pool's block (the latest block if
+    the pool is not pinned to one).
+
+    Without a pool `multicall`, the reads are made concurrently on
+    `executor`, or a pool of `max_workers` threads.
+    """
+    positions = list(positions)
+    block_identifier = pool._block_identifier()
+    if not isinstance(block_identifier, int):
+        # read everything at one block, even across several batches
+        block_identifier = pool._resolve_block_number(block_identifier)
+
+    ticks = sorted({tick for _, tick_lower, tick_upper in positions for tick in (tick_lower, tick_upper)})
+    keys = list(dict.fromkeys(position_key(*position) for position in positions))
+    functions = pool._pool_contract.functions
+    calls = [functions.feeGrowthGlobal0X128(), functions.feeGrowthGlobal1X128(), functions.slot0()]
+    calls += [functions.ticks(tick) for tick in ticks]
+    calls += [functions.positions(key) for key in keys]
+
+    with _executor(executor, max_workers) as executor:
+        results = pool._call_concurrently(executor, calls, block_identifier)
+
+    fee_growth_global0, fee_growth_global1, slot0 = results[:3]
+    tick_current = slot0[1]
+    # ticks() returns (liquidityGross, liquidityNet, feeGrowthOutside0X128, feeGrowthOutside1X128, ...)
+    fee_growth_outside = {tick: (data[2], data[3]) for tick, data in zip(ticks, results[3 : 3 + len(ticks)])}
+    position_data = dict(zip(keys, results[3 + len(ticks) :]))
+
+    fees = []
+    for owner, tick_lower, tick_upper in positions:
+        liquidity, inside0_last, inside1_last, owed0, owed1 = position_data[position_key(owner, tick_lower, tick_upper)]
+        lower, upper = fee_growth_outside[tick_lower], fee_growth_outside[tick_upper]
+        inside0 = get_fee_growth_inside(tick_current, tick_lower, tick_upper, lower[0], upper[0], fee_growth_global0)
+        inside1 = get_fee_growth_inside(tick_current, tick_lower, tick_upper, lower[1], upper[1], fee_growth_global1)
+        fees.append(
+            PositionFees(
+                owner,
+                tick_lower,
+                tick_upper,
+                liquidity,
+                owed0 + get_fees_owed(liquidity, inside0, inside0_last),
+                owed1 + get_fees_owed(liquidity, inside1, inside1_last),
+            )
+        )
+    return fees
@@ -0,0 +1,85 @@
+"""
+Vectorized valuation of LP positions: the token amounts of many
+(liquidity, tickLower, tickUpper) positions at a pool's current price in one
+numpy pass, as `get_token_amounts` computes for a single position.
+
+    amounts = value_pool_positions(pool, liquidity, tick_lower, tick_upper)
+    amounts.amount0, amounts.amount1
+
+Token decimals are read once per token from its ERC-20 contract and kept for
+the lifetime of the Web3 instance.
+"""
+from collections import namedtuple
+from typing import Any, Dict, Optional
+from weakref import WeakKeyDictionary
+import numpy as np
+from uniswap_liquidity.abi.erc20_abi import ERC_20_SIMPLE_ABI
+from uniswap_liquidity.block_cache import call_at_block
+from uniswap_liquidity.contracts import contract_at
+from uniswap_liquidity.liquidity_math import tick_to_sqrt_price
+from uniswap_liquidity.metrics import RPC_METRICS, RpcMetrics
+from uniswap_liquidity.v3_math import Q96
+
+PositionAmounts = namedtuple("PositionAmounts", "amount0 amount1")
+
+# Web3 instance -> {token address: decimals}
+_decimals: "WeakKeyDictionary[Any, Dict[str, int]]" = WeakKeyDictionary()
+
+
+def get_token_decimals(w3, token: str, metrics: RpcMetrics = RPC_METRICS) -> int:
+    """
+    Returns `decimals()` of the ERC-20 `token`, read on first use only.
+    """
+    decimals = _decimals.setdefault(w3, {})
+    if token not in decimals:
+        decimals[token] = call_at_block(contract_at(w3, token, ERC_20_SIMPLE_ABI).functions.decimals(), metrics=metrics)
+    return decimals[token]
+
+
+def _sqrt_prices_at_ticks(ticks: np.ndarray) -> np.ndarray:
+    # positions share few distinct ticks, each converted once with TickMath
+    unique, inverse = np.unique(ticks, return_inverse=True)
+    return np.array([tick_to_sqrt_price(int(tick)) for tick in unique])[inverse]
+
+
+def value_positions(
+    sqrt_price_x96: int, liquidity, tick_lower, tick_upper, decimals0: int = 0, decimals1: int = 0
+) -> PositionAmounts:
+    """
+    Returns the arrays of token0 and token1 amounts held by the positions
+    with the given arrays of `liquidity`, `tick_lower` and `tick_upper` when
+    the pool is at `sqrt_price_x96`, in raw token units, or in whole tokens
+    when `decimals0` / `decimals1` are given.
+    """
+    liquidity = np.asarray(liquidity, dtype=float)
+    sqrt_price_lower = _sqrt_prices_at_ticks(np.asarray(tick_lower))
+    sqrt_price_upper = _sqrt_prices_at_ticks(np.asarray(tick_upper))
+    if np.any(sqrt_price_lower >= sqrt_price_upper):
+        raise ValueError("tick_lower must be below tick_upper")
+
+    # below the range a position is all token0, above it all token1
+    sqrt_price = np.clip(sqrt_price_x96 / Q96, sqrt_price_lower, sqrt_price_upper)
+    amount0 = liquidity * (sqrt_price_upper - sqrt_price) / (sqrt_price * sqrt_price_upper)
+    amount1 = liquidity * (sqrt_price - sqrt_price_lower)
+    if decimals0:
+        amount0 /= 10.0**decimals0
+    if decimals1:
+        amount1 /= 10.0**decimals1
+    return PositionAmounts(amount0, amount1)
+
+
+def value_pool_positions(
+    pool, liquidity, tick_lower, tick_upper, decimals: Optional[tuple] = None
+) -> PositionAmounts:
+    """
+    `value_positions` at the current price of `pool`, in whole tokens.
+    The decimals of token0 and token1 are read from their contracts unless
+    given as a `(decimals0, decimals1)` tuple.
+    """
+    if decimals is None:
+        w3 = pool._pool_contract.w3
+        decimals = (
+            get_token_decimals(w3, pool.token0, pool.metrics),
+            get_token_decimals(w3, pool.token1, pool.metrics),
+        )
+    return value_positions(pool.sqrt_price_x96, liquidity, tick_lower, tick_upper, *decimals)
@@ -0,0 +1,138 @@
+"""
+Local multi-hop quotes along a token path, chaining `simulate_swap` through
+each pool's cached state, like the router's `exactInput`/`exactOutput`.
+
+Paths are written like the router's encoded paths, alternating tokens and
+fee tiers from the token sold to the token bought, e.g.
+`[WETH, 500, USDC, 100, DAI]`, for both exact input and exact output quotes.
+"""
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uniswap_liquidity.swap_simulator import SwapResult, simulate_swap
+
+HopQuote = namedtuple("HopQuote", "pool token_in token_out amount_in amount_out sqrt_price_x96 tick fee_amount")
+RouteQuote = namedtuple("RouteQuote", "path amount_in amount_out hops")
+
+
+class PoolIndex:
+    """
+    Pools by (token, token, fee), in either token order.
+    """
+
+    def __init__(self, pools: Iterable):
+        self._pools: Dict[Tuple[str, str, int], object] = {}
+        for pool in pools:
+            self._pools[self._key(pool.token0, pool.token1, pool.fee)] = pool
+
+    @staticmethod
+    def _key(token_a: str, token_b: str, fee: int):
+        token_a, token_b = sorted((token_a.lower(), token_b.lower()))
+        return token_a, token_b, fee
+
+    def get(self, token_a: str, token_b: str, fee: int):
+        try:
+            return self._pools[self._key(token_a, token_b, fee)]
+        except KeyError:
+            raise LookupError(f"No pool for {token_a}/{token_b} at fee {fee}")
+
+
+def split_path(path: Sequence) -> List[Tuple[str, int, str]]:
+    """
+    Splits [token, fee, token, ..., token] into (token_in, fee, token_out)
+    hops.
+    """
+    if len(path) < 3 or len(path) % 2 == 0:
+        raise ValueError(f"path must alternate tokens and fees, got {path}")
+    return [(path[i], path[i + 1], path[i + 2]) for i in range(0, len(path) - 1, 2)]
+
+
+def quote_exact_input_path(path: Sequence, pools, amount_in: int, offline=False, _swaps=None) -> RouteQuote:
+    """
+    Quotes selling exactly `amount_in` of the first token of `path` for
+    the last one. `pools` is a `PoolIndex` or any iterable of pools.
+    Raises ValueError if a pool runs out of liquidity before the amount is
+    swapped.
+    """
+    pools = pools if isinstance(pools, PoolIndex) else PoolIndex(pools)
+    hops = []
+    amount = amount_in
+    for token_in, fee, token_out in split_path(path):
+        pool = pools.get(token_in, token_out, fee)
+        zero_for_one = token_in.lower() == pool.token0.lower()
+        result = _swap(pool, zero_for_one, amount, offline, _swaps)
+        if result.amount_in != amount:
+            raise ValueError(f"Not enough liquidity in {pool.address} to swap {amount} {token_in}")
+        hops.append(_hop(pool, token_in, token_out, result))
+        amount = result.amount_out
+    return RouteQuote(list(path), amount_in, amount, hops)
+
+
+def quote_exact_output_path(path: Sequence, pools, amount_out: int, offline=False, _swaps=None) -> RouteQuote:
+    """
+    Quotes buying exactly `amount_out` of the last token of `path` with the
+    first one, working back from the last hop as the router does. Raises
+    ValueError if a pool cannot deliver the amount.
+    """
+    pools = pools if isinstance(pools, PoolIndex) else PoolIndex(pools)
+    hops = []
+    amount = amount_out
+    for token_in, fee, token_out in reversed(split_path(path)):
+        pool = pools.get(token_in, token_out, fee)
+        zero_for_one = token_in.lower() == pool.token0.lower()
+        result = _swap(pool, zero_for_one, -amount, offline, _swaps)
+        if result.amount_out != amount:
+            raise ValueError(f"Not enough liquidity in {pool.address} to buy {amount} {token_out}")
+        hops.append(_hop(pool, token_in, token_out, result))
+        amount = result.amount_in
+    hops.reverse()
+    return RouteQuote(list(path), amount, amount_out, hops)
+
+
+def rank_paths(
+    paths: Iterable[Sequence], pools, amount: int, exact_input=True, offline=False
+) -> List[RouteQuote]:
+    """
+    Quotes every candidate path for `amount` (sold with `exact_input`,
+    bought otherwise) and returns the quotes best first: most bought for
+    exact input, least sold for exact output. Paths that cannot be quoted,
+    for lack of a pool, liquidity or (when `offline`) loaded ticks, are
+    left out.
+
+    Hops shared between paths with the same amount are simulated once.
+    """
+    pools = pools if isinstance(pools, PoolIndex) else PoolIndex(pools)
+    quote = quote_exact_input_path if exact_input else quote_exact_output_path
+    swaps: Dict[Tuple[str, bool, int], SwapResult] = {}
+    quotes = []
+    for path in paths:
+        try:
+            quotes.append(quote(path, pools, amount, offline, swaps))
+        except (LookupError, ValueError):
+            continue
+    if exact_input:
+        quotes.sort(key=lambda route: route.amount_out, reverse=True)
+    else:
+        quotes.sort(key=lambda route: route.amount_in)
+    return quotes
+
+
+def _swap(pool, zero_for_one: bool, amount_specified: int, offline: bool, swaps: Optional[dict]) -> SwapResult:
+    if swaps is None:
+        return simulate_swap(pool, zero_for_one, amount_specified, offline=offline)
+    key = pool.address, zero_for_one, amount_specified
+    if key not in swaps:
+        swaps[key] = simulate_swap(pool, zero_for_one, amount_specified, offline=offline)
+    return swaps[key]
+
+
+def _hop(pool, token_in: str, token_out: str, result: SwapResult) -> HopQuote:
+    return HopQuote(
+        pool.address,
+        token_in,
+        token_out,
+        result.amount_in,
+        result.amount_out,
+        result.sqrt_price_x96,
+        result.tick,
+        result.fee_amount,
+    )
@@ -0,0 +1,180 @@
+"""
+Compact, versioned binary snapshots of pool state for warm starts.
+
+A snapshot file is a header followed by one record per pool. Each record is
+a fixed-size struct (addresses, fee, tick spacing, slot0, liquidity, block
+number, last applied log position and array lengths) followed by the bitmap
+words loaded and the tick map as flat arrays: int16 words, int32 ticks, and
+16-byte liquidityNet/liquidityGross values. Everything is little-endian, so
+a snapshot can be read straight out of a memory map.
+"""
+import struct
+import sys
+from array import array
+from uniswap_liquidity.tick_index import TickIndex
+from uniswap_liquidity.uni_v3_pool import BaseV3LiquidityPool, V3LiquidityPool
+from web3 import Web3
+from typing import Dict, Iterable, List, Optional, Type
+
+SNAPSHOT_MAGIC = b"UV3SNAP\x00"
+SNAPSHOT_VERSION = 1
+
+_HEADER = struct.Struct("<8sHI")
+# address, token0, token1, fee, tickSpacing, sqrtPriceX96, tick,
+# observationIndex, observationCardinality, observationCardinalityNext,
+# feeProtocol, unlocked, liquidity, blockNumber, log block, log index,
+# number of words, number of ticks
+_POOL = struct.Struct("<20s20s20sIi20siHHHB?16sqqiII")
+_UNKNOWN = -1
+
+
+def save_snapshots(pools: Iterable[BaseV3LiquidityPool], path, block_number: Optional[int] = None):
+    """
+    Writes the state of `pools` to `path`. Each pool is recorded at
+    `block_number` if given, else at its own `block_number` (unknown if
+    that is None too).
+    """
+    pools = list(pools)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(pools)))
+        for pool in pools:
+            f.write(_pack_pool(pool, block_number))
+
+
+def load_snapshots(
+    path,
+    w3: Web3,
+    pool_class: Type[BaseV3LiquidityPool] = V3LiquidityPool,
+    tick_lens=None,
+    multicall=None,
+) -> List[BaseV3LiquidityPool]:
+    """
+    Restores the pools saved in `path` without reading from the node.
+    """
+    return [
+        pool_class.from_state(state, w3, tick_lens=tick_lens, multicall=multicall)
+        for state in read_snapshot_states(path)
+    ]
+
+
+def read_snapshot_states(path) -> List[Dict]:
+    with open(path, "rb") as f:
+        data = memoryview(f.read())
+
+    magic, version, pool_count = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a pool snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+
+    offset = _HEADER.size
+    states = []
+    for _ in range(pool_count):
+        state, offset = _unpack_pool(data, offset)
+        states.append(state)
+    return states
+
+
+def _pack_pool(pool: BaseV3LiquidityPool, block_number: Optional[int]) -> bytes:
+    if block_number is None:
+        block_number = pool.block_number
+    log_block, log_index = pool.log_position or (_UNKNOWN, _UNKNOWN)
+    sqrt_price_x96, tick, observation_index, cardinality, cardinality_next, fee_protocol, unlocked = pool.slot0
+    words = array("h", sorted(pool.tick_words))
+    ticks, liquidity_net, liquidity_gross = pool.tick_data.range(-(1 << 23), 1 << 23)
+    ticks = array("i", ticks)
+    if sys.byteorder == "big":
+        words.byteswap()
+        ticks.byteswap()
+
+    return b"".join(
+        [
+            _POOL.pack(
+                bytes.fromhex(pool.address[2:]),
+                bytes.fromhex(pool.token0[2:]),
+                bytes.fromhex(pool.token1[2:]),
+                pool.fee,
+                pool.tick_spacing,
+                sqrt_price_x96.to_bytes(20, "little"),
+                tick,
+                observation_index,
+                cardinality,
+                cardinality_next,
+                fee_protocol,
+                unlocked,
+                pool.liquidity.to_bytes(16, "little"),
+                _UNKNOWN if block_number is None else block_number,
+                log_block,
+                log_index,
+                len(words),
+                len(ticks),
+            ),
+            words.tobytes(),
+            ticks.tobytes(),
+            b"".join(net.to_bytes(16, "little", signed=True) for net in liquidity_net),
+            b"".join(gross.to_bytes(16, "little") for gross in liquidity_gross),
+        ]
+    )
+
+
+def _unpack_pool(data: memoryview, offset: int):
+    (
+        address,
+        token0,
+        token1,
+        fee,
+        tick_spacing,
+        sqrt_price_x96,
+        tick,
+        observation_index,
+        cardinality,
+        cardinality_next,
+        fee_protocol,
+        unlocked,
+        liquidity,
+        block_number,
+        log_block,
+        log_index,
+        word_count,
+        tick_count,
+    ) = _POOL.unpack_from(data, offset)
+    offset += _POOL.size
+
+    words = array("h")
+    words.frombytes(data[offset : offset + 2 * word_count])
+    offset += 2 * word_count
+    ticks = array("i")
+    ticks.frombytes(data[offset : offset + 4 * tick_count])
+    offset += 4 * tick_count
+    if sys.byteorder == "big":
+        words.byteswap()
+        ticks.byteswap()
+    liquidity_net = [
+        int.from_bytes(data[i : i + 16], "little", signed=True) for i in range(offset, offset + 16 * tick_count, 16)
+    ]
+    offset += 16 * tick_count
+    liquidity_gross = [int.from_bytes(data[i : i + 16], "little") for i in range(offset, offset + 16 * tick_count, 16)]
+    offset += 16 * tick_count
+
+    state = {
+        "address": Web3.to_checksum_address(address),
+        "token0": Web3.to_checksum_address(token0),
+        "token1": Web3.to_checksum_address(token1),
+        "fee": fee,
+        "tick_spacing": tick_spacing,
+        "slot0": [
+            int.from_bytes(sqrt_price_x96, "little"),
+            tick,
+            observation_index,
+            cardinality,
+            cardinality_next,
+            fee_protocol,
+            unlocked,
+        ],
+        "liquidity": int.from_bytes(liquidity, "little"),
+        "tick_data": TickIndex.from_sorted(ticks, liquidity_net, liquidity_gross),
+        "tick_words": list(words),
+        "block_number": None if block_number == _UNKNOWN else block_number,
+        "log_position": None if log_block == _UNKNOWN else (log_block, log_index),
+    }
+    return state, offset
@@ -0,0 +1,108 @@
+"""
+Local swap simulation on a pool's cached state, ported from the main loop of
+`UniswapV3Pool.swap` on top of the integer math in `v3_math`.
+"""
+from collections import namedtuple
+from typing import Optional
+from uniswap_liquidity.v3_math import (
+    MIN_TICK,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MAX_SQRT_RATIO,
+    compute_swap_step,
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+)
+
+SwapResult = namedtuple("SwapResult", "amount_in amount_out sqrt_price_x96 tick liquidity fee_amount")
+
+
+def simulate_swap(
+    pool,
+    zero_for_one: bool,
+    amount_specified: int,
+    sqrt_price_limit_x96: Optional[int] = None,
+    offline: bool = False,
+) -> SwapResult:
+    """
+    Simulates a swap against `pool` without changing it.
+
+    `zero_for_one` swaps token0 in for token1 out. A positive
+    `amount_specified` is an exact input amount and a negative one an exact
+    output amount, as in `UniswapV3Pool.swap`. The swap stops early at
+    `sqrt_price_limit_x96` (defaulting to the price bounds), or when the
+    pool runs out of liquidity.
+
+    Returns the amounts in (fee included) and out, both positive, the pool's
+    sqrtPriceX96, tick and liquidity after the swap, and the fee paid. Words
+    missing from the tick map are fetched unless `offline` is set, in which
+    case a LookupError is raised instead.
+    """
+    if amount_specified == 0:
+        raise ValueError("amount_specified must not be zero")
+    if sqrt_price_limit_x96 is None:
+        sqrt_price_limit_x96 = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+    if zero_for_one:
+        if not MIN_SQRT_RATIO < sqrt_price_limit_x96 < pool.sqrt_price_x96:
+            raise ValueError("sqrt price limit must be below the current price")
+    elif not pool.sqrt_price_x96 < sqrt_price_limit_x96 < MAX_SQRT_RATIO:
+        raise ValueError("sqrt price limit must be above the current price")
+
+    exact_input = amount_specified > 0
+    amount_remaining = amount_specified
+    amount_calculated = 0
+    fee_amount_total = 0
+    sqrt_price_x96 = pool.sqrt_price_x96
+    tick = pool.tick
+    liquidity = pool.liquidity
+
+    while amount_remaining != 0 and sqrt_price_x96 != sqrt_price_limit_x96:
+        sqrt_price_start_x96 = sqrt_price_x96
+        tick_next, initialized = pool.next_initialized_tick_within_one_word(tick, zero_for_one, fetch=not offline)
+        tick_next = min(max(tick_next, MIN_TICK), MAX_TICK)
+        sqrt_price_next_x96 = get_sqrt_ratio_at_tick(tick_next)
+
+        if zero_for_one:
+            sqrt_price_target_x96 = max(sqrt_price_next_x96, sqrt_price_limit_x96)
+        else:
+            sqrt_price_target_x96 = min(sqrt_price_next_x96, sqrt_price_limit_x96)
+        sqrt_price_x96, amount_in, amount_out, fee_amount = compute_swap_step(
+            sqrt_price_x96, sqrt_price_target_x96, liquidity, amount_remaining, pool.fee
+        )
+
+        if exact_input:
+            amount_remaining -= amount_in + fee_amount
+            amount_calculated -= amount_out
+        else:
+            amount_remaining += amount_out
+            amount_calculated += amount_in + fee_amount
+        fee_amount_total += fee_amount
+
+        if sqrt_price_x96 == sqrt_price_next_x96:
+            # crossed to the next tick
+            if initialized:
+                liquidity_net = pool.tick_data[tick_next][0]
+                liquidity += -liquidity_net if zero_for_one else liquidity_net
+            tick = tick_next - 1 if zero_for_one else tick_next
+        elif sqrt_price_x96 != sqrt_price_start_x96:
+            tick = get_tick_at_sqrt_ratio(sqrt_price_x96)
+
+    if exact_input:
+        amount_in, amount_out = amount_specified - amount_remaining, -amount_calculated
+    else:
+        amount_in, amount_out = amount_calculated, amount_remaining - amount_specified
+    return SwapResult(amount_in, amount_out, sqrt_price_x96, tick, liquidity, fee_amount_total)
+
+
+def quote_exact_input(pool, zero_for_one: bool, amount_in: int, sqrt_price_limit_x96=None, offline=False) -> SwapResult:
+    """
+    Swaps exactly `amount_in` (or less, if the price limit is hit).
+    """
+    return simulate_swap(pool, zero_for_one, amount_in, sqrt_price_limit_x96, offline)
+
+
+def quote_exact_output(pool, zero_for_one: bool, amount_out: int, sqrt_price_limit_x96=None, offline=False) -> SwapResult:
+    """
+    Swaps for exactly `amount_out` (or less, if the price limit is hit).
+    """
+    return simulate_swap(pool, zero_for_one, -amount_out, sqrt_price_limit_x96, offline)
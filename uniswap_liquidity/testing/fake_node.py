@@ -0,0 +1,365 @@
+"""
+A small in-process stand-in for an Ethereum node.
+
+`FakeNode` is a web3 provider that answers `eth_call` requests by decoding the
+calldata against the ABI registered for the target address and dispatching to
+a plain Python object. It lets the pool and analyzer code run end to end
+without ganache or a network connection, and records every call it serves so
+tests can assert on the RPC call pattern. The tests and the offline
+benchmarks both run against it.
+"""
+from eth_abi import decode, encode
+from hexbytes import HexBytes
+from eth_utils import (
+    event_abi_to_log_topic,
+    function_abi_to_4byte_selector,
+    get_abi_input_types,
+    get_abi_output_types,
+    to_checksum_address,
+)
+import asyncio
+import threading
+import time
+from web3.providers.async_base import AsyncBaseProvider
+from web3.providers.base import BaseProvider
+from uniswap_liquidity.abi.uni_v3_lp_abi import V3_LP_ABI
+from uniswap_liquidity.abi.tick_lens_abi import TICK_LENS_ABI
+from uniswap_liquidity.abi.multicall3_abi import MULTICALL3_ABI
+from uniswap_liquidity.multicall import MULTICALL3_ADDRESS
+
+TICK_LENS_ADDRESS = "0xbfd8137f7d1516D3ea5cA83523914859ec47F573"
+POOL_ADDRESS = "0xC2e9F25Be6257c210d7Adf0D4Cd6E3E881ba25f8"
+# (tickLower, tickUpper, liquidity) of the sample pool used across the tests
+POSITIONS = [
+    (-1200, 1800, 10**20),
+    (-60, 60, 5 * 10**19),
+    (600, 30000, 2 * 10**19),
+    (-40020, -600, 3 * 10**19),
+    (-120, 240, 7 * 10**18),
+]
+
+
+def encode_log(address, event_name, args, block_number, log_index=0, abi=V3_LP_ABI):
+    """
+    Builds a raw log, as returned by eth_getLogs, for the event `event_name`
+    of `abi` with the argument values in `args`.
+    """
+    event_abi = next(entry for entry in abi if entry["type"] == "event" and entry["name"] == event_name)
+    topics = [event_abi_to_log_topic(event_abi)]
+    data_types, data_values = [], []
+    for entry in event_abi["inputs"]:
+        if entry["indexed"]:
+            topics.append(encode([entry["type"]], [args[entry["name"]]]))
+        else:
+            data_types.append(entry["type"])
+            data_values.append(args[entry["name"]])
+    return {
+        "address": to_checksum_address(address),
+        "topics": [HexBytes(topic) for topic in topics],
+        "data": HexBytes(encode(data_types, data_values)),
+        "blockNumber": block_number,
+        "blockHash": HexBytes(block_number.to_bytes(32, "big")),
+        "transactionHash": HexBytes((block_number * 1000 + log_index).to_bytes(32, "big")),
+        "transactionIndex": 0,
+        "logIndex": log_index,
+        "removed": False,
+    }
+
+
+class RpcError(Exception):
+    """
+    Raised by a FakeNode handler to answer with a JSON-RPC error.
+    """
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class FakePool:
+    """
+    Python model of the view functions of a Uniswap v3 pool.
+
+    `ticks` maps each initialized tick to (liquidityNet, liquidityGross).
+    Fee accounting is zero unless set through `fee_growth_global` (a
+    (token0, token1) pair), `fee_growth_outside` (tick -> pair) and
+    `positions_by_key` (position key -> `positions()` tuple).
+    """
+
+    def __init__(
+        self,
+        token0="0x6B175474E89094C44Da98b954EedeAC495271d0F",
+        token1="0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",
+        fee=3000,
+        tick_spacing=60,
+        sqrt_price_x96=2**96,
+        tick=0,
+        liquidity=10**18,
+        ticks=None,
+        delay=0,
+        fee_growth_global=(0, 0),
+        fee_growth_outside=None,
+        positions_by_key=None,
+    ):
+        self.token0_address = to_checksum_address(token0)
+        self.token1_address = to_checksum_address(token1)
+        self.fee_tier = fee
+        self.tick_spacing = tick_spacing
+        self.sqrt_price_x96 = sqrt_price_x96
+        self.tick = tick
+        self.active_liquidity = liquidity
+        self.tick_map = dict(ticks or {})
+        # seconds slot0() takes to answer, to simulate a slow pool
+        self.delay = delay
+        self.fee_growth_global = fee_growth_global
+        self.fee_growth_outside = dict(fee_growth_outside or {})
+        self.positions_by_key = dict(positions_by_key or {})
+
+    @classmethod
+    def from_positions(cls, positions, tick, tick_spacing=60, **kwargs):
+        """
+        Builds a pool from (tickLower, tickUpper, liquidity) positions, with
+        the price sitting at the bottom of `tick`.
+        """
+        ticks = {}
+        liquidity = 0
+        for lower, upper, amount in positions:
+            net, gross = ticks.get(lower, (0, 0))
+            ticks[lower] = net + amount, gross + amount
+            net, gross = ticks.get(upper, (0, 0))
+            ticks[upper] = net - amount, gross + amount
+            if lower <= tick < upper:
+                liquidity += amount
+        sqrt_price_x96 = int(1.0001 ** (tick / 2) * 2**96)
+        return cls(
+            tick_spacing=tick_spacing,
+            sqrt_price_x96=sqrt_price_x96,
+            tick=tick,
+            liquidity=liquidity,
+            ticks=ticks,
+            **kwargs,
+        )
+
+    def populated_ticks_in_word(self, word):
+        ticks = [
+            (tick, net, gross)
+            for tick, (net, gross) in self.tick_map.items()
+            if (tick // self.tick_spacing) >> 8 == word
+        ]
+        # TickLens walks the bitmap from the most significant bit down
+        return sorted(ticks, reverse=True)
+
+    def token0(self):
+        return self.token0_address
+
+    def token1(self):
+        return self.token1_address
+
+    def fee(self):
+        return self.fee_tier
+
+    def tickSpacing(self):
+        return self.tick_spacing
+
+    def liquidity(self):
+        return self.active_liquidity
+
+    def slot0(self):
+        if self.delay:
+            time.sleep(self.delay)
+        return (self.sqrt_price_x96, self.tick, 0, 1, 1, 0, True)
+
+    def ticks(self, tick):
+        net, gross = self.tick_map.get(tick, (0, 0))
+        outside0, outside1 = self.fee_growth_outside.get(tick, (0, 0))
+        return (gross, net, outside0, outside1, 0, 0, 0, gross > 0)
+
+    def feeGrowthGlobal0X128(self):
+        return self.fee_growth_global[0]
+
+    def feeGrowthGlobal1X128(self):
+        return self.fee_growth_global[1]
+
+    def positions(self, key):
+        return self.positions_by_key.get(key, (0, 0, 0, 0, 0))
+
+    def tickBitmap(self, word):
+        bitmap = 0
+        for tick in self.tick_map:
+            compressed = tick // self.tick_spacing
+            if compressed >> 8 == word:
+                bitmap |= 1 << (compressed % 256)
+        return bitmap
+
+
+class FakeTickLens:
+    def __init__(self, node):
+        self.node = node
+
+    def getPopulatedTicksInWord(self, pool, word):
+        return self.node.contracts[pool.lower()][1].populated_ticks_in_word(word)
+
+
+class FakeMulticall3:
+    def __init__(self, node):
+        self.node = node
+
+    def aggregate3(self, calls):
+        results = []
+        for target, allow_failure, call_data in calls:
+            try:
+                results.append((True, self.node.execute_call(target, call_data)))
+            except Exception:
+                if not allow_failure:
+                    raise
+                results.append((False, b""))
+        return results
+
+    def getBlockNumber(self):
+        return self.node.call_block
+
+
+class FakeNode(BaseProvider):
+    """
+    Web3 provider backed by Python contract models.
+
+    Contracts are registered with `add_contract(address, abi, model)`. Every
+    JSON-RPC request is appended to `self.requests`, and every contract call
+    served, including those inside a multicall, to `self.calls` as
+    (address, function name, args).
+
+    `eth_getLogs` is answered from the raw logs in `self.logs` (see
+    `encode_log`), and fails like a rate-limited node when a request would
+    return more than `max_logs` of them.
+
+    The number of the block every eth_call ran at, with tags resolved to
+    `block_number`, is appended to `self.call_blocks`. With
+    `blocks_per_call`, the chain moves on by that many blocks after each
+    eth_call, so reads that are not pinned to one block come apart.
+    """
+
+    def __init__(self, chain_id=1, block_number=15737814, max_logs=None, blocks_per_call=0):
+        super().__init__()
+        self.chain_id = chain_id
+        self.block_number = block_number
+        self.max_logs = max_logs
+        self.blocks_per_call = blocks_per_call
+        self.contracts = {}
+        self.calls = []
+        self.call_blocks = []
+        self._local = threading.local()
+        self.requests = []
+        self.logs = []
+        self.add_contract(TICK_LENS_ADDRESS, TICK_LENS_ABI, FakeTickLens(self))
+        self.add_contract(MULTICALL3_ADDRESS, MULTICALL3_ABI, FakeMulticall3(self))
+
+    def add_contract(self, address, abi, model):
+        selectors = {}
+        for entry in abi:
+            if entry.get("type") == "function":
+                selectors[function_abi_to_4byte_selector(entry)] = entry
+        self.contracts[address.lower()] = (selectors, model)
+        return to_checksum_address(address)
+
+    def add_pool(self, address, pool: FakePool):
+        return self.add_contract(address, V3_LP_ABI, pool)
+
+    def is_connected(self, show_traceback=False):
+        return True
+
+    def make_request(self, method, params):
+        self.requests.append((method, params))
+        handler = getattr(self, f"_rpc_{method}", None)
+        if handler is None:
+            return {"jsonrpc": "2.0", "id": 0, "error": {"code": -32601, "message": f"{method} not supported"}}
+        try:
+            result = handler(*params)
+        except RpcError as error:
+            return {"jsonrpc": "2.0", "id": 0, "error": {"code": error.code, "message": str(error)}}
+        return {"jsonrpc": "2.0", "id": 0, "result": result}
+
+    def _rpc_eth_chainId(self):
+        return hex(self.chain_id)
+
+    def _rpc_eth_blockNumber(self):
+        return hex(self.block_number)
+
+    def _rpc_eth_getLogs(self, filter_params):
+        from_block = int(filter_params.get("fromBlock", "0x0"), 16)
+        to_block = int(filter_params.get("toBlock", hex(self.block_number)), 16)
+        addresses = filter_params.get("address")
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        topics = filter_params.get("topics") or [None]
+        topic0 = topics[0]
+        if isinstance(topic0, str):
+            topic0 = [topic0]
+        logs = [
+            log
+            for log in self.logs
+            if from_block <= log["blockNumber"] <= to_block
+            and (addresses is None or log["address"].lower() in {address.lower() for address in addresses})
+            and (topic0 is None or log["topics"][0].to_0x_hex() in topic0)
+        ]
+        if self.max_logs is not None and len(logs) > self.max_logs:
+            raise RpcError(-32005, f"query returned more than {self.max_logs} results")
+        return logs
+
+    def _rpc_eth_call(self, transaction, block_identifier="latest"):
+        if isinstance(block_identifier, str) and block_identifier.startswith("0x"):
+            self._local.block = int(block_identifier, 16)
+        else:
+            self._local.block = self.block_number
+        self.call_blocks.append(self._local.block)
+        data = bytes.fromhex(transaction["data"][2:])
+        try:
+            return "0x" + self.execute_call(transaction["to"], data).hex()
+        finally:
+            self.block_number += self.blocks_per_call
+
+    @property
+    def call_block(self):
+        """
+        The block the eth_call being served runs at.
+        """
+        return getattr(self._local, "block", self.block_number)
+
+    def execute_call(self, to, data: bytes) -> bytes:
+        selectors, model = self.contracts[to.lower()]
+        abi = selectors[data[:4]]
+        args = decode(get_abi_input_types(abi), data[4:])
+        self.calls.append((to_checksum_address(to), abi["name"], args))
+        result = getattr(model, abi["name"])(*args)
+        output_types = get_abi_output_types(abi)
+        if len(output_types) == 1:
+            result = (result,)
+        return encode(output_types, result)
+
+    def count_calls(self, name=None):
+        return sum(1 for _, fn, _ in self.calls if name is None or fn == name)
+
+
+class AsyncFakeNode(AsyncBaseProvider):
+    """
+    AsyncWeb3 provider in front of a `FakeNode`, answering each request after
+    `latency` seconds and tracking how many requests were in flight at once.
+    """
+
+    def __init__(self, node: FakeNode, latency=0.01):
+        super().__init__()
+        self.node = node
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def is_connected(self, show_traceback=False):
+        return True
+
+    async def make_request(self, method, params):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            return self.node.make_request(method, params)
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,14 @@
+# the stand-in node lives in `uniswap_liquidity.testing`, as the offline
+# benchmarks run against it too
+from uniswap_liquidity.testing.fake_node import (
+    POOL_ADDRESS,
+    POSITIONS,
+    TICK_LENS_ADDRESS,
+    AsyncFakeNode,
+    FakeMulticall3,
+    FakeNode,
+    FakePool,
+    FakeTickLens,
+    RpcError,
+    encode_log,
+)
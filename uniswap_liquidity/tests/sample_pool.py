@@ -0,0 +1,50 @@
+"""
+The sample pool most tests run against: the `POSITIONS` of the fake node
+module at tick 30, served by a `FakeNode` at `POOL_ADDRESS`.
+"""
+import unittest
+from typing import Tuple
+from web3 import Web3
+from uniswap_liquidity.uni_v3_pool import V3LiquidityPool
+from uniswap_liquidity.tests.fake_node import POOL_ADDRESS, POSITIONS, FakeNode, FakePool
+
+
+def sample_node(positions=POSITIONS, tick=30, **node_kwargs) -> Tuple[FakeNode, FakePool]:
+    """
+    A new node serving a pool of `positions` at `tick`, and that pool.
+    """
+    node = FakeNode(**node_kwargs)
+    fake_pool = FakePool.from_positions(positions, tick=tick)
+    node.add_pool(POOL_ADDRESS, fake_pool)
+    return node, fake_pool
+
+
+def sample_pool(positions=POSITIONS, tick=30) -> V3LiquidityPool:
+    """
+    A `V3LiquidityPool` on a node of its own, see `sample_node`.
+    """
+    node, _ = sample_node(positions, tick)
+    return V3LiquidityPool(POOL_ADDRESS, Web3(node))
+
+
+class SampleNodeTestCase(unittest.TestCase):
+    """
+    Sets up `self.node` serving the sample pool `self.fake_pool`, and
+    `self.w3` on it. `node_kwargs` are passed on to `FakeNode`.
+    """
+
+    node_kwargs: dict = {}
+
+    def setUp(self) -> None:
+        self.node, self.fake_pool = sample_node(**self.node_kwargs)
+        self.w3 = Web3(self.node)
+
+
+class SamplePoolTestCase(SampleNodeTestCase):
+    """
+    `SampleNodeTestCase`, also constructing the pool as `self.pool`.
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.pool = V3LiquidityPool(POOL_ADDRESS, self.w3)
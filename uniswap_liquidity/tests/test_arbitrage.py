@@ -0,0 +1,72 @@
+import unittest
+from web3 import Web3
+from eth_utils import to_checksum_address
+from uniswap_liquidity.uni_v3_pool import V3LiquidityPool
+from uniswap_liquidity.arbitrage import best_arbitrage, optimal_arbitrage
+from uniswap_liquidity.swap_simulator import simulate_swap
+from uniswap_liquidity.tests.fake_node import POSITIONS, FakeNode, FakePool
+
+CHEAP = to_checksum_address("0x" + "11" * 20)
+DEAR = to_checksum_address("0x" + "22" * 20)
+DEAREST = to_checksum_address("0x" + "33" * 20)
+OTHER_PAIR = to_checksum_address("0x" + "44" * 20)
+
+
+def round_trip_profit(buy_pool, sell_pool, amount_token0):
+    buy = simulate_swap(buy_pool, False, -amount_token0)
+    sell = simulate_swap(sell_pool, True, buy.amount_out)
+    return sell.amount_out - buy.amount_in
+
+
+class TestArbitrage(unittest.TestCase):
+    def setUp(self) -> None:
+        self.node = FakeNode()
+        self.node.add_pool(CHEAP, FakePool.from_positions(POSITIONS, tick=30))
+        # far enough apart that the optimum crosses several initialized ticks
+        self.node.add_pool(DEAR, FakePool.from_positions(POSITIONS, tick=1000, fee=500))
+        self.node.add_pool(DEAREST, FakePool.from_positions(POSITIONS, tick=2500, fee=10000))
+        self.node.add_pool(
+            OTHER_PAIR, FakePool.from_positions(POSITIONS, tick=0, token1="0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48")
+        )
+        w3 = Web3(self.node)
+        self.pools = {address: V3LiquidityPool(address, w3) for address in (CHEAP, DEAR, DEAREST, OTHER_PAIR)}
+
+    def test_optimum_is_a_local_maximum(self):
+        for buy, sell in [(CHEAP, DEAR), (CHEAP, DEAREST), (DEAR, DEAREST)]:
+            with self.subTest(buy=buy, sell=sell):
+                result = optimal_arbitrage(self.pools[buy], self.pools[sell])
+                self.assertEqual((result.buy_pool, result.sell_pool), (buy, sell))
+                self.assertEqual(result.profit, result.amount_out - result.amount_in)
+                self.assertEqual(result.profit, round_trip_profit(self.pools[buy], self.pools[sell], result.amount_token0))
+                self.assertGreater(result.profit, 0)
+                for factor in [0.5, 0.9, 0.99, 1.01, 1.1, 2]:
+                    amount = int(result.amount_token0 * factor)
+                    self.assertLessEqual(round_trip_profit(self.pools[buy], self.pools[sell], amount), result.profit)
+
+    def test_prices_meet_net_of_fees(self):
+        result = optimal_arbitrage(self.pools[CHEAP], self.pools[DEAR])
+        gamma = (1 - 3000 / 10**6) * (1 - 500 / 10**6)
+        self.assertAlmostEqual(gamma * result.sqrt_price_x96_sell**2 / result.sqrt_price_x96_buy**2, 1, places=9)
+
+    def test_no_profitable_trade(self):
+        self.assertIsNone(optimal_arbitrage(self.pools[DEAR], self.pools[CHEAP]))
+        self.assertIsNone(optimal_arbitrage(self.pools[CHEAP], self.pools[CHEAP]))
+        with self.assertRaises(ValueError):
+            optimal_arbitrage(self.pools[CHEAP], self.pools[OTHER_PAIR])
+
+    def test_best_arbitrage(self):
+        pools = [self.pools[address] for address in (DEAREST, CHEAP, DEAR)]
+        best = best_arbitrage(pools)
+        pairs = [(CHEAP, DEAR), (CHEAP, DEAREST), (DEAR, DEAREST)]
+        self.assertEqual(best, max((optimal_arbitrage(self.pools[a], self.pools[b]) for a, b in pairs), key=lambda r: r.profit))
+        self.assertIsNone(best_arbitrage([self.pools[CHEAP]]))
+
+    def test_offline_reuses_loaded_ticks(self):
+        expected = optimal_arbitrage(self.pools[CHEAP], self.pools[DEAR])
+        calls = self.node.count_calls()
+        self.assertEqual(optimal_arbitrage(self.pools[CHEAP], self.pools[DEAR], offline=True), expected)
+        self.assertEqual(self.node.count_calls(), calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
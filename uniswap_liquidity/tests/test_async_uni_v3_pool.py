@@ -0,0 +1,107 @@
+import asyncio
+import unittest
+from web3 import AsyncWeb3, Web3
+from uniswap_liquidity.async_uni_v3_pool import AsyncV3LiquidityPool, update_pools
+from uniswap_liquidity.block_cache import BlockCache
+from uniswap_liquidity.uni_v3_pool import V3LiquidityPool
+from uniswap_liquidity.liquidity_analyzer import get_tokens_to_target_price, get_tokens_to_target_price_async
+from uniswap_liquidity.metrics import RpcMetrics
+from uniswap_liquidity.tests.fake_node import POOL_ADDRESS, POSITIONS, AsyncFakeNode, FakePool
+from uniswap_liquidity.tests.sample_pool import SampleNodeTestCase
+
+
+class TestAsyncV3LiquidityPool(SampleNodeTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.provider = AsyncFakeNode(self.node)
+        self.w3 = AsyncWeb3(self.provider)
+
+    def test_matches_sync_pool(self):
+        pool = asyncio.run(AsyncV3LiquidityPool.create(POOL_ADDRESS, self.w3))
+        sync_pool = V3LiquidityPool(POOL_ADDRESS, Web3(self.node))
+        for attribute in ["token0", "token1", "fee", "slot0", "liquidity", "tick_spacing", "tick"]:
+            self.assertEqual(getattr(pool, attribute), getattr(sync_pool, attribute), attribute)
+        self.assertEqual(dict(pool.tick_data), dict(sync_pool.tick_data))
+        # the pool info reads were issued together
+        self.assertGreaterEqual(self.provider.max_in_flight, 6)
+
+    def test_update(self):
+        async def run():
+            pool = await AsyncV3LiquidityPool.create(POOL_ADDRESS, self.w3)
+            self.fake_pool.tick = 31
+            return pool, await pool.update()
+
+        pool, (updates, state) = asyncio.run(run())
+        self.assertTrue(updates)
+        self.assertEqual(state["tick"], 31)
+        self.assertEqual(pool.tick, 31)
+
+    def test_pinned_block_and_cache(self):
+        cache = BlockCache()
+        block_number = self.node.block_number
+
+        async def run():
+            pool = await AsyncV3LiquidityPool.create(POOL_ADDRESS, self.w3, block_identifier=block_number, cache=cache)
+            self.fake_pool.tick = 31
+            # already read at this block: served from the cache
+            other = await AsyncV3LiquidityPool.create(POOL_ADDRESS, self.w3, block_identifier=block_number, cache=cache)
+            updated = await other.update(block_number)
+            return pool, other, updated
+
+        self.node.requests.clear()
+        pool, other, (updates, _) = asyncio.run(run())
+        methods = [method for method, _ in self.node.requests]
+        self.assertNotIn("eth_blockNumber", methods)
+        self.assertEqual(methods.count("eth_call"), 7)
+        self.assertEqual((pool.block_number, other.block_number), (block_number, block_number))
+        self.assertEqual(other.tick, 30)
+        self.assertFalse(updates)
+
+    def test_tokens_to_target_price(self):
+        async def run(sqrt_target_price):
+            pool = await AsyncV3LiquidityPool.create(POOL_ADDRESS, self.w3)
+            return await get_tokens_to_target_price_async(pool, sqrt_target_price)
+
+        sync_pool = V3LiquidityPool(POOL_ADDRESS, Web3(self.node))
+        for target_multiplier in [1.05, 2.5, 0.95, 0.1]:
+            with self.subTest(target_multiplier=target_multiplier):
+                sqrt_target_price = sync_pool.sqrt_price_x96 / 2**96 * target_multiplier
+                self.assertEqual(
+                    asyncio.run(run(sqrt_target_price)),
+                    get_tokens_to_target_price(sync_pool, sqrt_target_price),
+                )
+
+    def test_tokens_to_target_price_operation(self):
+        operations = []
+        metrics = RpcMetrics(on_operation=operations.append)
+
+        async def run():
+            pool = await AsyncV3LiquidityPool.create(POOL_ADDRESS, self.w3, metrics=metrics)
+            return await get_tokens_to_target_price_async(pool, pool.sqrt_price_x96 / 2**96 * 2.5)
+
+        asyncio.run(run())
+        self.assertEqual([operation.name for operation in operations], ["construction", "get_tokens_to_target_price_async"])
+        self.assertGreater(operations[1].call_count, 0)
+
+    def test_unloaded_word(self):
+        pool = asyncio.run(AsyncV3LiquidityPool.create(POOL_ADDRESS, self.w3))
+        with self.assertRaises(LookupError):
+            get_tokens_to_target_price(pool, 0.1)
+
+    def test_bounded_concurrency(self):
+        addresses = [self.node.add_pool(f"0x{i:040x}", FakePool.from_positions(POSITIONS, tick=30)) for i in range(1, 21)]
+
+        async def run():
+            semaphore = asyncio.Semaphore(4)
+            pools = await asyncio.gather(
+                *(AsyncV3LiquidityPool.create(address, self.w3, semaphore=semaphore) for address in addresses)
+            )
+            return await update_pools(pools)
+
+        results = asyncio.run(run())
+        self.assertEqual(len(results), 20)
+        self.assertEqual(self.provider.max_in_flight, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import random
+import unittest
+from web3.exceptions import Web3RPCError
+from uniswap_liquidity.backfill import EVENT_NAMES, backfill_pool, iter_logs, iter_pool_events, is_result_limit_error
+from uniswap_liquidity.metrics import RpcMetrics
+from uniswap_liquidity.uni_v3_pool import V3LiquidityPool
+from uniswap_liquidity.v3_math import get_sqrt_ratio_at_tick
+from uniswap_liquidity.tests.fake_node import POOL_ADDRESS, encode_log
+from uniswap_liquidity.tests.sample_pool import SampleNodeTestCase
+
+OWNER = "0x000000000000000000000000000000000000dEaD"
+OTHER_POOL = "0x8ad599c3A0ff1De082011EFDDc58f1908eb6e6D8"
+
+
+def make_logs(address, blocks, seed=0):
+    """
+    Random Swap, Mint, Burn and Collect logs, a few per block in `blocks`.
+    """
+    rng = random.Random(seed)
+    logs = []
+    for block_number in blocks:
+        for log_index in range(rng.randint(0, 3)):
+            name = rng.choice(["Swap", "Mint", "Burn", "Collect"])
+            tick_lower = rng.randrange(-20, 0) * 60
+            tick_upper = rng.randrange(1, 20) * 60
+            if name == "Swap":
+                tick = rng.randrange(-600, 600)
+                args = {"sender": OWNER, "recipient": OWNER, "amount0": 1, "amount1": -1, "sqrtPriceX96": get_sqrt_ratio_at_tick(tick), "liquidity": 10**18, "tick": tick}
+            elif name == "Mint":
+                args = {"sender": OWNER, "owner": OWNER, "tickLower": tick_lower, "tickUpper": tick_upper, "amount": 10**15, "amount0": 0, "amount1": 0}
+            elif name == "Burn":
+                args = {"owner": OWNER, "tickLower": tick_lower, "tickUpper": tick_upper, "amount": 10**15, "amount0": 0, "amount1": 0}
+            else:
+                args = {"owner": OWNER, "recipient": OWNER, "tickLower": tick_lower, "tickUpper": tick_upper, "amount0": 5, "amount1": 7}
+            logs.append(encode_log(address, name, args, block_number, log_index))
+    return logs
+
+
+class TestBackfill(SampleNodeTestCase):
+    node_kwargs = {"block_number": 5000}
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.logs = make_logs(POOL_ADDRESS, range(100, 5000, 13))
+        # a busy stretch that needs narrow ranges
+        self.logs += [log for log in make_logs(POOL_ADDRESS, range(2000, 2100), seed=1) if (log["blockNumber"] - 100) % 13]
+        self.node.logs = make_logs(OTHER_POOL, range(100, 5000, 31), seed=2) + self.logs
+        self.logs.sort(key=lambda log: (log["blockNumber"], log["logIndex"]))
+
+    def get_logs_requests(self):
+        return [params[0] for method, params in self.node.requests if method == "eth_getLogs"]
+
+    def positions(self, items):
+        return [(item["blockNumber"], item["logIndex"]) for item in items]
+
+    def test_events_in_block_order(self):
+        events = list(iter_pool_events(self.w3, POOL_ADDRESS, 0, 4999, chunk_size=300, max_workers=3))
+        self.assertEqual(self.positions(events), self.positions(self.logs))
+        self.assertEqual({event["address"] for event in events}, {POOL_ADDRESS})
+        self.assertEqual({event["event"] for event in events}, {"Swap", "Mint", "Burn", "Collect"})
+        collect = next(event for event in events if event["event"] == "Collect")
+        self.assertEqual((collect["args"]["amount0"], collect["args"]["amount1"]), (5, 7))
+        self.assertEqual(len(self.get_logs_requests()), 17)
+
+    def test_splits_ranges_over_the_result_limit(self):
+        self.node.max_logs = 40
+        metrics = RpcMetrics()
+        events = list(iter_pool_events(self.w3, [POOL_ADDRESS], 0, "latest", chunk_size=1000, metrics=metrics))
+        self.assertEqual(self.positions(events), self.positions(self.logs))
+        requests = self.get_logs_requests()
+        self.assertGreater(len(requests), 5)
+        self.assertEqual(metrics.calls["eth_getLogs"], len(requests))
+        # the busy stretch is read in narrow ranges, and the chunk size grows
+        # back to `chunk_size` after it
+        spans = [(int(r["fromBlock"], 16), int(r["toBlock"], 16) - int(r["fromBlock"], 16) + 1) for r in requests]
+        self.assertLess(min(span for start, span in spans if 2000 <= start < 2100), 100)
+        self.assertEqual(max(span for start, span in spans if start > 2100), 1000)
+        self.assertEqual(requests[-1]["toBlock"], hex(5000))
+
+    def test_single_block_over_the_limit_raises(self):
+        self.node.max_logs = 1
+        with self.assertRaises(Web3RPCError) as context:
+            list(iter_logs(self.w3, POOL_ADDRESS, 0, 4999))
+        self.assertTrue(is_result_limit_error(context.exception))
+
+    def test_event_filter(self):
+        swaps = list(iter_pool_events(self.w3, POOL_ADDRESS, 1000, 1999, events=["Swap"]))
+        expected = [
+            log
+            for log in self.logs
+            if 1000 <= log["blockNumber"] <= 1999 and EVENT_NAMES[bytes(log["topics"][0])] == "Swap"
+        ]
+        self.assertEqual(self.positions(swaps), self.positions(expected))
+        with self.assertRaises(ValueError):
+            next(iter_pool_events(self.w3, POOL_ADDRESS, 0, 100, events=["Transfer"]))
+
+    def test_reads_ahead_at_most_max_workers_chunks(self):
+        # the first chunk has logs, so one chunk is consumed and one more read
+        events = iter_pool_events(self.w3, POOL_ADDRESS, 100, 4999, chunk_size=100, max_workers=2)
+        next(events)
+        self.assertLessEqual(len(self.get_logs_requests()), 3)
+        events.close()
+        self.assertLess(len(self.get_logs_requests()), 10)
+
+    def test_backfill_rebuilds_pool_state(self):
+        pool = V3LiquidityPool(POOL_ADDRESS, self.w3)
+        pool.load_tick_range(-1200, 1200)
+        expected = V3LiquidityPool(POOL_ADDRESS, self.w3)
+        expected.load_tick_range(-1200, 1200)
+        expected.apply_logs(self.logs)
+
+        events = list(backfill_pool(pool, 0, 4999, chunk_size=500))
+        self.assertEqual(len(events), len(self.logs))
+        self.assertEqual((pool.tick, pool.liquidity, pool.block_number), (expected.tick, expected.liquidity, expected.block_number))
+        self.assertEqual(dict(pool.tick_data), dict(expected.tick_data))
+
+
+if __name__ == "__main__":
+    unittest.main()
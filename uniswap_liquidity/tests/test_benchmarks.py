@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from uniswap_liquidity.benchmarks.run import (
+    BenchmarkResult,
+    find_regressions,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+from uniswap_liquidity.benchmarks.import_time import IMPORT_BUDGETS_MS, time_import
+from uniswap_liquidity.benchmarks.synthetic import DISTRIBUTIONS, PoolConfig, make_positions
+
+
+class TestSyntheticPools(unittest.TestCase):
+    def test_positions(self):
+        for distribution in DISTRIBUTIONS:
+            with self.subTest(distribution=distribution):
+                config = PoolConfig(positions=300, tick_spacing=10, span=500, distribution=distribution)
+                positions = make_positions(config)
+                self.assertEqual(positions, make_positions(config))
+                self.assertEqual(len(positions), 300)
+                for lower, upper, liquidity in positions:
+                    self.assertTrue(-5000 <= lower < upper <= 5000)
+                    self.assertEqual(lower % 10, 0)
+                    self.assertGreater(liquidity, 0)
+        with self.assertRaises(ValueError):
+            make_positions(PoolConfig(distribution="flat"))
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_run_and_compare(self):
+        config = PoolConfig(positions=50, span=300)
+        results = run_benchmarks(config, min_time=0.01)
+        self.assertIn("tick_walk", [result.name for result in results])
+        self.assertTrue(all(result.ops_per_sec > 0 for result in results))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            self.assertEqual(load_baseline(path, config), {})
+            save_baseline(path, config, results)
+            baseline = load_baseline(path, config)
+            self.assertEqual(load_baseline(path, config._replace(seed=1)), {})
+
+        self.assertEqual(find_regressions(results, baseline), [])
+        slower = [result._replace(ops_per_sec=result.ops_per_sec / 2) for result in results]
+        self.assertEqual(len(find_regressions(slower, baseline)), len(results))
+        fatter = [BenchmarkResult("tick_walk", 10**9, 0, baseline["tick_walk"]["peak_kib"] * 2 + 10)]
+        self.assertEqual(len(find_regressions(fatter, baseline)), 1)
+
+
+class TestImportTime(unittest.TestCase):
+    def test_math_modules_do_not_load_web3(self):
+        for module in IMPORT_BUDGETS_MS:
+            with self.subTest(module=module):
+                self.assertEqual(time_import(module, repeat=1).heavy_imports, ())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from uniswap_liquidity.block_cache import BlockCache
+from uniswap_liquidity.multicall import Multicall, update_pools
+from uniswap_liquidity.tick_lens import TickLens
+from uniswap_liquidity.uni_v3_pool import V3LiquidityPool
+from uniswap_liquidity.tests.fake_node import POOL_ADDRESS
+from uniswap_liquidity.tests.sample_pool import SampleNodeTestCase
+
+
+class TestBlockPinnedReads(SampleNodeTestCase):
+    node_kwargs = {"block_number": 1000}
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.cache = BlockCache()
+        self.tick_lens = TickLens(self.w3, cache=self.cache)
+
+    def eth_call_blocks(self):
+        return [params[1] for method, params in self.node.requests if method == "eth_call"]
+
+    def test_reads_pinned_to_one_block(self):
+        pool = V3LiquidityPool(POOL_ADDRESS, self.w3, tick_lens=self.tick_lens, cache=self.cache)
+        self.assertEqual(pool.block_number, 1000)
+        self.assertEqual(set(self.eth_call_blocks()), {hex(1000)})
+
+        self.node.block_number = 1001
+        self.fake_pool.tick = 31
+        self.node.requests.clear()
+        self.assertTrue(pool.update()[0])
+        self.assertEqual(pool.block_number, 1001)
+        pool.load_tick_range(-1200, 1800)
+        self.assertEqual(set(self.eth_call_blocks()), {hex(1001)})
+
+        # an explicit block is used as is
+        self.node.requests.clear()
+        pool.update(block_identifier=990)
+        self.assertEqual(pool.block_number, 990)
+        self.assertNotIn("eth_blockNumber", [method for method, _ in self.node.requests])
+
+    def test_shared_cache(self):
+        pool = V3LiquidityPool(POOL_ADDRESS, self.w3, tick_lens=self.tick_lens, cache=self.cache)
+        pool.load_tick_range(-1200, 1800)
+        self.node.requests.clear()
+        other = V3LiquidityPool(POOL_ADDRESS, self.w3, tick_lens=self.tick_lens, cache=self.cache)
+        other.load_tick_range(-1200, 1800)
+        self.assertEqual(self.eth_call_blocks(), [])
+        self.assertEqual(dict(other.tick_data), dict(pool.tick_data))
+        self.assertGreater(self.cache.hits, 0)
+
+        # a new block is read again
+        self.node.block_number = 1001
+        other.update()
+        self.assertEqual(self.eth_call_blocks(), [hex(1001)] * 2)
+
+    def test_multicall(self):
+        multicall = Multicall(self.w3, cache=self.cache)
+        pool = V3LiquidityPool(POOL_ADDRESS, self.w3, tick_lens=self.tick_lens, multicall=multicall, cache=self.cache)
+        self.assertEqual(pool.block_number, 1000)
+        self.assertEqual(self.node.count_calls("getBlockNumber"), 1)
+        self.assertNotIn("eth_blockNumber", [method for method, _ in self.node.requests])
+
+        self.node.requests.clear()
+        self.assertFalse(update_pools([pool], multicall, block_identifier=1000)[0][0])
+        self.assertEqual(self.eth_call_blocks(), [])
+        self.node.block_number = 1002
+        update_pools([pool], multicall)
+        self.assertEqual(pool.block_number, 1002)
+
+    def test_lru(self):
+        cache = BlockCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
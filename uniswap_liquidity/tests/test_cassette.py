@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+from web3 import Web3
+from uniswap_liquidity.cassette import Cassette, RecordingProvider, ReplayProvider
+from uniswap_liquidity.liquidity_analyzer import get_tokens_to_target_price, sqrt_x96_price_to_sqrt_price
+from uniswap_liquidity.uni_v3_pool import V3LiquidityPool
+from uniswap_liquidity.tests.fake_node import POOL_ADDRESS
+from uniswap_liquidity.tests.sample_pool import SampleNodeTestCase
+
+
+class TestCassette(SampleNodeTestCase):
+    def quote(self, provider):
+        pool = V3LiquidityPool(POOL_ADDRESS, Web3(provider))
+        target = sqrt_x96_price_to_sqrt_price(pool.sqrt_price_x96) * 1.05
+        return get_tokens_to_target_price(pool, target, use_tick_map=False)
+
+    def test_record_and_replay(self):
+        recorder = RecordingProvider(self.node)
+        expected = self.quote(recorder)
+        self.assertEqual(recorder.cassette.block_number, self.node.block_number)
+        self.assertGreater(recorder.count_calls("ticks"), 0)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "quote.json")
+            recorder.cassette.save(path)
+            cassette = Cassette.load(path)
+
+        # the node is no longer consulted
+        self.fake_pool.active_liquidity *= 2
+        self.node.requests.clear()
+        replay = ReplayProvider(cassette)
+        self.assertEqual(self.quote(replay), expected)
+        self.assertEqual(self.node.requests, [])
+        self.assertEqual(replay.count_calls("ticks"), recorder.count_calls("ticks"))
+        self.assertEqual(replay.count_calls(), recorder.count_calls())
+
+    def test_keyed_by_block(self):
+        cassette = Cassette()
+        self.quote(RecordingProvider(self.node, cassette, block_number=100))
+        self.fake_pool.tick = 31
+        self.fake_pool.sqrt_price_x96 += 1
+        self.quote(RecordingProvider(self.node, cassette, block_number=101))
+
+        self.assertEqual(V3LiquidityPool(POOL_ADDRESS, Web3(ReplayProvider(cassette, 100))).tick, 30)
+        self.assertEqual(V3LiquidityPool(POOL_ADDRESS, Web3(ReplayProvider(cassette, 101))).tick, 31)
+        with self.assertRaises(LookupError):
+            ReplayProvider(cassette, 102).make_request("eth_call", [{"to": POOL_ADDRESS, "data": "0x"}, "latest"])
+
+
+if __name__ == "__main__":
+    unittest.main()
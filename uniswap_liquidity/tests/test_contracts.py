@@ -0,0 +1,59 @@
+import gc
+import unittest
+import weakref
+from web3 import Web3
+from uniswap_liquidity.abi.uni_v3_lp_abi import V3_LP_ABI
+from uniswap_liquidity.contracts import contract_at, events_of, get_contract_factory
+from uniswap_liquidity.uni_v3_pool import V3LiquidityPool
+from uniswap_liquidity.tests.fake_node import POOL_ADDRESS, POSITIONS, FakeNode, FakePool
+from uniswap_liquidity.tests.sample_pool import SampleNodeTestCase, sample_node
+
+
+class TestContractHandles(SampleNodeTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.other_address = self.node.add_pool("0x" + "11" * 20, FakePool.from_positions(POSITIONS, tick=-7))
+
+    def test_shared_factory(self):
+        self.assertIs(get_contract_factory(V3_LP_ABI), get_contract_factory(V3_LP_ABI))
+
+        pool = contract_at(self.w3, POOL_ADDRESS, V3_LP_ABI)
+        # a handle on another Web3 instance calls through that instance
+        other_node = FakeNode()
+        other_node.add_pool(self.other_address, FakePool.from_positions(POSITIONS, tick=-7))
+        other = contract_at(Web3(other_node), self.other_address, V3_LP_ABI)
+        self.assertEqual(pool.functions.slot0().call()[1], 30)
+        self.assertEqual(other.functions.slot0().call()[1], -7)
+        self.assertEqual(other.functions.ticks(-60).address, self.other_address)
+        self.assertEqual(self.node.count_calls("slot0"), 1)
+        self.assertEqual(other_node.count_calls("slot0"), 1)
+        self.assertIs(pool.events.Swap().w3, self.w3)
+        self.assertIs(events_of(self.w3, V3_LP_ABI).Swap().w3, self.w3)
+        # anything else falls back to a full contract
+        self.assertEqual(pool.caller.slot0()[1], 30)
+        with self.assertRaises(ValueError):
+            contract_at(self.w3, POOL_ADDRESS.lower(), V3_LP_ABI)
+
+    def test_pools_share_tick_lens(self):
+        pool = V3LiquidityPool(POOL_ADDRESS, self.w3)
+        other = V3LiquidityPool(self.other_address, self.w3)
+        self.assertIs(pool.tick_lens, other.tick_lens)
+        self.assertIsNot(V3LiquidityPool(POOL_ADDRESS, Web3(self.node)).tick_lens, pool.tick_lens)
+
+    def test_web3_instances_are_freed(self):
+        instances = []
+        for _ in range(5):
+            node, _ = sample_node()
+            w3 = Web3(node)
+            V3LiquidityPool(POOL_ADDRESS, w3).get_tick(60)
+            instances.append(weakref.ref(w3))
+        # web3's `Method` descriptors keep the last module that used them, so
+        # make the same calls through another instance
+        V3LiquidityPool(POOL_ADDRESS, self.w3).get_tick(60)
+        del node, w3
+        gc.collect()
+        self.assertEqual([ref() for ref in instances], [None] * 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+from uniswap_liquidity.liquidity_analyzer import get_tokens_to_target_price, sqrt_x96_price_to_sqrt_price
+from uniswap_liquidity.depth_curve import DepthCurve, get_tokens_to_target_prices
+from uniswap_liquidity.tests.sample_pool import SamplePoolTestCase
+
+
+class TestDepthCurve(SamplePoolTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.sqrt_price = sqrt_x96_price_to_sqrt_price(self.pool.sqrt_price_x96)
+
+    def test_matches_scalar_walk(self):
+        targets = self.sqrt_price * np.array([0.2, 0.5, 0.95, 0.9999, 1.0, 1.0001, 1.003, 1.05, 1.5, 2.5])
+        amounts = get_tokens_to_target_prices(self.pool, targets)
+        for target, amount in zip(targets, amounts):
+            expected = get_tokens_to_target_price(self.pool, target)
+            self.assertAlmostEqual(amount, expected, delta=expected * 1e-9)
+
+    def test_exact_tick_targets(self):
+        targets = np.array([1.0001 ** (tick / 2) for tick in (-1200, -60, 60, 600, 1800)])
+        amounts = get_tokens_to_target_prices(self.pool, targets)
+        for target, amount in zip(targets, amounts):
+            expected = get_tokens_to_target_price(self.pool, target)
+            self.assertAlmostEqual(amount, expected, delta=expected * 1e-9)
+
+    def test_outside_of_range(self):
+        curve = DepthCurve(self.pool, -600, 600)
+        with self.assertRaises(ValueError):
+            curve.tokens_to_target_prices([self.sqrt_price * 2])
+
+
+class TestCachedDepthCurve(SamplePoolTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.sqrt_price = sqrt_x96_price_to_sqrt_price(self.pool.sqrt_price_x96)
+
+    def test_reused_within_block(self):
+        curve = self.pool.get_depth_curve()
+        get_tokens_to_target_prices(self.pool, [self.sqrt_price * 1.01])
+        self.node.requests.clear()
+        self.assertIs(self.pool.get_depth_curve(), curve)
+        self.assertEqual(self.pool.update()[0], False)
+        self.assertIs(self.pool.get_depth_curve(), curve)
+        self.assertAlmostEqual(
+            curve.tokens_to_target_price(self.sqrt_price * 1.01),
+            get_tokens_to_target_price(self.pool, self.sqrt_price * 1.01),
+            delta=1e6,
+        )
+
+    def test_widened_on_demand(self):
+        curve = self.pool.get_depth_curve(-600, 600)
+        wider = self.pool.get_depth_curve(-600, 40000)
+        self.assertIsNot(wider, curve)
+        self.assertEqual((wider.tick_lower, wider.tick_upper), (-600, 40000))
+        self.assertIs(self.pool.get_depth_curve(0, 30000), wider)
+
+    def test_invalidated_by_changes(self):
+        curve = self.pool.get_depth_curve()
+        self.fake_pool.tick = 31
+        self.assertEqual(self.pool.update()[0], True)
+        updated = self.pool.get_depth_curve()
+        self.assertIsNot(updated, curve)
+        self.pool.apply_mint(-60, 60, 10**18)
+        self.assertIsNot(self.pool.get_depth_curve(), updated)
+
+
+if __name__ == "__main__":
+    unittest.main()
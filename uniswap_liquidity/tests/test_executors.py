@@ -0,0 +1,30 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from uniswap_liquidity.executors import _executor, _submit_in_context
+from uniswap_liquidity.metrics import RpcMetrics
+
+
+class TestExecutors(unittest.TestCase):
+    def test_calls_count_towards_the_enclosing_operation(self):
+        metrics = RpcMetrics()
+        with _executor(None, 2) as executor, metrics.operation("fan_out") as cost:
+            futures = [_submit_in_context(executor, metrics.record, "eth_call", 0.0) for _ in range(5)]
+            for future in futures:
+                future.result()
+        self.assertEqual(cost.calls["eth_call"], 5)
+
+    def test_owns_only_the_pool_it_creates(self):
+        with _executor(None, 2) as executor:
+            pass
+        with self.assertRaises(RuntimeError):
+            executor.submit(print)
+
+        shared = ThreadPoolExecutor(max_workers=1)
+        with _executor(shared, 2) as executor:
+            self.assertIs(executor, shared)
+        self.assertEqual(shared.submit(sum, [1, 2]).result(), 3)
+        shared.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
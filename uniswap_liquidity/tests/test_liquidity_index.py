@@ -0,0 +1,78 @@
+import random
+import unittest
+from uniswap_liquidity.liquidity_index import FenwickTree
+from uniswap_liquidity.liquidity_analyzer import get_liquidity_within_sqrt_price_range, get_tokens_to_target_price_x96
+from uniswap_liquidity.tests.fake_node import POSITIONS
+from uniswap_liquidity.tests.sample_pool import SamplePoolTestCase, sample_pool
+
+
+class TestFenwickTree(unittest.TestCase):
+    def test_prefix_sums(self):
+        rng = random.Random(0)
+        values = [rng.randint(-100, 100) for _ in range(300)]
+        tree = FenwickTree(values)
+        for _ in range(100):
+            i = rng.randrange(300)
+            delta = rng.randint(-50, 50)
+            values[i] += delta
+            tree.add(i, delta)
+        for i in range(301):
+            self.assertEqual(tree.prefix_sum(i), sum(values[:i]))
+        self.assertEqual(tree.values(), values)
+
+
+class TestLiquidityWithinRange(SamplePoolTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.sqrt_price = self.pool.sqrt_price_x96 / 2**96
+
+    def walk(self, pool, sqrt_price):
+        # tokens leaving the pool when moving from the current price to `sqrt_price`
+        return get_tokens_to_target_price_x96(pool, int(sqrt_price * 2**96))
+
+    def assert_matches_walk(self, pool, low, high):
+        amount0, amount1 = get_liquidity_within_sqrt_price_range(pool, low, high)
+        expected0 = self.walk(pool, high) - self.walk(pool, max(low, self.sqrt_price)) if high > self.sqrt_price else 0
+        expected1 = self.walk(pool, low) - self.walk(pool, min(high, self.sqrt_price)) if low < self.sqrt_price else 0
+        self.assertAlmostEqual(amount0, expected0, delta=expected0 * 1e-12 + 10)
+        self.assertAlmostEqual(amount1, expected1, delta=expected1 * 1e-12 + 10)
+
+    def test_matches_walk(self):
+        for low, high in [(0.9, 1.1), (1.01, 1.5), (0.2, 0.97), (0.3, 3.0), (0.99999, 1.00001)]:
+            with self.subTest(low=low, high=high):
+                self.assert_matches_walk(self.pool, self.sqrt_price * low, self.sqrt_price * high)
+
+    def test_empty_range_raises(self):
+        for low, high in [(1.1, 0.9), (1.0, 1.0)]:
+            with self.subTest(low=low, high=high):
+                with self.assertRaises(ValueError):
+                    get_liquidity_within_sqrt_price_range(self.pool, self.sqrt_price * low, self.sqrt_price * high)
+
+    def test_sized_by_initialized_ticks(self):
+        self.pool.load_tick_range(-887220, 887220)
+        index = self.pool.get_liquidity_index()
+        # one slot per initialized tick, not per tick of the loaded span
+        self.assertEqual(len(index._liquidity_net), len(self.pool.tick_data))
+        self.assert_matches_walk(self.pool, self.sqrt_price * 0.05, self.sqrt_price * 20)
+
+    def test_updates_with_mint_and_burn(self):
+        get_liquidity_within_sqrt_price_range(self.pool, self.sqrt_price * 0.5, self.sqrt_price * 2)
+        index = self.pool._liquidity_index
+        size = len(index._liquidity_net)
+        # 1200 is a new tick, -600 an initialized one
+        self.pool.apply_mint(-600, 1200, 4 * 10**19)
+        self.pool.apply_burn(-60, 60, 5 * 10**19)
+        self.assertIs(self.pool._liquidity_index, index)
+        self.assertEqual(len(index._liquidity_net), size + 1)
+
+        expected = sample_pool(POSITIONS[:1] + POSITIONS[2:] + [(-600, 1200, 4 * 10**19)])
+        for low, high in [(0.5, 2.0), (0.98, 1.02)]:
+            with self.subTest(low=low, high=high):
+                self.assertEqual(
+                    get_liquidity_within_sqrt_price_range(self.pool, self.sqrt_price * low, self.sqrt_price * high),
+                    get_liquidity_within_sqrt_price_range(expected, self.sqrt_price * low, self.sqrt_price * high),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
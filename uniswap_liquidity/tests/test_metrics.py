@@ -0,0 +1,66 @@
+import unittest
+from web3 import Web3
+from uniswap_liquidity.liquidity_analyzer import get_tokens_to_target_price, sqrt_x96_price_to_sqrt_price
+from uniswap_liquidity.metrics import Histogram, RpcMetrics
+from uniswap_liquidity.multicall import Multicall
+from uniswap_liquidity.uni_v3_pool import V3LiquidityPool
+from uniswap_liquidity.tests.fake_node import POOL_ADDRESS
+from uniswap_liquidity.tests.sample_pool import SampleNodeTestCase
+
+
+class TestRpcMetrics(SampleNodeTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.operations = []
+        self.metrics = RpcMetrics(on_operation=self.operations.append)
+        self.pool = V3LiquidityPool(POOL_ADDRESS, self.w3, metrics=self.metrics)
+
+    def test_construction(self):
+        (construction,) = self.operations
+        self.assertEqual(construction.name, "construction")
+        self.assertEqual(construction.call_count, 8)
+        self.assertEqual(construction.calls["eth_blockNumber"], 1)
+        self.assertEqual(construction.calls["getPopulatedTicksInWord"], 1)
+        self.assertEqual(self.metrics.calls["slot0"], 1)
+        self.assertEqual(self.metrics.latency["slot0"].count, 1)
+
+    def test_per_quote_cost(self):
+        target = sqrt_x96_price_to_sqrt_price(self.pool.sqrt_price_x96) * 1.5
+        get_tokens_to_target_price(self.pool, target)
+        get_tokens_to_target_price(self.pool, target, use_tick_map=False)
+        with self.metrics.operation("batch") as batch:
+            self.pool.update()
+            get_tokens_to_target_price(self.pool, target, use_tick_map=False)
+
+        tick_map_quote, per_tick_quote, nested_quote, _ = self.operations[1:]
+        self.assertEqual(tick_map_quote.name, "get_tokens_to_target_price")
+        self.assertEqual(tick_map_quote.call_count, self.node.count_calls("getPopulatedTicksInWord") - 1)
+        self.assertEqual(per_tick_quote.calls["ticks"], self.node.count_calls("ticks") / 2)
+        self.assertGreater(per_tick_quote.seconds, 0)
+        self.assertEqual(batch.call_count, nested_quote.call_count + 3)
+        self.assertIs(self.metrics.most_expensive(1)[0], batch)
+
+    def test_multicall(self):
+        metrics = RpcMetrics()
+        V3LiquidityPool(POOL_ADDRESS, Web3(self.node), multicall=Multicall(Web3(self.node), metrics=metrics), metrics=metrics)
+        self.assertEqual(metrics.calls, {"aggregate3": 1, "getPopulatedTicksInWord": 1})
+
+    def test_prometheus(self):
+        self.pool.update()
+        text = self.metrics.to_prometheus()
+        self.assertIn('uniswap_liquidity_rpc_calls_total{method="slot0"} 2\n', text)
+        self.assertIn('uniswap_liquidity_rpc_latency_seconds_count{method="slot0"} 2\n', text)
+        self.assertIn('uniswap_liquidity_rpc_latency_seconds_bucket{method="slot0",le="+Inf"} 2\n', text)
+        self.assertIn('uniswap_liquidity_operation_rpc_calls_bucket{operation="construction",le="5.0"} 0\n', text)
+        self.assertIn('uniswap_liquidity_operation_rpc_calls_bucket{operation="construction",le="10.0"} 1\n', text)
+
+    def test_histogram(self):
+        histogram = Histogram((1, 2, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(histogram.cumulative_counts(), [2, 2, 3, 4])
+        self.assertEqual(histogram.sum, 14.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from uniswap_liquidity.uni_v3_pool import V3LiquidityPool
+from uniswap_liquidity.multicall import Multicall, update_pools
+from uniswap_liquidity.tests.fake_node import POOL_ADDRESS, POSITIONS, FakePool
+from uniswap_liquidity.tests.sample_pool import SampleNodeTestCase
+
+
+class TestMulticall(SampleNodeTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.multicall = Multicall(self.w3)
+
+    def eth_calls(self):
+        return sum(1 for method, _ in self.node.requests if method == "eth_call")
+
+    def test_construction_matches_sequential_reads(self):
+        batched = V3LiquidityPool(POOL_ADDRESS, self.w3, multicall=self.multicall)
+        sequential = V3LiquidityPool(POOL_ADDRESS, self.w3)
+        for attribute in ["token0", "token1", "fee", "slot0", "liquidity", "tick_spacing", "sqrt_price_x96", "tick"]:
+            self.assertEqual(getattr(batched, attribute), getattr(sequential, attribute), attribute)
+        self.assertEqual(dict(batched.tick_data), dict(sequential.tick_data))
+
+    def test_construction_across_chunks(self):
+        addresses = [self.node.add_pool(f"0x{i:040x}", FakePool.from_positions(POSITIONS, tick=30)) for i in range(1, 6)]
+        multicall = Multicall(self.w3, max_calls=4)
+        self.node.blocks_per_call = 1
+        for address in addresses:
+            self.node.call_blocks.clear()
+            block_number = self.node.block_number
+            pool = V3LiquidityPool(address, self.w3, multicall=multicall)
+            # the six pool reads and getBlockNumber take two chunks, then the tick word
+            self.assertEqual(self.node.call_blocks, [block_number] * 3)
+            self.assertEqual(pool.block_number, block_number)
+            self.assertEqual(pool.tick, 30)
+
+    def test_round_trips(self):
+        pool = V3LiquidityPool(POOL_ADDRESS, self.w3, multicall=self.multicall)
+        # pool info, then the tick word around the current tick
+        self.assertEqual(self.eth_calls(), 2)
+        self.node.requests.clear()
+        self.assertEqual(pool.update()[0], False)
+        self.assertEqual(self.eth_calls(), 1)
+
+    def test_update_pools(self):
+        addresses = [f"0x{i:040x}" for i in range(1, 201)]
+        fake_pools = [FakePool.from_positions(POSITIONS, tick=30) for _ in addresses]
+        addresses = [self.node.add_pool(address, fake_pool) for address, fake_pool in zip(addresses, fake_pools)]
+        pools = [V3LiquidityPool(address, self.w3, multicall=self.multicall) for address in addresses]
+        fake_pools[7].active_liquidity += 1
+        fake_pools[42].tick = 31
+
+        self.node.requests.clear()
+        results = update_pools(pools, self.multicall)
+        self.assertEqual(self.eth_calls(), 1)
+        self.assertEqual([i for i, (updates, _) in enumerate(results) if updates], [7, 42])
+        self.assertEqual(pools[42].tick, 31)
+
+    def test_chunks_read_one_block(self):
+        addresses = [self.node.add_pool(f"0x{i:040x}", FakePool.from_positions(POSITIONS, tick=30)) for i in range(1, 11)]
+        multicall = Multicall(self.w3, max_calls=4)
+        pools = [V3LiquidityPool(address, self.w3, multicall=multicall) for address in addresses]
+        self.node.blocks_per_call = 1
+        self.node.call_blocks.clear()
+        block_number = self.node.block_number
+        update_pools(pools, multicall)
+        # 20 calls and getBlockNumber in six chunks, all at the block of the first
+        self.assertEqual(self.node.call_blocks, [block_number] * 6)
+        self.assertEqual({pool.block_number for pool in pools}, {block_number})
+
+    def test_failed_call(self):
+        missing = V3LiquidityPool(POOL_ADDRESS, self.w3)._pool_contract.functions.slot0()
+        missing.address = "0x0000000000000000000000000000000000000001"
+        with self.assertRaises(Exception):
+            self.multicall.aggregate([missing])
+        self.assertEqual(self.multicall.aggregate([missing], allow_failure=True), [None])
+
+
+if __name__ == "__main__":
+    unittest.main()
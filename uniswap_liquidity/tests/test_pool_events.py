@@ -0,0 +1,60 @@
+import unittest
+from uniswap_liquidity.v3_math import get_sqrt_ratio_at_tick
+from uniswap_liquidity.tests.fake_node import POOL_ADDRESS, POSITIONS, encode_log
+from uniswap_liquidity.tests.sample_pool import SamplePoolTestCase, sample_pool
+
+OWNER = "0x000000000000000000000000000000000000dEaD"
+
+
+class TestPoolEvents(SamplePoolTestCase):
+    def mint(self, tick_lower, tick_upper, amount, block_number, log_index=0):
+        args = {"sender": OWNER, "owner": OWNER, "tickLower": tick_lower, "tickUpper": tick_upper, "amount": amount, "amount0": 0, "amount1": 0}
+        return encode_log(POOL_ADDRESS, "Mint", args, block_number, log_index)
+
+    def burn(self, tick_lower, tick_upper, amount, block_number, log_index=0):
+        args = {"owner": OWNER, "tickLower": tick_lower, "tickUpper": tick_upper, "amount": amount, "amount0": 0, "amount1": 0}
+        return encode_log(POOL_ADDRESS, "Burn", args, block_number, log_index)
+
+    def swap(self, tick, liquidity, block_number, log_index=0):
+        args = {"sender": OWNER, "recipient": OWNER, "amount0": 1, "amount1": -1, "sqrtPriceX96": get_sqrt_ratio_at_tick(tick), "liquidity": liquidity, "tick": tick}
+        return encode_log(POOL_ADDRESS, "Swap", args, block_number, log_index)
+
+    def assert_same_state(self, pool, expected):
+        self.assertEqual(pool.liquidity, expected.liquidity)
+        self.assertEqual(pool.tick, expected.tick)
+        self.assertEqual(dict(pool.tick_data), dict(expected.tick_data))
+
+    def test_mint_and_burn(self):
+        self.pool.load_tick_range(-1200, 1800)
+        logs = [
+            self.mint(-180, 300, 10**18, 100),
+            self.mint(-1200, 1800, 5 * 10**19, 100, 1),
+            self.burn(-120, 240, 7 * 10**18, 101),
+        ]
+        self.assertTrue(self.pool.apply_logs(logs))
+        positions = POSITIONS[:4] + [(-180, 300, 10**18), (-1200, 1800, 5 * 10**19)]
+        expected = sample_pool(positions)
+        expected.load_tick_range(-1200, 1800)
+        self.assert_same_state(self.pool, expected)
+        self.assertEqual(self.pool.block_number, 101)
+
+    def test_swap(self):
+        self.pool.apply_logs([self.swap(-300, 12345, 100)])
+        self.assertEqual(self.pool.tick, -300)
+        self.assertEqual(self.pool.liquidity, 12345)
+        self.assertEqual(self.pool.sqrt_price_x96, get_sqrt_ratio_at_tick(-300))
+
+    def test_replayed_logs_are_ignored(self):
+        logs = [self.mint(120, 300, 10**18, 100), self.swap(-300, 12345, 101)]
+        self.assertTrue(self.pool.apply_logs(logs))
+        self.assertFalse(self.pool.apply_logs(logs))
+        self.assertEqual(self.pool.tick_data[120], (10**18, 10**18))
+
+    def test_unloaded_words_are_skipped(self):
+        self.pool.apply_logs([self.mint(-30000, 30000, 10**18, 100)])
+        self.assertNotIn(-30000, self.pool.tick_data)
+        self.assertEqual(self.pool.liquidity, sample_pool(POSITIONS + [(-30000, 30000, 10**18)]).liquidity)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from web3 import Web3
+from uniswap_liquidity.pool_registry import PoolRegistry
+from uniswap_liquidity.tests.fake_node import POSITIONS, FakeNode, FakePool
+
+
+class TestPoolRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        self.node = FakeNode()
+        self.fake_pools = [FakePool.from_positions(POSITIONS, tick=30) for _ in range(40)]
+        self.addresses = [
+            self.node.add_pool(f"0x{i + 1:040x}", fake_pool) for i, fake_pool in enumerate(self.fake_pools)
+        ]
+        self.registry = PoolRegistry(Web3(self.node), batch_size=10)
+        self.registry.add_many(self.addresses)
+
+    def tearDown(self) -> None:
+        self.registry.close()
+
+    def test_shared_contracts(self):
+        self.assertEqual(len(self.registry), 40)
+        self.assertEqual({id(pool.tick_lens) for pool in self.registry}, {id(self.registry.tick_lens)})
+        self.assertIs(self.registry.add(self.addresses[0]), self.registry[self.addresses[0]])
+
+    def test_refresh_reports_changes(self):
+        self.fake_pools[3].tick = 31
+        self.fake_pools[25].active_liquidity += 1
+        self.node.block_number += 1
+        self.node.requests.clear()
+        result = self.registry.refresh()
+        self.assertEqual(sorted(result.updated), sorted([self.addresses[3], self.addresses[25]]))
+        self.assertEqual(len(result.unchanged), 38)
+        self.assertEqual(result.timed_out, [])
+        # one multicall per batch, all at the block resolved once up front
+        calls = [params for method, params in self.node.requests if method == "eth_call"]
+        self.assertEqual(len(calls), 4)
+        self.assertEqual({params[1] for params in calls}, {hex(self.node.block_number)})
+        self.assertEqual(sum(1 for method, _ in self.node.requests if method == "eth_blockNumber"), 1)
+        self.assertEqual(self.registry[self.addresses[3]].tick, 31)
+        self.assertEqual(self.registry[self.addresses[3]].block_number, self.node.block_number)
+
+        # the same block again is served from the shared cache
+        self.node.requests.clear()
+        self.assertEqual(len(self.registry.refresh(self.node.block_number).unchanged), 40)
+        self.assertEqual(self.node.requests, [])
+
+    def test_refresh_reads_one_block(self):
+        self.node.block_number += 1
+        self.node.blocks_per_call = 1
+        self.node.call_blocks.clear()
+        block_number = self.node.block_number
+        self.registry.refresh()
+        self.assertEqual(self.node.call_blocks, [block_number] * 4)
+        self.assertEqual({pool.block_number for pool in self.registry}, {block_number})
+
+    def test_latency_budget(self):
+        self.fake_pools[0].delay = 0.5
+        self.fake_pools[0].tick = 31
+        self.fake_pools[15].tick = 31
+        self.node.block_number += 1
+        result = self.registry.refresh(latency_budget=0.2)
+        self.assertEqual(sorted(result.timed_out), sorted(self.addresses[:10]))
+        self.assertEqual(result.updated, [self.addresses[15]])
+        self.assertEqual(self.registry[self.addresses[0]].tick, 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
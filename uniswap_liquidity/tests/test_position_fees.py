@@ -0,0 +1,102 @@
+import unittest
+from eth_abi.packed import encode_packed
+from eth_utils import keccak
+from web3 import Web3
+from uniswap_liquidity.multicall import Multicall
+from uniswap_liquidity.uni_v3_pool import V3LiquidityPool
+from uniswap_liquidity.position_fees import (
+    PositionFees,
+    get_fee_growth_inside,
+    get_fees_owed,
+    get_uncollected_fees,
+    position_key,
+)
+from uniswap_liquidity.v3_math import MAX_UINT256, Q128
+from uniswap_liquidity.tests.fake_node import POOL_ADDRESS, POSITIONS, FakeNode, FakePool
+
+ALICE = "0x1111111111111111111111111111111111111111"
+BOB = "0x2222222222222222222222222222222222222222"
+
+
+class TestFeeMath(unittest.TestCase):
+    def test_position_key(self):
+        for tick_lower, tick_upper in [(-60, 60), (-887220, 887220), (600, 30000)]:
+            with self.subTest(tick_lower=tick_lower, tick_upper=tick_upper):
+                expected = keccak(encode_packed(["address", "int24", "int24"], [ALICE, tick_lower, tick_upper]))
+                self.assertEqual(position_key(ALICE, tick_lower, tick_upper), expected)
+
+    def test_fee_growth_inside(self):
+        # below, inside and above the range
+        self.assertEqual(get_fee_growth_inside(-100, -60, 60, 2, 3, 10), 10 - (10 - 2) - 3 & MAX_UINT256)
+        self.assertEqual(get_fee_growth_inside(0, -60, 60, 2, 3, 10), 5)
+        self.assertEqual(get_fee_growth_inside(60, -60, 60, 2, 3, 10), 10 - 2 - (10 - 3))
+
+    def test_fees_owed_wrap_around(self):
+        # the growth counters overflow, only their difference matters
+        inside = get_fee_growth_inside(0, -60, 60, 3 * Q128, 0, Q128)
+        self.assertEqual(inside, MAX_UINT256 + 1 - 2 * Q128)
+        self.assertEqual(get_fees_owed(10**18, inside, MAX_UINT256 + 1 - 5 * Q128), 3 * 10**18)
+        self.assertEqual(get_fees_owed(10**18, 5 * Q128 + Q128 // 2, 5 * Q128), 10**18 // 2)
+
+
+class TestUncollectedFees(unittest.TestCase):
+    def setUp(self) -> None:
+        positions_by_key = {
+            position_key(ALICE, -60, 60): (10**18, Q128, 0, 3, 4),
+            position_key(ALICE, 600, 30000): (2 * 10**18, 0, 0, 0, 0),
+            position_key(BOB, -60, 60): (5 * 10**17, 0, Q128 // 4, 0, 0),
+        }
+        fake_pool = FakePool.from_positions(
+            POSITIONS,
+            tick=30,
+            fee_growth_global=(5 * Q128, 7 * Q128),
+            fee_growth_outside={
+                -60: (Q128, 2 * Q128),
+                60: (Q128 // 2, Q128),
+                600: (Q128 // 4, Q128 // 2),
+                30000: (Q128 // 8, 0),
+            },
+            positions_by_key=positions_by_key,
+        )
+        self.node = FakeNode()
+        self.node.add_pool(POOL_ADDRESS, fake_pool)
+        self.w3 = Web3(self.node)
+        self.positions = [(ALICE, -60, 60), (ALICE, 600, 30000), (BOB, -60, 60), (ALICE, -60, 60)]
+        # fee growth inside [-60, 60) is (5 - 1 - 1/2, 7 - 2 - 1), and inside
+        # [600, 30000), above the price, (1/4 - 1/8, 1/2 - 0)
+        alice = PositionFees(ALICE, -60, 60, 10**18, 3 + 5 * 10**18 // 2, 4 + 4 * 10**18)
+        self.expected = [
+            alice,
+            PositionFees(ALICE, 600, 30000, 2 * 10**18, 2 * 10**18 // 8, 10**18),
+            PositionFees(BOB, -60, 60, 5 * 10**17, 175 * 10**16, 1875 * 10**15),
+            alice,
+        ]
+
+    def test_fees(self):
+        pool = V3LiquidityPool(POOL_ADDRESS, self.w3)
+        self.node.calls.clear()
+        self.assertEqual(get_uncollected_fees(pool, self.positions), self.expected)
+        # shared ticks and repeated positions are read once
+        self.assertEqual(self.node.count_calls("ticks"), 4)
+        self.assertEqual(self.node.count_calls("positions"), 3)
+
+    def test_fees_in_one_multicall(self):
+        pool = V3LiquidityPool(POOL_ADDRESS, self.w3, multicall=Multicall(self.w3))
+        self.node.requests.clear()
+        self.assertEqual(get_uncollected_fees(pool, self.positions), self.expected)
+        self.assertEqual([method for method, _ in self.node.requests if method == "eth_call"], ["eth_call"])
+
+    def test_reads_are_pinned_to_one_block(self):
+        pool = V3LiquidityPool(POOL_ADDRESS, self.w3, multicall=Multicall(self.w3, max_calls=3))
+        pool.block_number = None
+        self.node.requests.clear()
+        self.node.calls.clear()
+        get_uncollected_fees(pool, self.positions)
+        blocks = {params[1] for method, params in self.node.requests if method == "eth_call"}
+        self.assertEqual(len(blocks), 1)
+        self.assertNotIn("latest", blocks)
+        self.assertEqual(self.node.count_calls("aggregate3"), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import contextlib
+import io
+import unittest
+import numpy as np
+from uniswap_liquidity.abi.erc20_abi import ERC_20_SIMPLE_ABI
+from uniswap_liquidity.liquidity_math import get_token_amounts, get_token_amounts_x96
+from uniswap_liquidity.position_valuation import get_token_decimals, value_pool_positions, value_positions
+from uniswap_liquidity.tests.sample_pool import SamplePoolTestCase
+
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+
+
+class FakeToken:
+    def __init__(self, decimals):
+        self._decimals = decimals
+
+    def decimals(self):
+        return self._decimals
+
+
+class TestPositionValuation(SamplePoolTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.node.add_contract(DAI, ERC_20_SIMPLE_ABI, FakeToken(18))
+        self.node.add_contract(WETH, ERC_20_SIMPLE_ABI, FakeToken(6))
+        # in range, below, above and on the current tick's edges
+        self.liquidity = [10**20, 3 * 10**18, 7 * 10**19, 10**18, 10**18]
+        self.tick_lower = [-1200, 600, -40020, 30, -600]
+        self.tick_upper = [1800, 30000, -600, 60, 30]
+
+    def test_matches_single_position_valuation(self):
+        amount0, amount1 = value_positions(self.pool.sqrt_price_x96, self.liquidity, self.tick_lower, self.tick_upper)
+        for i, position in enumerate(zip(self.liquidity, self.tick_lower, self.tick_upper)):
+            with self.subTest(position=position):
+                # float cancellation near a range edge is relative to the liquidity
+                noise = position[0] * 1e-15
+                exact = get_token_amounts_x96(position[0], self.pool.sqrt_price_x96, *position[1:])
+                self.assertAlmostEqual(amount0[i], exact[0], delta=exact[0] * 1e-9 + noise)
+                self.assertAlmostEqual(amount1[i], exact[1], delta=exact[1] * 1e-9 + noise)
+                approximate = get_token_amounts(position[0], self.pool.sqrt_price_x96, *position[1:])
+                self.assertAlmostEqual(amount0[i], approximate[0], delta=approximate[0] * 1e-9 + noise)
+                self.assertAlmostEqual(amount1[i], approximate[1], delta=approximate[1] * 1e-9 + noise)
+
+    def test_scales_by_decimals(self):
+        raw = value_positions(self.pool.sqrt_price_x96, self.liquidity, self.tick_lower, self.tick_upper)
+        scaled = value_positions(self.pool.sqrt_price_x96, self.liquidity, self.tick_lower, self.tick_upper, 18, 6)
+        np.testing.assert_allclose(scaled.amount0, raw.amount0 / 1e18)
+        np.testing.assert_allclose(scaled.amount1, raw.amount1 / 1e6)
+        with self.assertRaises(ValueError):
+            value_positions(self.pool.sqrt_price_x96, [1], [60], [60])
+
+    def test_pool_positions_resolve_decimals_once(self):
+        expected = value_positions(self.pool.sqrt_price_x96, self.liquidity, self.tick_lower, self.tick_upper, 18, 6)
+        for _ in range(3):
+            amounts = value_pool_positions(self.pool, self.liquidity, self.tick_lower, self.tick_upper)
+            np.testing.assert_allclose(amounts.amount0, expected.amount0)
+            np.testing.assert_allclose(amounts.amount1, expected.amount1)
+        self.assertEqual(self.node.count_calls("decimals"), 2)
+        self.assertEqual(get_token_decimals(self.w3, WETH), 6)
+        self.assertEqual(self.node.count_calls("decimals"), 2)
+
+        amounts = value_pool_positions(self.pool, self.liquidity, self.tick_lower, self.tick_upper, decimals=(0, 0))
+        np.testing.assert_allclose(amounts.amount1, expected.amount1 * 1e6)
+
+    def test_no_output(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            value_pool_positions(self.pool, self.liquidity, self.tick_lower, self.tick_upper)
+            get_token_amounts(10**18, self.pool.sqrt_price_x96, -60, 60)
+        self.assertEqual(out.getvalue(), "")
+
+    def test_decimals_are_deprecated(self):
+        with self.assertWarns(DeprecationWarning):
+            amounts = get_token_amounts(10**18, self.pool.sqrt_price_x96, -60, 60, 18, 18)
+        self.assertEqual(amounts, get_token_amounts(10**18, self.pool.sqrt_price_x96, -60, 60))
+
+
+if __name__ == "__main__":
+    unittest.main()
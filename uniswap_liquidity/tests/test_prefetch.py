@@ -0,0 +1,60 @@
+import unittest
+from web3 import Web3
+from uniswap_liquidity.metrics import RpcMetrics
+from uniswap_liquidity.multicall import Multicall
+from uniswap_liquidity.uni_v3_pool import V3LiquidityPool
+from uniswap_liquidity.v3_math import MAX_TICK, MIN_TICK
+from uniswap_liquidity.tests.fake_node import POOL_ADDRESS, POSITIONS, FakeNode, FakePool
+
+# a deep pool: positions spread over most of the tick range
+DEEP_POSITIONS = POSITIONS + [(-887220, 887220, 10**15), (-600000, -300000, 10**16), (120000, 480000, 10**16)]
+
+
+class TestPrefetchTicks(unittest.TestCase):
+    def setUp(self) -> None:
+        self.node = FakeNode()
+        self.fake_pool = FakePool.from_positions(DEEP_POSITIONS, tick=30)
+        self.node.add_pool(POOL_ADDRESS, self.fake_pool)
+        self.w3 = Web3(self.node)
+
+    def assert_complete(self, pool):
+        self.assertEqual(dict(pool.tick_data), self.fake_pool.tick_map)
+        word_lower, _ = pool.get_tick_bitmap_position(MIN_TICK)
+        word_upper, _ = pool.get_tick_bitmap_position(MAX_TICK)
+        self.assertEqual(pool.tick_words, set(range(word_lower, word_upper + 1)))
+
+    def test_full_prefetch(self):
+        metrics = RpcMetrics()
+        pool = V3LiquidityPool(POOL_ADDRESS, self.w3, metrics=metrics)
+        self.node.calls.clear()
+        populated = pool.prefetch_ticks(max_workers=4)
+        self.assert_complete(pool)
+        # every populated word but the current one, loaded on construction
+        expected = {(tick // 60) >> 8 for tick in self.fake_pool.tick_map} - {0}
+        self.assertEqual(populated, sorted(expected))
+        self.assertEqual(self.node.count_calls("getPopulatedTicksInWord"), len(expected))
+        self.assertEqual(self.node.count_calls("tickBitmap"), len(pool.tick_words) - 1)
+        self.assertEqual(metrics.operations[-1].calls["tickBitmap"], len(pool.tick_words) - 1)
+
+        # nothing left to fetch
+        self.node.calls.clear()
+        self.assertEqual(pool.prefetch_ticks(), [])
+        self.assertEqual(self.node.calls, [])
+
+    def test_multicall_round_trips(self):
+        pool = V3LiquidityPool(POOL_ADDRESS, self.w3, multicall=Multicall(self.w3, max_calls=50))
+        self.node.requests.clear()
+        pool.prefetch_ticks()
+        self.assert_complete(pool)
+        # ~116 bitmap words in chunks of 50, then one chunk of tick words
+        self.assertEqual(sum(1 for method, _ in self.node.requests if method == "eth_call"), 4)
+
+    def test_range(self):
+        pool = V3LiquidityPool(POOL_ADDRESS, self.w3)
+        self.assertEqual(pool.prefetch_ticks(-600000, 0), [pool.get_tick_bitmap_position(-600000)[0], pool.get_tick_bitmap_position(-300000)[0], -3, -1])
+        self.assertIn(-300000, pool.tick_data)
+        self.assertNotIn(120000, pool.tick_data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from web3 import Web3
+from eth_utils import to_checksum_address
+from uniswap_liquidity.uni_v3_pool import V3LiquidityPool
+from uniswap_liquidity.route_quoter import (
+    PoolIndex,
+    quote_exact_input_path,
+    quote_exact_output_path,
+    rank_paths,
+    split_path,
+)
+from uniswap_liquidity.swap_simulator import quote_exact_input, quote_exact_output
+from uniswap_liquidity.tests.fake_node import POSITIONS, FakeNode, FakePool
+
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+DAI_WETH = to_checksum_address("0x" + "11" * 20)
+USDC_WETH = to_checksum_address("0x" + "22" * 20)
+DAI_USDC = to_checksum_address("0x" + "33" * 20)
+DAI_WETH_LOW = to_checksum_address("0x" + "44" * 20)
+
+
+class TestRouteQuoter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.node = FakeNode()
+        self.node.add_pool(DAI_WETH, FakePool.from_positions(POSITIONS, tick=30, token0=DAI, token1=WETH))
+        self.node.add_pool(USDC_WETH, FakePool.from_positions(POSITIONS, tick=-90, token0=USDC, token1=WETH))
+        self.node.add_pool(
+            DAI_USDC, FakePool.from_positions(POSITIONS, tick=0, token0=DAI, token1=USDC, fee=500, tick_spacing=10)
+        )
+        # a much shallower DAI/WETH pool on another fee tier
+        shallow = [(lower, upper, liquidity // 1000) for lower, upper, liquidity in POSITIONS]
+        self.node.add_pool(DAI_WETH_LOW, FakePool.from_positions(shallow, tick=30, token0=DAI, token1=WETH, fee=500))
+        w3 = Web3(self.node)
+        self.pools = {address: V3LiquidityPool(address, w3) for address in (DAI_WETH, USDC_WETH, DAI_USDC, DAI_WETH_LOW)}
+
+    def test_split_path(self):
+        self.assertEqual(split_path([DAI, 500, USDC, 3000, WETH]), [(DAI, 500, USDC), (USDC, 3000, WETH)])
+        for path in [[DAI], [DAI, 500], [DAI, 500, USDC, 3000]]:
+            with self.subTest(path=path):
+                with self.assertRaises(ValueError):
+                    split_path(path)
+
+    def test_single_hop_matches_pool_quote(self):
+        for path, zero_for_one in [([DAI, 3000, WETH], True), ([WETH, 3000, DAI], False)]:
+            with self.subTest(path=path):
+                route = quote_exact_input_path(path, self.pools.values(), 10**18)
+                expected = quote_exact_input(self.pools[DAI_WETH], zero_for_one, 10**18)
+                self.assertEqual(route.amount_out, expected.amount_out)
+                self.assertEqual(route.hops[0].sqrt_price_x96, expected.sqrt_price_x96)
+                self.assertEqual(route.hops[0].pool, DAI_WETH)
+
+    def test_exact_input_chains_hops(self):
+        route = quote_exact_input_path([DAI, 500, USDC, 3000, WETH], self.pools.values(), 10**18)
+        first = quote_exact_input(self.pools[DAI_USDC], True, 10**18)
+        second = quote_exact_input(self.pools[USDC_WETH], True, first.amount_out)
+        self.assertEqual([hop.pool for hop in route.hops], [DAI_USDC, USDC_WETH])
+        self.assertEqual([hop.amount_in for hop in route.hops], [10**18, first.amount_out])
+        self.assertEqual(route.hops[1].amount_out, second.amount_out)
+        self.assertEqual((route.amount_in, route.amount_out), (10**18, second.amount_out))
+        self.assertEqual((route.hops[1].token_in, route.hops[1].token_out), (USDC, WETH))
+
+    def test_exact_output_chains_hops_backwards(self):
+        route = quote_exact_output_path([WETH, 3000, USDC, 500, DAI], self.pools.values(), 10**18)
+        last = quote_exact_output(self.pools[DAI_USDC], False, 10**18)
+        first = quote_exact_output(self.pools[USDC_WETH], False, last.amount_in)
+        self.assertEqual([hop.pool for hop in route.hops], [USDC_WETH, DAI_USDC])
+        self.assertEqual(route.hops[0].amount_out, last.amount_in)
+        self.assertEqual((route.amount_in, route.amount_out), (first.amount_in, 10**18))
+
+        # selling what the exact output quote asks for buys at least as much
+        forward = quote_exact_input_path(route.path, self.pools.values(), route.amount_in)
+        self.assertGreaterEqual(forward.amount_out, 10**18)
+
+    def test_missing_pool_and_liquidity(self):
+        with self.assertRaises(LookupError):
+            quote_exact_input_path([DAI, 10000, WETH], self.pools.values(), 10**18)
+        with self.assertRaises(ValueError):
+            quote_exact_output_path([DAI, 500, WETH], self.pools.values(), 10**30)
+
+    def test_rank_paths(self):
+        paths = [
+            [DAI, 500, WETH],
+            [DAI, 3000, WETH],
+            [DAI, 500, USDC, 3000, WETH],
+            [DAI, 10000, WETH],
+        ]
+        amount = 10**16
+        ranked = rank_paths(paths, self.pools.values(), amount)
+        self.assertEqual(len(ranked), 3)
+        self.assertEqual([route.amount_out for route in ranked], sorted((route.amount_out for route in ranked), reverse=True))
+        for route in ranked:
+            self.assertEqual(route, quote_exact_input_path(route.path, self.pools.values(), amount))
+        self.assertEqual(ranked[-1].path, [DAI, 500, WETH])
+
+        # the shallow pool cannot absorb a large trade and drops out
+        ranked = rank_paths(paths, self.pools.values(), 10**20)
+        self.assertEqual([route.path for route in ranked], [[DAI, 3000, WETH], [DAI, 500, USDC, 3000, WETH]])
+
+        ranked = rank_paths(paths, PoolIndex(self.pools.values()), 10**18, exact_input=False)
+        self.assertEqual([route.amount_in for route in ranked], sorted(route.amount_in for route in ranked))
+        self.assertTrue(all(route.amount_out == 10**18 for route in ranked))
+
+    def test_rank_paths_offline_uses_cached_state(self):
+        paths = [[DAI, 3000, WETH], [DAI, 500, USDC, 3000, WETH]]
+        expected = rank_paths(paths, self.pools.values(), 10**18)
+        calls = self.node.count_calls()
+        self.assertEqual(rank_paths(paths, self.pools.values(), 10**18, offline=True), expected)
+        self.assertEqual(self.node.count_calls(), calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from uniswap_liquidity.uni_v3_pool import V3LiquidityPool
+from uniswap_liquidity.snapshot import load_snapshots, save_snapshots
+from uniswap_liquidity.tests.fake_node import POSITIONS, FakePool
+from uniswap_liquidity.tests.sample_pool import SamplePoolTestCase
+
+STATE_ATTRIBUTES = ["address", "token0", "token1", "fee", "tick_spacing", "slot0", "liquidity", "sqrt_price_x96", "tick", "tick_words", "block_number", "log_position"]
+
+
+class TestSnapshot(SamplePoolTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.pool.load_tick_range(-50000, 50000)
+        self.pool.tick_data[60] = (-(2**127) + 1, 2**128 - 1)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "pools.snapshot")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def assert_same_pool(self, restored, pool):
+        for attribute in STATE_ATTRIBUTES:
+            self.assertEqual(getattr(restored, attribute), getattr(pool, attribute), attribute)
+        self.assertEqual(dict(restored.tick_data), dict(pool.tick_data))
+
+    def test_round_trip_without_rpc(self):
+        self.pool.save_snapshot(self.path, block_number=15737814)
+        self.node.requests.clear()
+        restored = V3LiquidityPool.load_snapshot(self.path, self.w3)
+        self.assertEqual(self.node.requests, [])
+        self.assertEqual(restored.block_number, 15737814)
+        self.pool.block_number = 15737814
+        self.assert_same_pool(restored, self.pool)
+
+    def test_many_pools(self):
+        other_address = self.node.add_pool("0x" + "11" * 20, FakePool.from_positions(POSITIONS[:2], tick=-7, tick_spacing=1))
+        other = V3LiquidityPool(other_address, self.w3)
+        other.log_position = (100, 3)
+        self.pool.block_number = None
+        save_snapshots([self.pool, other], self.path)
+        restored = load_snapshots(self.path, self.w3)
+        self.assertEqual(len(restored), 2)
+        self.assert_same_pool(restored[0], self.pool)
+        self.assert_same_pool(restored[1], other)
+        self.assertIsNone(restored[0].block_number)
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a snapshot")
+        with self.assertRaises(Exception):
+            load_snapshots(self.path, self.w3)
+
+
+if __name__ == "__main__":
+    unittest.main()
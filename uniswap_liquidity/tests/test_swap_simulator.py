@@ -0,0 +1,49 @@
+import unittest
+from uniswap_liquidity.liquidity_analyzer import get_tokens_to_target_price_x96
+from uniswap_liquidity.swap_simulator import quote_exact_input, quote_exact_output, simulate_swap
+from uniswap_liquidity.v3_math import compute_swap_step, get_sqrt_ratio_at_tick, get_tick_at_sqrt_ratio
+from uniswap_liquidity.tests.sample_pool import SamplePoolTestCase
+
+
+class TestSwapSimulator(SamplePoolTestCase):
+    def test_single_step_matches_swap_math(self):
+        result = quote_exact_input(self.pool, True, 10**15)
+        expected = compute_swap_step(self.pool.sqrt_price_x96, get_sqrt_ratio_at_tick(-60), self.pool.liquidity, 10**15, self.pool.fee)
+        self.assertEqual(result.sqrt_price_x96, expected[0])
+        self.assertEqual((result.amount_in, result.amount_out, result.fee_amount), (10**15, expected[2], expected[3]))
+        self.assertEqual(result.tick, get_tick_at_sqrt_ratio(result.sqrt_price_x96))
+        self.assertEqual(result.liquidity, self.pool.liquidity)
+
+    def test_output_to_price_limit_matches_target_walk(self):
+        for multiplier, zero_for_one in [(1.5, False), (1.0003, False), (0.4, True), (0.99, True)]:
+            with self.subTest(multiplier=multiplier):
+                target = int(self.pool.sqrt_price_x96 * multiplier)
+                result = simulate_swap(self.pool, zero_for_one, 10**40, sqrt_price_limit_x96=target)
+                self.assertEqual(result.sqrt_price_x96, target)
+                self.assertEqual(result.amount_out, get_tokens_to_target_price_x96(self.pool, target))
+
+    def test_exact_output_round_trip(self):
+        for zero_for_one in [True, False]:
+            with self.subTest(zero_for_one=zero_for_one):
+                exact_in = quote_exact_input(self.pool, zero_for_one, 5 * 10**19)
+                exact_out = quote_exact_output(self.pool, zero_for_one, exact_in.amount_out)
+                self.assertEqual(exact_out.amount_out, exact_in.amount_out)
+                self.assertLessEqual(exact_out.amount_in, exact_in.amount_in)
+                self.assertAlmostEqual(exact_out.amount_in / exact_in.amount_in, 1, places=12)
+                self.assertAlmostEqual(exact_in.fee_amount / exact_in.amount_in, self.pool.fee / 10**6, places=6)
+
+    def test_crosses_ticks_offline(self):
+        self.pool.load_tick_range(-50000, 50000)
+        self.node.requests.clear()
+        result = quote_exact_input(self.pool, False, 3 * 10**19, offline=True)
+        self.assertGreater(result.tick, 1800)
+        self.assertEqual(self.node.requests, [])
+        self.assertEqual(self.pool.tick, 30)
+
+    def test_offline_missing_word(self):
+        with self.assertRaises(LookupError):
+            quote_exact_input(self.pool, True, 10**24, offline=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from uniswap_liquidity.tick_index import TickIndex
+
+
+class TestTickIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = TickIndex([(120, -5, 5), (-60, 7, 7), (600, -2, 2), (0, 3, 9)])
+
+    def test_mapping_interface(self):
+        self.assertEqual(list(self.index), [-60, 0, 120, 600])
+        self.assertEqual(self.index[0], (3, 9))
+        self.assertNotIn(60, self.index)
+        self.index[60] = (1, 1)
+        self.index[0] = (4, 10)
+        del self.index[600]
+        self.assertEqual(dict(self.index), {-60: (7, 7), 0: (4, 10), 60: (1, 1), 120: (-5, 5)})
+        with self.assertRaises(KeyError):
+            self.index[600]
+
+    def test_neighbours(self):
+        self.assertEqual(self.index.next_above(0), 120)
+        self.assertEqual(self.index.next_above(-1000), -60)
+        self.assertIsNone(self.index.next_above(600))
+        self.assertEqual(self.index.next_at_or_below(0), 0)
+        self.assertEqual(self.index.next_at_or_below(119), 0)
+        self.assertIsNone(self.index.next_at_or_below(-61))
+
+    def test_range(self):
+        ticks, liquidity_net, liquidity_gross = self.index.range(-60, 600)
+        self.assertEqual(list(ticks), [-60, 0, 120])
+        self.assertEqual(liquidity_net, [7, 3, -5])
+        self.assertEqual(liquidity_gross, [7, 9, 5])
+
+    def test_replace_range(self):
+        self.index.replace_range(0, 600, [(300, 1, 1), (60, 2, 2)])
+        self.assertEqual(list(self.index), [-60, 60, 300, 600])
+        with self.assertRaises(ValueError):
+            self.index.replace_range(0, 600, [(600, 1, 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
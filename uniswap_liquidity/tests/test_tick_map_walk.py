@@ -0,0 +1,92 @@
+import contextlib
+import io
+import unittest
+from uniswap_liquidity.liquidity_analyzer import (
+    get_token_amounts,
+    get_token_amounts_x96,
+    get_tokens_to_target_price,
+    get_tokens_to_target_price_x96,
+    sqrt_price_to_tick,
+    sqrt_x96_price_to_sqrt_price,
+    tick_index_price,
+    tick_to_sqrt_price,
+)
+from uniswap_liquidity.v3_math import MAX_TICK, MIN_TICK
+from uniswap_liquidity.tests.sample_pool import SamplePoolTestCase
+
+
+class TestTickMapWalk(SamplePoolTestCase):
+    def assert_walks_match(self, target_multiplier):
+        sqrt_target_price = sqrt_x96_price_to_sqrt_price(self.pool.sqrt_price_x96) * target_multiplier
+        from_tick_map = get_tokens_to_target_price(self.pool, sqrt_target_price)
+        from_rpc = get_tokens_to_target_price(self.pool, sqrt_target_price, use_tick_map=False)
+        self.assertGreater(from_tick_map, 0)
+        self.assertAlmostEqual(from_tick_map / from_rpc, 1, places=9)
+
+    def test_matches_per_tick_walk(self):
+        for target_multiplier in [1.0001, 1.001, 1.05, 1.5, 0.999, 0.95, 0.5]:
+            with self.subTest(target_multiplier=target_multiplier):
+                self.assert_walks_match(target_multiplier)
+
+    def test_no_per_tick_calls(self):
+        self.node.calls.clear()
+        sqrt_target_price = sqrt_x96_price_to_sqrt_price(self.pool.sqrt_price_x96) * 1.05
+        get_tokens_to_target_price(self.pool, sqrt_target_price)
+        self.assertEqual(self.node.count_calls("ticks"), 0)
+        self.assertLessEqual(self.node.count_calls(), 1)
+
+    def test_no_output(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            for target_multiplier in [1.05, 0.95]:
+                sqrt_target_price = sqrt_x96_price_to_sqrt_price(self.pool.sqrt_price_x96) * target_multiplier
+                get_tokens_to_target_price(self.pool, sqrt_target_price)
+                get_tokens_to_target_price(self.pool, sqrt_target_price, use_tick_map=False)
+        self.assertEqual(out.getvalue(), "")
+
+    def test_fetches_missing_words_once(self):
+        self.node.calls.clear()
+        sqrt_target_price = sqrt_x96_price_to_sqrt_price(self.pool.sqrt_price_x96) * 0.1
+        get_tokens_to_target_price(self.pool, sqrt_target_price)
+        get_tokens_to_target_price(self.pool, sqrt_target_price)
+        words = [args[1] for _, name, args in self.node.calls if name == "getPopulatedTicksInWord"]
+        self.assertEqual(sorted(words), [-3, -2, -1])
+
+    def test_exact_walk_matches_float_walk(self):
+        for target_multiplier in [1.001, 1.5, 0.95, 0.1]:
+            with self.subTest(target_multiplier=target_multiplier):
+                sqrt_price_target_x96 = int(self.pool.sqrt_price_x96 * target_multiplier)
+                exact = get_tokens_to_target_price_x96(self.pool, sqrt_price_target_x96)
+                approximate = get_tokens_to_target_price(self.pool, sqrt_price_target_x96 / 2**96)
+                self.assertIsInstance(exact, int)
+                self.assertAlmostEqual(exact / approximate, 1, places=9)
+
+    def test_exact_token_amounts(self):
+        for tick_lower, tick_upper in [(-600, 600), (60, 600), (-600, -60)]:
+            with self.subTest(tick_lower=tick_lower, tick_upper=tick_upper):
+                exact = get_token_amounts_x96(10**20, self.pool.sqrt_price_x96, tick_lower, tick_upper)
+                approximate = get_token_amounts(10**20, self.pool.sqrt_price_x96, tick_lower, tick_upper)
+                for a, b in zip(exact, approximate):
+                    self.assertAlmostEqual(a, b, delta=b * 1e-9 + 1)
+
+
+class TestTickConversions(unittest.TestCase):
+    def test_round_trip(self):
+        for tick in [MIN_TICK, -200000, -60, -1, 0, 1, 59, 123456, MAX_TICK - 1]:
+            with self.subTest(tick=tick):
+                self.assertEqual(sqrt_price_to_tick(tick_to_sqrt_price(tick)), tick)
+                self.assertAlmostEqual(tick_index_price(tick) / 1.0001**tick, 1, places=9)
+
+    def test_price_of_fractional_and_out_of_range_ticks(self):
+        for tick in [0.5, -60.25, 887272.5, MAX_TICK + 10, MIN_TICK - 10]:
+            with self.subTest(tick=tick):
+                self.assertEqual(tick_index_price(tick), 1.0001**tick)
+
+    def test_inverse_rounds_down_and_clamps(self):
+        self.assertEqual(sqrt_price_to_tick(tick_to_sqrt_price(60) * (1 - 1e-9)), 59)
+        self.assertEqual(sqrt_price_to_tick(0), MIN_TICK)
+        self.assertEqual(sqrt_price_to_tick(1e300), MAX_TICK - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
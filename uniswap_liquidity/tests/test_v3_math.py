@@ -0,0 +1,81 @@
+import random
+import unittest
+from math import isqrt
+from uniswap_liquidity.v3_math import (
+    MIN_TICK,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MAX_SQRT_RATIO,
+    Q96,
+    compute_swap_step,
+    get_next_sqrt_price_from_input,
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+)
+
+
+def encode_price_sqrt(reserve1, reserve0):
+    return isqrt(reserve1 * 2**192 // reserve0)
+
+
+class TestTickMath(unittest.TestCase):
+    def test_sqrt_ratio_bounds(self):
+        self.assertEqual(get_sqrt_ratio_at_tick(MIN_TICK), MIN_SQRT_RATIO)
+        self.assertEqual(get_sqrt_ratio_at_tick(MAX_TICK), MAX_SQRT_RATIO)
+        self.assertEqual(get_sqrt_ratio_at_tick(0), Q96)
+        self.assertEqual(get_sqrt_ratio_at_tick(50), 79426470787362580746886972461)
+        with self.assertRaises(ValueError):
+            get_sqrt_ratio_at_tick(MAX_TICK + 1)
+
+    def test_tick_at_sqrt_ratio_bounds(self):
+        self.assertEqual(get_tick_at_sqrt_ratio(MIN_SQRT_RATIO), MIN_TICK)
+        self.assertEqual(get_tick_at_sqrt_ratio(MAX_SQRT_RATIO - 1), MAX_TICK - 1)
+        with self.assertRaises(ValueError):
+            get_tick_at_sqrt_ratio(MAX_SQRT_RATIO)
+
+    def test_round_trip(self):
+        rng = random.Random(0)
+        for tick in rng.sample(range(MIN_TICK + 1, MAX_TICK), 500):
+            sqrt_ratio = get_sqrt_ratio_at_tick(tick)
+            self.assertEqual(get_tick_at_sqrt_ratio(sqrt_ratio), tick)
+            self.assertEqual(get_tick_at_sqrt_ratio(sqrt_ratio - 1), tick - 1)
+            self.assertAlmostEqual(sqrt_ratio / Q96 / 1.0001 ** (tick / 2), 1, places=9)
+
+
+class TestSwapMath(unittest.TestCase):
+    # vectors from the Uniswap v3 core SwapMath tests
+    def test_exact_in_capped_at_price_target(self):
+        price_target = encode_price_sqrt(101, 100)
+        result = compute_swap_step(encode_price_sqrt(1, 1), price_target, 2 * 10**18, 10**18, 600)
+        self.assertEqual(result, (price_target, 9975124224178055, 9925619580021728, 5988667735148))
+
+    def test_exact_out_capped_at_price_target(self):
+        price_target = encode_price_sqrt(101, 100)
+        result = compute_swap_step(encode_price_sqrt(1, 1), price_target, 2 * 10**18, -(10**18), 600)
+        self.assertEqual(result, (price_target, 9975124224178055, 9925619580021728, 5988667735148))
+
+    def test_exact_in_fully_spent(self):
+        price = encode_price_sqrt(1, 1)
+        price_target = encode_price_sqrt(1000, 100)
+        sqrt_q, amount_in, amount_out, fee_amount = compute_swap_step(price, price_target, 2 * 10**18, 10**18, 600)
+        self.assertEqual((amount_in, amount_out, fee_amount), (999400000000000000, 666399946655997866, 600000000000000))
+        self.assertLess(sqrt_q, price_target)
+        self.assertEqual(sqrt_q, get_next_sqrt_price_from_input(price, 2 * 10**18, 10**18 - fee_amount, False))
+
+    def test_amount_out_capped(self):
+        result = compute_swap_step(
+            417332158212080721273783715441582,
+            1452870262520218020823638996,
+            159344665391607089467575320103,
+            -1,
+            1,
+        )
+        self.assertEqual(result, (417332158212080721273783715441581, 1, 1, 1))
+
+    def test_entire_input_taken_as_fee(self):
+        result = compute_swap_step(2413, 79887613182836312, 1985041575832132834610021537970, 10, 1872)
+        self.assertEqual(result, (2413, 0, 0, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import MutableMapping
+from typing import Iterable, List, Optional, Tuple
+
+
+class TickIndex(MutableMapping):
+    """
+    Initialized ticks of a pool, stored as parallel arrays sorted by tick.
+
+    Behaves like the `{tick: (liquidityNet, liquidityGross)}` dictionary it
+    replaces, and adds bisect-based neighbour lookups and range slicing.
+
+    Ticks are int24 values and are packed into a C int array. Liquidity
+    values are 128-bit and are kept in plain lists of Python ints, as they
+    routinely overflow a 64-bit word.
+    """
+
+    __slots__ = ("_ticks", "_liquidity_net", "_liquidity_gross")
+
+    def __init__(self, tick_data: Iterable[Tuple[int, int, int]] = ()):
+        self._ticks = array("i")
+        self._liquidity_net: List[int] = []
+        self._liquidity_gross: List[int] = []
+        for (tick, liquidityNet, liquidityGross) in tick_data:
+            self[tick] = liquidityNet, liquidityGross
+
+    @classmethod
+    def from_sorted(cls, ticks: Iterable[int], liquidity_net: Iterable[int], liquidity_gross: Iterable[int]):
+        """
+        Builds an index from parallel sequences already sorted by tick,
+        without per-tick insertion.
+        """
+        index = cls()
+        index._ticks = array("i", ticks)
+        index._liquidity_net = list(liquidity_net)
+        index._liquidity_gross = list(liquidity_gross)
+        if not len(index._ticks) == len(index._liquidity_net) == len(index._liquidity_gross):
+            raise ValueError("ticks and liquidity arrays differ in length")
+        if any(a >= b for a, b in zip(index._ticks, index._ticks[1:])):
+            raise ValueError("ticks are not strictly increasing")
+        return index
+
+    def __getitem__(self, tick: int) -> Tuple[int, int]:
+        i = bisect_left(self._ticks, tick)
+        if i == len(self._ticks) or self._ticks[i] != tick:
+            raise KeyError(tick)
+        return self._liquidity_net[i], self._liquidity_gross[i]
+
+    def __setitem__(self, tick: int, value: Tuple[int, int]):
+        liquidityNet, liquidityGross = value
+        i = bisect_left(self._ticks, tick)
+        if i < len(self._ticks) and self._ticks[i] == tick:
+            self._liquidity_net[i] = liquidityNet
+            self._liquidity_gross[i] = liquidityGross
+        else:
+            self._ticks.insert(i, tick)
+            self._liquidity_net.insert(i, liquidityNet)
+            self._liquidity_gross.insert(i, liquidityGross)
+
+    def __delitem__(self, tick: int):
+        i = bisect_left(self._ticks, tick)
+        if i == len(self._ticks) or self._ticks[i] != tick:
+            raise KeyError(tick)
+        del self._ticks[i]
+        del self._liquidity_net[i]
+        del self._liquidity_gross[i]
+
+    def __iter__(self):
+        return iter(self._ticks)
+
+    def __len__(self):
+        return len(self._ticks)
+
+    def __contains__(self, tick) -> bool:
+        i = bisect_left(self._ticks, tick)
+        return i < len(self._ticks) and self._ticks[i] == tick
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} ticks)"
+
+    def next_above(self, tick: int) -> Optional[int]:
+        """
+        Returns the lowest initialized tick strictly greater than `tick`,
+        or None if there is none.
+        """
+        i = bisect_right(self._ticks, tick)
+        if i == len(self._ticks):
+            return None
+        return self._ticks[i]
+
+    def next_at_or_below(self, tick: int) -> Optional[int]:
+        """
+        Returns the highest initialized tick less than or equal to `tick`,
+        or None if there is none.
+        """
+        i = bisect_right(self._ticks, tick)
+        if i == 0:
+            return None
+        return self._ticks[i - 1]
+
+    def range(self, tick_lower: int, tick_upper: int) -> Tuple[array, List[int], List[int]]:
+        """
+        Returns the (ticks, liquidityNet, liquidityGross) slices for the
+        initialized ticks in [tick_lower, tick_upper).
+        """
+        i, j = self._bounds(tick_lower, tick_upper)
+        return self._ticks[i:j], self._liquidity_net[i:j], self._liquidity_gross[i:j]
+
+    def replace_range(self, tick_lower: int, tick_upper: int, tick_data: Iterable[Tuple[int, int, int]]):
+        """
+        Replaces every tick in [tick_lower, tick_upper) with `tick_data`, an
+        iterable of (tick, liquidityNet, liquidityGross) inside that range,
+        e.g. the populated ticks of one bitmap word as returned by TickLens.
+        """
+        tick_data = sorted(tick_data)
+        if any(not tick_lower <= tick < tick_upper for (tick, _, _) in tick_data):
+            raise ValueError(f"tick data outside of [{tick_lower}, {tick_upper})")
+        i, j = self._bounds(tick_lower, tick_upper)
+        self._ticks[i:j] = array("i", (tick for (tick, _, _) in tick_data))
+        self._liquidity_net[i:j] = [liquidityNet for (_, liquidityNet, _) in tick_data]
+        self._liquidity_gross[i:j] = [liquidityGross for (_, _, liquidityGross) in tick_data]
+
+    def _bounds(self, tick_lower: int, tick_upper: int) -> Tuple[int, int]:
+        return bisect_left(self._ticks, tick_lower), bisect_left(self._ticks, tick_upper)
@@ -1,16 +1,55 @@
 from abc import ABC, abstractmethod
 from uniswap_liquidity.abi.tick_lens_abi import TICK_LENS_ABI
+from uniswap_liquidity.block_cache import BlockCache, call_at_block
+from uniswap_liquidity.contracts import contract_at
+from uniswap_liquidity.metrics import RPC_METRICS, RpcMetrics
 from web3 import Web3
+from weakref import WeakValueDictionary
+
+TICK_LENS_ADDRESS = "0xbfd8137f7d1516D3ea5cA83523914859ec47F573"
+
+# (id(w3), address, metrics, cache) -> TickLens, for as long as a pool uses
+# it; a live TickLens keeps its Web3 instance, and so the id, alive
+_shared: "WeakValueDictionary[tuple, TickLens]" = WeakValueDictionary()
 
 
 class TickLens(ABC):
     def __init__(
         self,
         w3: Web3, 
-        address="0xbfd8137f7d1516D3ea5cA83523914859ec47F573",
+        address=TICK_LENS_ADDRESS,
+        metrics: RpcMetrics = None,
+        cache: BlockCache = None,
     ):
+        self.metrics = metrics if metrics is not None else RPC_METRICS
+        self.cache = cache
 
         try:
-            self._tick_lens_contract = w3.eth.contract(address=address, abi=TICK_LENS_ABI)
+            self._tick_lens_contract = contract_at(w3, address, TICK_LENS_ABI)
         except:
-            raise RuntimeError(f"Could not create TickLens contract for {address}")
\ No newline at end of file
+            raise RuntimeError(f"Could not create TickLens contract for {address}")
+
+    def get_populated_ticks_in_word(self, pool_address, word_position: int, block_identifier="latest"):
+        """
+        Returns the (tick, liquidityNet, liquidityGross) of every initialized
+        tick in a bitmap word of `pool_address`. Reads at a block number go
+        through `self.cache`.
+        """
+        return call_at_block(
+            self._tick_lens_contract.functions.getPopulatedTicksInWord(pool_address, word_position),
+            block_identifier,
+            self.cache,
+            self.metrics,
+        )
+
+
+def shared_tick_lens(w3: Web3, address=TICK_LENS_ADDRESS, metrics: RpcMetrics = None, cache: BlockCache = None) -> TickLens:
+    """
+    Returns the TickLens for `w3` with these settings, creating it once and 
+    reusing it for every pool constructed without an explicit TickLens.
+    """
+    key = id(w3), address, metrics, cache
+    tick_lens = _shared.get(key)
+    if tick_lens is None:
+        tick_lens = _shared[key] = TickLens(w3, address, metrics=metrics, cache=cache)
+    return tick_lens
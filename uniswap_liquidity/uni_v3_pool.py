@@ -1,17 +1,354 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor
 from uniswap_liquidity.abi.uni_v3_lp_abi import V3_LP_ABI
-from uniswap_liquidity.tick_lens import TickLens
+from uniswap_liquidity.block_cache import BlockCache, call_at_block, resolve_block_number
+from uniswap_liquidity.contracts import contract_at
+from uniswap_liquidity.executors import _executor, _submit_in_context
+from uniswap_liquidity.tick_lens import shared_tick_lens
+from uniswap_liquidity.tick_index import TickIndex
+from uniswap_liquidity.liquidity_index import LiquidityIndex
+from uniswap_liquidity.metrics import RPC_METRICS, RpcMetrics
+from uniswap_liquidity.v3_math import MIN_TICK, MAX_TICK
+from eth_utils import event_abi_to_log_topic
 from web3 import Web3
 from web3.eth import Contract
-from typing import List, Tuple, Dict, Optional
-class BaseV3LiquidityPool(ABC):
-    def __init__(self, address, w3: Web3, tick_lens: Contract = None):
+from typing import List, Tuple, Dict, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from uniswap_liquidity.depth_curve import DepthCurve
+    from uniswap_liquidity.multicall import Multicall
+
+# topic0 -> name of the events that change the pool's price or tick map
+POOL_STATE_EVENTS = {
+    event_abi_to_log_topic(abi): abi["name"]
+    for abi in V3_LP_ABI
+    if abi["type"] == "event" and abi["name"] in ("Swap", "Mint", "Burn")
+}
+
+class V3PoolState(ABC):
+    """
+    Pool state handling and tick map lookups shared by the synchronous and
+    asynchronous pools. Subclasses do the reads: the only one made from here
+    is `_load_missing_tick_word`, when a tick walk reaches a word that is
+    not loaded.
+    """
+
+    metrics: RpcMetrics = RPC_METRICS
+    _liquidity_index: Optional[LiquidityIndex] = None
+    _depth_curve: Optional["DepthCurve"] = None
+
+    def _apply_update(self, slot0, liquidity, block_number: Optional[int] = None):
+        if block_number is not None:
+            self.block_number = block_number
+        updates = False
+        if slot0 != self.slot0:
+            updates = True
+            self.slot0 = slot0
+            self.sqrt_price_x96 = self.slot0[0]
+            self.tick = self.slot0[1]
+        if liquidity != self.liquidity:
+            updates = True
+            self.liquidity = liquidity
+        if updates:
+            self._depth_curve = None
+        return updates, {
+            "slot0": self.slot0,
+            "liquidity": self.liquidity,
+            "sqrt_price_x96": self.sqrt_price_x96,
+            "tick": self.tick,
+        }
+
+    def apply_swap(self, sqrt_price_x96: int, liquidity: int, tick: int) -> bool:
+        """
+        Applies the post-swap price, liquidity and tick reported by a Swap 
+        event. Returns True if the pool state changed.
+        """
+        slot0 = list(self.slot0)
+        slot0[0], slot0[1] = sqrt_price_x96, tick
+        updates, _ = self._apply_update(slot0, liquidity)
+        return updates
+
+    def apply_mint(self, tick_lower: int, tick_upper: int, amount: int) -> bool:
+        """
+        Adds `amount` of liquidity between `tick_lower` and `tick_upper`, 
+        as a Mint event does. Returns True if the pool state changed.
+        """
+        return self._apply_liquidity_delta(tick_lower, tick_upper, amount)
+
+    def apply_burn(self, tick_lower: int, tick_upper: int, amount: int) -> bool:
+        """
+        Removes `amount` of liquidity between `tick_lower` and `tick_upper`,
+        as a Burn event does. Returns True if the pool state changed.
+        """
+        return self._apply_liquidity_delta(tick_lower, tick_upper, -amount)
+
+    def _apply_liquidity_delta(self, tick_lower: int, tick_upper: int, liquidity_delta: int) -> bool:
+        if liquidity_delta == 0:
+            return False
+        self._depth_curve = None
+        # ticks in words we haven't loaded are skipped: they are read in full,
+        # including this change, whenever the word is fetched
+        for tick, net_delta in ((tick_lower, liquidity_delta), (tick_upper, -liquidity_delta)):
+            word_position, _ = self.get_tick_bitmap_position(tick)
+            if word_position not in self.tick_words:
+                continue
+            liquidityNet, liquidityGross = self.tick_data.get(tick, (0, 0))
+            liquidityGross += liquidity_delta
+            if liquidityGross == 0:
+                del self.tick_data[tick]
+            else:
+                self.tick_data[tick] = liquidityNet + net_delta, liquidityGross
+            if self._liquidity_index is not None:
+                self._liquidity_index.add(tick, net_delta)
+        if tick_lower <= self.tick < tick_upper:
+            self.liquidity += liquidity_delta
+        return True
+
+    def apply_event(self, event) -> bool:
+        """
+        Applies a decoded Swap, Mint or Burn event (as returned by web3's 
+        `process_log`/`get_logs`) to the local state.
+
+        Events at or before the last applied (blockNumber, logIndex) are 
+        ignored, so replaying an overlapping range of logs is safe. Returns 
+        True if the pool state changed.
+        """
+        position = event.get("blockNumber"), event.get("logIndex")
+        if None not in position:
+            if self.log_position is not None and position <= self.log_position:
+                return False
+            self.log_position = position
+            self.block_number = position[0]
+
+        args = event["args"]
+        if event["event"] == "Swap":
+            return self.apply_swap(args["sqrtPriceX96"], args["liquidity"], args["tick"])
+        if event["event"] == "Mint":
+            return self.apply_mint(args["tickLower"], args["tickUpper"], args["amount"])
+        if event["event"] == "Burn":
+            return self.apply_burn(args["tickLower"], args["tickUpper"], args["amount"])
+        return False
+
+    def apply_logs(self, logs) -> bool:
+        """
+        Decodes raw logs of this pool (e.g. from `eth_getLogs` or a receipt)
+        and applies the Swap, Mint and Burn events among them in order.
+        Returns True if the pool state changed.
+        """
+        updates = False
+        for log in logs:
+            if log["address"].lower() != self.address.lower() or not log["topics"]:
+                continue
+            name = POOL_STATE_EVENTS.get(bytes(log["topics"][0]))
+            if name is None:
+                continue
+            event = self._pool_contract.events[name]().process_log(log)
+            updates = self.apply_event(event) or updates
+        return updates
+
+    def get_liquidity_index(self) -> LiquidityIndex:
+        """
+        Returns the Fenwick-tree `LiquidityIndex` over the span of loaded
+        words, building it on first use. Mint and Burn events update it in 
+        place; loading a new word drops it so it's rebuilt on next use.
+        """
+        if self._liquidity_index is None:
+            self._liquidity_index = LiquidityIndex(
+                self.tick_data, self.tick_spacing, min(self.tick_words), max(self.tick_words)
+            )
+        return self._liquidity_index
+
+    def get_depth_curve(self, tick_lower: Optional[int] = None, tick_upper: Optional[int] = None) -> "DepthCurve":
+        """
+        Returns the pool's `DepthCurve` covering at least [tick_lower, 
+        tick_upper] (by default, the span of loaded words), building it on
+        first use.
+
+        The curve is cached for the current state, keyed on block number, 
+        sqrt price and liquidity. It is dropped whenever `update()` reports
+        changes or events or word loads touch the tick map, so repeated 
+        quotes within a block are lookups.
+        """
+        from uniswap_liquidity.depth_curve import DepthCurve
+
+        if tick_lower is None:
+            tick_lower = (min(self.tick_words) << 8) * self.tick_spacing
+        if tick_upper is None:
+            tick_upper = (((max(self.tick_words) + 1) << 8) - 1) * self.tick_spacing
+        tick_lower = max(min(tick_lower, self.tick), MIN_TICK)
+        tick_upper = min(max(tick_upper, self.tick), MAX_TICK)
+
+        state = (self.block_number, self.sqrt_price_x96, self.liquidity)
+        curve = self._depth_curve
+        if curve is not None and curve.state == state:
+            if curve.tick_lower <= tick_lower and tick_upper <= curve.tick_upper:
+                return curve
+            tick_lower = min(tick_lower, curve.tick_lower)
+            tick_upper = max(tick_upper, curve.tick_upper)
+        curve = DepthCurve(self, tick_lower, tick_upper)
+        self._depth_curve = curve
+        return curve
+
+    def _store_tick_word(self, word_position: int, tick_data):
+        self._liquidity_index = None
+        self._depth_curve = None
+        self.tick_data.replace_range(
+            (word_position << 8) * self.tick_spacing,
+            ((word_position + 1) << 8) * self.tick_spacing,
+            tick_data,
+        )
+        self.tick_words.add(word_position)
+
+    def _missing_tick_words(self, tick_lower: int, tick_upper: int) -> List[int]:
+        word_lower, _ = self.get_tick_bitmap_position(max(tick_lower, MIN_TICK))
+        word_upper, _ = self.get_tick_bitmap_position(min(tick_upper, MAX_TICK))
+        return [
+            word_position
+            for word_position in range(word_lower, word_upper + 1)
+            if word_position not in self.tick_words
+        ]
+
+    @abstractmethod
+    def _load_missing_tick_word(self, word_position: int):
+        """
+        Called by the tick walks with a word that is not in `tick_words`:
+        loads it, or raises a LookupError.
+        """
+
+    def next_initialized_tick_within_one_word(self, tick: int, lte: bool, fetch: bool = True) -> Tuple[int, bool]:
+        """
+        Returns the next initialized tick contained in the same word as `tick`,
+        searching to the left (less than or equal) when `lte` is True and to
+        the right (strictly greater) otherwise, mirroring 
+        `TickBitmap.nextInitializedTickWithinOneWord`.
+
+        If no initialized tick is found, the word boundary is returned along 
+        with `False`, so a walk advances at most one word per call. Words 
+        that are not in `self.tick_data` yet are passed to 
+        `_load_missing_tick_word`, or raise a LookupError if `fetch` is False.
+        """
+        compressed = tick // self.tick_spacing
+        if not lte:
+            compressed += 1
+        word_position = compressed >> 8
+        if word_position not in self.tick_words:
+            if not fetch:
+                raise LookupError(f"Tick word {word_position} of {self.address} is not loaded")
+            self._load_missing_tick_word(word_position)
+
+        if lte:
+            boundary = (word_position << 8) * self.tick_spacing
+            next_tick = self.tick_data.next_at_or_below(tick)
+            if next_tick is not None and next_tick >= boundary:
+                return next_tick, True
+        else:
+            boundary = ((word_position << 8) + 255) * self.tick_spacing
+            next_tick = self.tick_data.next_above(tick)
+            if next_tick is not None and next_tick <= boundary:
+                return next_tick, True
+        return boundary, False
+
+    def get_tick_bitmap_position(self, tick) -> Tuple[int, int]:
+        """
+        Retrieves the wordPosition and bitPosition for the input tick
+
+        This function corrects internally for tick spacing! 
+
+        e.g. tick=600 is the 11th initialized tick for an LP with 
+        tickSpacing of 60, starting at 0.
+
+        Calling `get_tick_bitmap_position(600)` returns (0,10), where:
+            0 = wordPosition (zero-indexed)
+            10 = bitPosition (zero-indexed)
+        """
+        tick = tick // self.tick_spacing
+        word_index = tick >> 8
+        tick_index_in_word = tick % 256
+        return word_index, tick_index_in_word
+
+
+class BaseV3LiquidityPool(V3PoolState, ABC):
+    def __init__(
+        self,
+        address,
+        w3: Web3,
+        tick_lens: Contract = None,
+        multicall: "Multicall" = None,
+        metrics: RpcMetrics = None,
+        block_identifier="latest",
+        cache: BlockCache = None,
+    ):
+        """
+        Reads the pool's tokens, fee, slot0, liquidity and tick spacing, then
+        the bitmap word around the current tick. With a `multicall`, the 
+        pool info is read in a single eth_call and `update()` is batched too.
+
+        Every read is pinned to one block: `block_identifier` is resolved to
+        a number first, stored in `self.block_number`, and the pool info and
+        tick words are read at it, so the state is never torn across blocks.
+        Pinned reads go through `cache`, which can be shared by any number 
+        of pools, TickLens and Multicall instances reading the same blocks.
+
+        Contract calls are recorded in `metrics` (the shared `RPC_METRICS` 
+        by default), construction as a "construction" operation.
+        """
+        self._init_contracts(address, w3, tick_lens, multicall, metrics, cache)
+        with self.metrics.operation("construction"):
+            self._read_pool_info(block_identifier)
+
+    def _read_pool_info(self, block_identifier):
+        address = self.address
+        try:
+            if self.multicall:
+                functions = self._pool_contract.functions
+                self.block_number, (
+                    self.token0,
+                    self.token1,
+                    self.fee,
+                    self.slot0,
+                    self.liquidity,
+                    self.tick_spacing,
+                ) = self.multicall.aggregate_at_block(
+                    [
+                        functions.token0(),
+                        functions.token1(),
+                        functions.fee(),
+                        functions.slot0(),
+                        functions.liquidity(),
+                        functions.tickSpacing(),
+                    ],
+                    block_identifier,
+                )
+            else:
+                self.block_number = self._resolve_block_number(block_identifier)
+                functions = self._pool_contract.functions
+                self.token0 = self._call(functions.token0())
+                self.token1 = self._call(functions.token1())
+                self.fee = self._call(functions.fee())
+                self.slot0 = self._call(functions.slot0())
+                self.liquidity = self._call(functions.liquidity())
+                self.tick_spacing = self._call(functions.tickSpacing())
+            self.sqrt_price_x96 = self.slot0[0]
+            self.tick = self.slot0[1]
+            self.tick_data = TickIndex()
+            self.tick_words = set()
+            self.log_position = None
+            self.tick_word, _ = self.get_tick_bitmap_position(self.tick)
+            self.get_tick_data_at_word(self.tick_word)
+        except:
+            raise RuntimeError(f"Could not get pool info for {address}")
+
+
+
+    def _init_contracts(self, address, w3: Web3, tick_lens, multicall, metrics=None, cache=None):
         self.address = address
+        self.multicall = multicall
+        self.cache = cache
+        if metrics is not None:
+            self.metrics = metrics
 
         try:
-            self._pool_contract = w3.eth.contract(
-                address=address, abi=V3_LP_ABI
-            )
+            self._pool_contract = contract_at(w3, address, V3_LP_ABI)
         except:
             raise RuntimeError(f"Could not create contract for {address}")
 
@@ -19,87 +356,184 @@ class BaseV3LiquidityPool(ABC):
             self.tick_lens = tick_lens
         else:
             try:
-                self.tick_lens = TickLens(w3)
+                self.tick_lens = shared_tick_lens(w3, metrics=metrics, cache=cache)
             except:
                 raise RuntimeError(f"Could not create TickLens contract")
-                
-        try:
-            self.token0 = self._pool_contract.caller.token0()
-            self.token1 = self._pool_contract.caller.token1()
-            self.fee = self._pool_contract.caller.fee()
-            self.slot0 = self._pool_contract.caller.slot0()
-            self.liquidity = self._pool_contract.caller.liquidity()
-            self.tick_spacing = self._pool_contract.caller.tickSpacing()
-            self.sqrt_price_x96 = self.slot0[0]
-            self.tick = self.slot0[1]
-            self.tick_data = {}
-            self.tick_word, _ = self.get_tick_bitmap_position(self.tick)
-            self.get_tick_data_at_word(self.tick_word)
-        except:
-            raise RuntimeError(f"Could not get pool info for {address}")
 
+    @classmethod
+    def from_state(
+        cls,
+        state: Dict,
+        w3: Web3,
+        tick_lens: Contract = None,
+        multicall: "Multicall" = None,
+        metrics: RpcMetrics = None,
+        cache: BlockCache = None,
+    ):
+        """
+        Builds a pool from previously saved state (see `snapshot.py`) 
+        without reading anything from the node.
+        """
+        pool = cls.__new__(cls)
+        pool._init_contracts(state["address"], w3, tick_lens, multicall, metrics, cache)
+        pool.token0 = state["token0"]
+        pool.token1 = state["token1"]
+        pool.fee = state["fee"]
+        pool.tick_spacing = state["tick_spacing"]
+        pool.slot0 = list(state["slot0"])
+        pool.liquidity = state["liquidity"]
+        pool.sqrt_price_x96 = pool.slot0[0]
+        pool.tick = pool.slot0[1]
+        pool.tick_data = state["tick_data"]
+        pool.tick_words = set(state["tick_words"])
+        pool.block_number = state["block_number"]
+        pool.log_position = state["log_position"]
+        pool.tick_word, _ = pool.get_tick_bitmap_position(pool.tick)
+        return pool
 
+    def save_snapshot(self, path, block_number: Optional[int] = None):
+        """
+        Writes the pool state to `path`, see `snapshot.save_snapshots`.
+        """
+        from uniswap_liquidity.snapshot import save_snapshots
 
-    def update(self):
-        updates = False
+        save_snapshots([self], path, block_number=block_number)
+
+    @classmethod
+    def load_snapshot(cls, path, w3: Web3, tick_lens: Contract = None, multicall: "Multicall" = None):
+        """
+        Restores a pool written by `save_snapshot`.
+        """
+        from uniswap_liquidity.snapshot import load_snapshots
+
+        (pool,) = load_snapshots(path, w3, pool_class=cls, tick_lens=tick_lens, multicall=multicall)
+        return pool
+
+    def update(self, block_identifier="latest"):
+        """
+        Reads slot0 and liquidity at `block_identifier`, which becomes the 
+        pool's `block_number`, and returns (updates, state) as
+        `_apply_update` does.
+        """
         try:
-            if (slot0 := self._pool_contract.caller.slot0()) != self.slot0:
-                updates = True
-                self.slot0 = slot0
-                self.sqrt_price_x96 = self.slot0[0]
-                self.tick = self.slot0[1]
-            if (
-                liquidity := self._pool_contract.caller.liquidity()
-            ) != self.liquidity:
-                updates = True
-                self.liquidity = liquidity
+            if self.multicall:
+                block_number, (slot0, liquidity) = self.multicall.aggregate_at_block(
+                    [
+                        self._pool_contract.functions.slot0(),
+                        self._pool_contract.functions.liquidity(),
+                    ],
+                    block_identifier,
+                )
+            else:
+                block_number = self._resolve_block_number(block_identifier)
+                slot0 = self._call(self._pool_contract.functions.slot0(), block_number)
+                liquidity = self._call(self._pool_contract.functions.liquidity(), block_number)
 
         except Exception as e:
             raise RuntimeError(f"Could not update pool info for {self.address}") from e
             
         else:
-            return updates, {
-                "slot0": self.slot0,
-                "liquidity": self.liquidity,
-                "sqrt_price_x96": self.sqrt_price_x96,
-                "tick": self.tick,
-            }
+            return self._apply_update(slot0, liquidity, block_number)
 
     def get_tick_data_at_word(self, word_position: int):
         """
         Gets the initialized tick values at a specific word 
         (a 32 byte number representing 256 ticks at the tickSpacing 
         interval), then stores the liquidity values in the `self.tick_data`
-        dictionary, using the tick index as the key.
+        index, using the tick index as the key. Ticks previously stored 
+        for that word are replaced. The word is read at the pool's 
+        `block_number`.
         """
         try:
-            tick_data = self.tick_lens._tick_lens_contract.caller.getPopulatedTicksInWord(
-                self.address, word_position
+            tick_data = self.tick_lens.get_populated_ticks_in_word(
+                self.address, word_position, self._block_identifier()
             )
         except:
             raise
         else:
-            for (tick, liquidityNet, liquidityGross) in tick_data:
-                self.tick_data[tick] = liquidityNet, liquidityGross
+            self._store_tick_word(word_position, tick_data)
             return tick_data
 
-    def get_tick_bitmap_position(self, tick) -> Tuple[int, int]:
+    def _load_missing_tick_word(self, word_position: int):
+        self.get_tick_data_at_word(word_position)
+
+    def get_tick(self, tick: int):
         """
-        Retrieves the wordPosition and bitPosition for the input tick
+        Reads the full `ticks()` struct for `tick`.
+        """
+        return self._call(self._pool_contract.functions.ticks(tick))
 
-        This function corrects internally for tick spacing! 
+    def _call(self, function, block_identifier=None):
+        if block_identifier is None:
+            block_identifier = self._block_identifier()
+        return call_at_block(function, block_identifier, self.cache, self.metrics)
 
-        e.g. tick=600 is the 11th initialized tick for an LP with 
-        tickSpacing of 60, starting at 0.
+    def _block_identifier(self):
+        return "latest" if self.block_number is None else self.block_number
 
-        Calling `get_tick_bitmap_position(600)` returns (0,10), where:
-            0 = wordPosition (zero-indexed)
-            10 = bitPosition (zero-indexed)
+    def _resolve_block_number(self, block_identifier) -> int:
+        return resolve_block_number(self._pool_contract.w3, block_identifier, self.metrics)
+
+    def load_tick_range(self, tick_lower: int, tick_upper: int):
         """
-        tick = tick // self.tick_spacing
-        word_index = tick >> 8
-        tick_index_in_word = tick % 256
-        return word_index, tick_index_in_word
+        Makes sure every word covering [tick_lower, tick_upper] is in 
+        `self.tick_data`, fetching the missing ones through TickLens.
+        """
+        for word_position in self._missing_tick_words(tick_lower, tick_upper):
+            self.get_tick_data_at_word(word_position)
+
+    def prefetch_ticks(
+        self,
+        tick_lower: int = MIN_TICK,
+        tick_upper: int = MAX_TICK,
+        max_workers: int = 8,
+        executor: Optional[Executor] = None,
+    ) -> List[int]:
+        """
+        Loads the complete tick map over [tick_lower, tick_upper] (the whole
+        tick range by default) and returns the non-empty words fetched.
+
+        The `tickBitmap` words of the missing range are read first, and
+        `getPopulatedTicksInWord` is only called for the non-empty ones; 
+        empty words are marked as loaded without a call. Both passes run 
+        concurrently on `executor`, or a pool of `max_workers` threads,
+        as one multicall per chunk when the pool has a `multicall` and one
+        call per word otherwise.
+        """
+        words = self._missing_tick_words(tick_lower, tick_upper)
+        if not words:
+            return []
+        block_identifier = self._block_identifier()
+        functions = self._pool_contract.functions
+        tick_lens_functions = self.tick_lens._tick_lens_contract.functions
+
+        with _executor(executor, max_workers) as executor, self.metrics.operation("prefetch_ticks"):
+            bitmaps = self._call_concurrently(
+                executor, [functions.tickBitmap(word) for word in words], block_identifier
+            )
+            populated = [word for word, bitmap in zip(words, bitmaps) if bitmap]
+            tick_data = self._call_concurrently(
+                executor,
+                [tick_lens_functions.getPopulatedTicksInWord(self.address, word) for word in populated],
+                block_identifier,
+            )
+
+        # the tick index is not thread-safe: store the words from this thread
+        fetched = dict(zip(populated, tick_data))
+        for word in words:
+            self._store_tick_word(word, fetched.get(word, []))
+        return populated
+
+    def _call_concurrently(self, executor: Executor, calls, block_identifier) -> List:
+        if self.multicall:
+            max_calls = self.multicall.max_calls
+            futures = [
+                _submit_in_context(executor, self.multicall.aggregate, calls[i : i + max_calls], block_identifier)
+                for i in range(0, len(calls), max_calls)
+            ]
+            return [result for future in futures for result in future.result()]
+        futures = [_submit_in_context(executor, self._call, call, block_identifier) for call in calls]
+        return [future.result() for future in futures]
 
 class V3LiquidityPool(BaseV3LiquidityPool):
     pass
\ No newline at end of file
@@ -0,0 +1,287 @@
+"""
+Integer port of the Uniswap v3 core math libraries (TickMath, SqrtPriceMath,
+SwapMath and the FullMath helpers they rely on).
+
+All prices are Q64.96 fixed point square roots, as stored in `slot0`, and
+all amounts are integers in the tokens' smallest unit, so results match the
+on-chain computation to the wei.
+"""
+from functools import lru_cache
+from math import floor, log
+from typing import Tuple
+
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+
+Q96 = 1 << 96
+Q128 = 1 << 128
+MAX_UINT160 = (1 << 160) - 1
+MAX_UINT256 = (1 << 256) - 1
+
+FEE_DENOMINATOR = 1_000_000
+
+# ticks whose sqrt ratio is memoized; walks revisit the same initialized and
+# spacing-aligned ticks, and 16k entries cover ~1M ticks at spacing 60
+SQRT_RATIO_CACHE_SIZE = 1 << 14
+
+# ratio multipliers for each bit of the absolute tick, from TickMath.getSqrtRatioAtTick
+_TICK_RATIO_MULTIPLIERS = (
+    (0x2, 0xFFF97272373D413259A46990580E213A),
+    (0x4, 0xFFF2E50F5F656932EF12357CF3C7FDCC),
+    (0x8, 0xFFE5CACA7E10E4E61C3624EAA0941CD0),
+    (0x10, 0xFFCB9843D60F6159C9DB58835C926644),
+    (0x20, 0xFF973B41FA98C081472E6896DFB254C0),
+    (0x40, 0xFF2EA16466C96A3843EC78B326B52861),
+    (0x80, 0xFE5DEE046A99A2A811C461F1969C3053),
+    (0x100, 0xFCBE86C7900A88AEDCFFC83B479AA3A4),
+    (0x200, 0xF987A7253AC413176F2B074CF7815E54),
+    (0x400, 0xF3392B0822B70005940C7A398E4B70F3),
+    (0x800, 0xE7159475A2C29B7443B29C7FA6E889D9),
+    (0x1000, 0xD097F3BDFD2022B8845AD8F792AA5825),
+    (0x2000, 0xA9F746462D870FDF8A65DC1F90E061E5),
+    (0x4000, 0x70D869A156D2A1B890BB3DF62BAF32F7),
+    (0x8000, 0x31BE135F97D08FD981231505542FCFA6),
+    (0x10000, 0x9AA508B5B7A84E1C677DE54F3E99BC9),
+    (0x20000, 0x5D6AF8DEDB81196699C329225EE604),
+    (0x40000, 0x2216E584F5FA1EA926041BEDFE98),
+    (0x80000, 0x48A170391F7DC42444E8FA2),
+)
+_LOG_SQRT_10001 = log(1.0001) / 2
+
+
+def mul_div(a: int, b: int, denominator: int) -> int:
+    """
+    floor(a * b / denominator), reverting like FullMath.mulDiv if the result
+    does not fit in a uint256.
+    """
+    result = a * b // denominator
+    if result > MAX_UINT256:
+        raise OverflowError("mulDiv overflow")
+    return result
+
+
+def mul_div_rounding_up(a: int, b: int, denominator: int) -> int:
+    """
+    ceil(a * b / denominator), as FullMath.mulDivRoundingUp.
+    """
+    result = -(-a * b // denominator)
+    if result > MAX_UINT256:
+        raise OverflowError("mulDiv overflow")
+    return result
+
+
+def div_rounding_up(a: int, b: int) -> int:
+    return -(-a // b)
+
+
+@lru_cache(maxsize=SQRT_RATIO_CACHE_SIZE)
+def get_sqrt_ratio_at_tick(tick: int) -> int:
+    """
+    Calculates sqrt(1.0001^tick) * 2^96 (TickMath.getSqrtRatioAtTick).
+
+    Results are memoized in a bounded LRU cache.
+    """
+    abs_tick = abs(tick)
+    if abs_tick > MAX_TICK:
+        raise ValueError(f"tick {tick} out of range")
+
+    ratio = 0xFFFCB933BD6FAD37AA2D162D1A594001 if abs_tick & 0x1 else Q128
+    for bit, multiplier in _TICK_RATIO_MULTIPLIERS:
+        if abs_tick & bit:
+            ratio = (ratio * multiplier) >> 128
+    if tick > 0:
+        ratio = MAX_UINT256 // ratio
+
+    # Q128.128 -> Q128.96, rounding up so that getTickAtSqrtRatio is consistent
+    return (ratio >> 32) + (0 if ratio % (1 << 32) == 0 else 1)
+
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96: int) -> int:
+    """
+    Returns the greatest tick such that get_sqrt_ratio_at_tick(tick) <=
+    sqrt_price_x96 (TickMath.getTickAtSqrtRatio).
+
+    Starts from a floating point estimate and corrects it against the exact
+    forward conversion, which gives the same result as the on-chain log2
+    approximation.
+    """
+    if not MIN_SQRT_RATIO <= sqrt_price_x96 < MAX_SQRT_RATIO:
+        raise ValueError(f"sqrt price {sqrt_price_x96} out of range")
+
+    tick = floor(log(sqrt_price_x96 / Q96) / _LOG_SQRT_10001)
+    tick = min(max(tick, MIN_TICK), MAX_TICK - 1)
+    while get_sqrt_ratio_at_tick(tick) > sqrt_price_x96:
+        tick -= 1
+    while get_sqrt_ratio_at_tick(tick + 1) <= sqrt_price_x96:
+        tick += 1
+    return tick
+
+
+def get_amount0_delta(sqrt_ratio_a_x96: int, sqrt_ratio_b_x96: int, liquidity: int, round_up: bool) -> int:
+    """
+    Amount of token0 between two prices for the given liquidity,
+    i.e. liquidity / sqrt(lower) - liquidity / sqrt(upper).
+    """
+    if sqrt_ratio_a_x96 > sqrt_ratio_b_x96:
+        sqrt_ratio_a_x96, sqrt_ratio_b_x96 = sqrt_ratio_b_x96, sqrt_ratio_a_x96
+    if sqrt_ratio_a_x96 <= 0:
+        raise ValueError("sqrt price must be positive")
+
+    numerator1 = liquidity << 96
+    numerator2 = sqrt_ratio_b_x96 - sqrt_ratio_a_x96
+    if round_up:
+        return div_rounding_up(mul_div_rounding_up(numerator1, numerator2, sqrt_ratio_b_x96), sqrt_ratio_a_x96)
+    return mul_div(numerator1, numerator2, sqrt_ratio_b_x96) // sqrt_ratio_a_x96
+
+
+def get_amount1_delta(sqrt_ratio_a_x96: int, sqrt_ratio_b_x96: int, liquidity: int, round_up: bool) -> int:
+    """
+    Amount of token1 between two prices for the given liquidity,
+    i.e. liquidity * (sqrt(upper) - sqrt(lower)).
+    """
+    if sqrt_ratio_a_x96 > sqrt_ratio_b_x96:
+        sqrt_ratio_a_x96, sqrt_ratio_b_x96 = sqrt_ratio_b_x96, sqrt_ratio_a_x96
+    if round_up:
+        return mul_div_rounding_up(liquidity, sqrt_ratio_b_x96 - sqrt_ratio_a_x96, Q96)
+    return mul_div(liquidity, sqrt_ratio_b_x96 - sqrt_ratio_a_x96, Q96)
+
+
+def get_next_sqrt_price_from_amount0_rounding_up(sqrt_price_x96: int, liquidity: int, amount: int, add: bool) -> int:
+    if amount == 0:
+        return sqrt_price_x96
+    numerator1 = liquidity << 96
+    product = amount * sqrt_price_x96
+
+    if add:
+        # the on-chain code falls back to a less precise formula on overflow
+        if product <= MAX_UINT256 and numerator1 + product <= MAX_UINT256:
+            return mul_div_rounding_up(numerator1, sqrt_price_x96, numerator1 + product)
+        return div_rounding_up(numerator1, numerator1 // sqrt_price_x96 + amount)
+
+    if product > MAX_UINT256 or numerator1 <= product:
+        raise ValueError("not enough token0 liquidity")
+    result = mul_div_rounding_up(numerator1, sqrt_price_x96, numerator1 - product)
+    if result > MAX_UINT160:
+        raise OverflowError("sqrt price overflow")
+    return result
+
+
+def get_next_sqrt_price_from_amount1_rounding_down(sqrt_price_x96: int, liquidity: int, amount: int, add: bool) -> int:
+    if add:
+        result = sqrt_price_x96 + (amount << 96) // liquidity
+        if result > MAX_UINT160:
+            raise OverflowError("sqrt price overflow")
+        return result
+
+    quotient = div_rounding_up(amount << 96, liquidity)
+    if sqrt_price_x96 <= quotient:
+        raise ValueError("not enough token1 liquidity")
+    return sqrt_price_x96 - quotient
+
+
+def get_next_sqrt_price_from_input(sqrt_price_x96: int, liquidity: int, amount_in: int, zero_for_one: bool) -> int:
+    if sqrt_price_x96 <= 0 or liquidity <= 0:
+        raise ValueError("sqrt price and liquidity must be positive")
+    if zero_for_one:
+        return get_next_sqrt_price_from_amount0_rounding_up(sqrt_price_x96, liquidity, amount_in, True)
+    return get_next_sqrt_price_from_amount1_rounding_down(sqrt_price_x96, liquidity, amount_in, True)
+
+
+def get_next_sqrt_price_from_output(sqrt_price_x96: int, liquidity: int, amount_out: int, zero_for_one: bool) -> int:
+    if sqrt_price_x96 <= 0 or liquidity <= 0:
+        raise ValueError("sqrt price and liquidity must be positive")
+    if zero_for_one:
+        return get_next_sqrt_price_from_amount1_rounding_down(sqrt_price_x96, liquidity, amount_out, False)
+    return get_next_sqrt_price_from_amount0_rounding_up(sqrt_price_x96, liquidity, amount_out, False)
+
+
+def compute_swap_step(
+    sqrt_ratio_current_x96: int,
+    sqrt_ratio_target_x96: int,
+    liquidity: int,
+    amount_remaining: int,
+    fee_pips: int,
+) -> Tuple[int, int, int, int]:
+    """
+    Computes the result of swapping within a single tick range
+    (SwapMath.computeSwapStep).
+
+    A positive `amount_remaining` is an exact input amount, a negative one an
+    exact output amount. Returns (sqrt_ratio_next_x96, amount_in, amount_out,
+    fee_amount).
+    """
+    zero_for_one = sqrt_ratio_current_x96 >= sqrt_ratio_target_x96
+    exact_in = amount_remaining >= 0
+
+    if exact_in:
+        amount_remaining_less_fee = mul_div(amount_remaining, FEE_DENOMINATOR - fee_pips, FEE_DENOMINATOR)
+        if zero_for_one:
+            amount_in = get_amount0_delta(sqrt_ratio_target_x96, sqrt_ratio_current_x96, liquidity, True)
+        else:
+            amount_in = get_amount1_delta(sqrt_ratio_current_x96, sqrt_ratio_target_x96, liquidity, True)
+        if amount_remaining_less_fee >= amount_in:
+            sqrt_ratio_next_x96 = sqrt_ratio_target_x96
+        else:
+            sqrt_ratio_next_x96 = get_next_sqrt_price_from_input(
+                sqrt_ratio_current_x96, liquidity, amount_remaining_less_fee, zero_for_one
+            )
+    else:
+        if zero_for_one:
+            amount_out = get_amount1_delta(sqrt_ratio_target_x96, sqrt_ratio_current_x96, liquidity, False)
+        else:
+            amount_out = get_amount0_delta(sqrt_ratio_current_x96, sqrt_ratio_target_x96, liquidity, False)
+        if -amount_remaining >= amount_out:
+            sqrt_ratio_next_x96 = sqrt_ratio_target_x96
+        else:
+            sqrt_ratio_next_x96 = get_next_sqrt_price_from_output(
+                sqrt_ratio_current_x96, liquidity, -amount_remaining, zero_for_one
+            )
+
+    reached_target = sqrt_ratio_target_x96 == sqrt_ratio_next_x96
+
+    # get the input/output amounts
+    if zero_for_one:
+        if not (reached_target and exact_in):
+            amount_in = get_amount0_delta(sqrt_ratio_next_x96, sqrt_ratio_current_x96, liquidity, True)
+        if not (reached_target and not exact_in):
+            amount_out = get_amount1_delta(sqrt_ratio_next_x96, sqrt_ratio_current_x96, liquidity, False)
+    else:
+        if not (reached_target and exact_in):
+            amount_in = get_amount1_delta(sqrt_ratio_current_x96, sqrt_ratio_next_x96, liquidity, True)
+        if not (reached_target and not exact_in):
+            amount_out = get_amount0_delta(sqrt_ratio_current_x96, sqrt_ratio_next_x96, liquidity, False)
+
+    # cap the output amount to not exceed the remaining output amount
+    if not exact_in and amount_out > -amount_remaining:
+        amount_out = -amount_remaining
+
+    if exact_in and sqrt_ratio_next_x96 != sqrt_ratio_target_x96:
+        # we didn't reach the target, so take the remainder of the maximum input as fee
+        fee_amount = amount_remaining - amount_in
+    else:
+        fee_amount = mul_div_rounding_up(amount_in, fee_pips, FEE_DENOMINATOR - fee_pips)
+
+    return sqrt_ratio_next_x96, amount_in, amount_out, fee_amount
+
+
+def get_amounts_for_liquidity(
+    sqrt_price_x96: int, sqrt_ratio_a_x96: int, sqrt_ratio_b_x96: int, liquidity: int
+) -> Tuple[int, int]:
+    """
+    Token amounts held by a position at the current price
+    (LiquidityAmounts.getAmountsForLiquidity).
+    """
+    if sqrt_ratio_a_x96 > sqrt_ratio_b_x96:
+        sqrt_ratio_a_x96, sqrt_ratio_b_x96 = sqrt_ratio_b_x96, sqrt_ratio_a_x96
+
+    amount0 = amount1 = 0
+    if sqrt_price_x96 <= sqrt_ratio_a_x96:
+        amount0 = get_amount0_delta(sqrt_ratio_a_x96, sqrt_ratio_b_x96, liquidity, False)
+    elif sqrt_price_x96 < sqrt_ratio_b_x96:
+        amount0 = get_amount0_delta(sqrt_price_x96, sqrt_ratio_b_x96, liquidity, False)
+        amount1 = get_amount1_delta(sqrt_ratio_a_x96, sqrt_price_x96, liquidity, False)
+    else:
+        amount1 = get_amount1_delta(sqrt_ratio_a_x96, sqrt_ratio_b_x96, liquidity, False)
+    return amount0, amount1